@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Assembly throughput (MB/s) and peak memory for copy and resample paths."""
+
+import sys
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.assembler import AudiobookAssembler, AudioFormat
+from src.tts_backends import StubBackend, write_wav
+
+
+def write_segments(directory, count):
+    backend = StubBackend(sample_rate=22050, samples_per_char=300)
+    paths = []
+    for i in range(count):
+        path = Path(directory) / f"segment_{i:06d}.wav"
+        write_wav(path, backend.synthesize(f"Segment number {i} of the synthetic book."), backend.sample_rate)
+        paths.append(path)
+    return paths
+
+
+def run(name, assembler, paths, output):
+    tracemalloc.start()
+    stats = assembler.assemble(iter(paths), output)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:18} {stats.bytes_written / 1e6:8.1f} MB  {stats.mb_per_second:8.1f} MB/s  "
+          f"peak {peak / 1e6:6.2f} MB")
+
+
+def main(count=500):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_segments(tmp, count)
+        print(f"=== Assembler benchmark ({count} segments) ===")
+        output = Path(tmp) / "book.wav"
+        run("copy 22.05k", AudiobookAssembler(AudioFormat(22050)), paths, output)
+        run("resample 44.1k", AudiobookAssembler(AudioFormat(44100)), paths, output)
+        run("stereo float 24k", AudiobookAssembler(AudioFormat(24000, channels=2, sample_width=4)), paths, output)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
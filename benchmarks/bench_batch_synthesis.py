@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Per-segment synthesize() vs synthesize_batch() on the stub backend."""
+
+import sys
+import os
+import random
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextSegment
+from src.voice_assigner import VoiceSegment, VoiceProfile, VoiceCharacteristics
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+
+WORDS = "the forest path light trees quiet town shortcut lost together grinned sighed".split()
+
+
+def make_voice_segments(count, seed=1):
+    rng = random.Random(seed)
+    voices = [VoiceProfile(voice_id=v, name=v, characteristics=VoiceCharacteristics())
+              for v in ("p226", "p227", "p228")]
+    segments = []
+    for i in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40))) + f" {i}."
+        segments.append(VoiceSegment(TextSegment(content=text, segment_type="narrative"), rng.choice(voices)))
+    return segments
+
+
+def make_backend():
+    # ~20 ms fixed cost per call, plus padded per-character cost
+    return StubBackend(call_overhead=0.02, seconds_per_char=0.00002, samples_per_char=20)
+
+
+def padding_efficiency(calls):
+    useful = sum(sum(lengths) for _, lengths in calls)
+    padded = sum(len(lengths) * max(lengths) for _, lengths in calls)
+    return useful / padded if padded else 1.0
+
+
+def main(count=400):
+    segments = make_voice_segments(count)
+    print(f"=== Batch synthesis benchmark ({count} segments, 3 voices) ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp), backend=make_backend())
+        start = time.perf_counter()
+        for segment in segments:
+            synth.synthesize(**segment.get_synthesizer_params())
+        single_time = time.perf_counter() - start
+        print(f"single     {single_time:6.2f}s  {len(synth.backend.calls):4} calls")
+
+    for batch_size in (8, 32):
+        with tempfile.TemporaryDirectory() as tmp:
+            synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp), backend=make_backend())
+            start = time.perf_counter()
+            synth.synthesize_batch(segments, batch_size=batch_size)
+            duration = time.perf_counter() - start
+            calls = synth.backend.calls
+            print(f"batch={batch_size:<3}  {duration:6.2f}s  {len(calls):4} calls  "
+                  f"padding efficiency {padding_efficiency(calls):.0%}  speedup {single_time / duration:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
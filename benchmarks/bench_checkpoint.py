@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Checkpoint cost per segment and resume time for a 100k-segment job."""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.checkpoint import SynthesisCheckpoint, segment_key
+
+
+def main(segments=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        keys = [segment_key(f"Sentence number {i}.", "narrator", "stub") for i in range(segments)]
+        audio_dir = tmp / "audio"
+        audio_dir.mkdir()
+        paths = []
+        for i in range(segments):
+            path = audio_dir / f"{i}.wav"
+            path.write_bytes(b"\x00" * 2048)
+            paths.append(path)
+
+        manifest = tmp / "job.checkpoint"
+        start = time.perf_counter()
+        with SynthesisCheckpoint(manifest) as checkpoint:
+            for i, path in enumerate(paths):
+                checkpoint.record(i, keys[i], path)
+        duration = time.perf_counter() - start
+        print(f"record   {duration / segments * 1e6:6.1f} µs/segment  "
+              f"(manifest {manifest.stat().st_size / 1e6:.1f} MB)")
+
+        start = time.perf_counter()
+        done = SynthesisCheckpoint(manifest).resume(keys)
+        print(f"resume   {time.perf_counter() - start:6.2f} s for {len(done)} of {segments} segments")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Throughput benchmark: DialogueMatcher vs the original per-pattern re.search loops."""
+
+import sys
+import os
+import re
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser, DialogueMatcher, DIALOGUE_PATTERNS, SPEAKER_PATTERNS
+
+
+def legacy_classify(sentence):
+    """The original _classify_sentence/_extract_speaker logic."""
+    for pattern in DIALOGUE_PATTERNS:
+        if re.search(pattern, sentence):
+            for speaker_pattern in SPEAKER_PATTERNS:
+                match = re.search(speaker_pattern, sentence)
+                if match:
+                    return True, match.group(1)
+            return True, None
+    return False, None
+
+
+def matcher_classify(matcher, sentence):
+    match = matcher.match(sentence)
+    if match:
+        return True, match.speaker
+    return False, None
+
+
+def load_sentences(repeat):
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    extra = [
+        'The wind moved through the trees and the path narrowed.',
+        'Nobody answered for a long time.',
+        '"Hold the lantern higher," Bob said.',
+        'Susan asked, "Do you hear that?"',
+    ]
+    parser = TextParser()
+    sentences = parser._split_sentences(parser._clean_text(sample_text)) + extra
+    return sentences * repeat
+
+
+def bench(name, func, sentences):
+    start = time.perf_counter()
+    results = [func(s) for s in sentences]
+    duration = time.perf_counter() - start
+    print(f"{name:10} {len(sentences) / duration:12,.0f} sentences/s  ({duration:.3f}s)")
+    return results, duration
+
+
+def main(repeat=20000):
+    sentences = load_sentences(repeat)
+    print(f"=== Dialogue matcher benchmark ({len(sentences):,} sentences) ===")
+    matcher = DialogueMatcher()
+    legacy_results, legacy_time = bench("legacy", legacy_classify, sentences)
+    matcher_results, matcher_time = bench("matcher", lambda s: matcher_classify(matcher, s), sentences)
+    assert legacy_results == matcher_results, "matcher output differs from legacy patterns"
+    print(f"Speedup: {legacy_time / matcher_time:.1f}x (results identical)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
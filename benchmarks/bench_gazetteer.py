@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Cost and effect of gazetteer speaker resolution at growing book sizes."""
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+
+
+def run(parser, text):
+    start = time.perf_counter()
+    segments = parser.parse_text(text)
+    seconds = time.perf_counter() - start
+    dialogue = [s for s in segments if s.segment_type == "dialogue"]
+    unattributed = sum(1 for s in dialogue if s.speaker is None)
+    return seconds, len(dialogue), unattributed
+
+
+def main():
+    plain = TextParser(sentence_splitter="rules")
+    resolving = TextParser(sentence_splitter="rules", resolve_speakers=True)
+    for words in (50_000, 100_000, 200_000, 400_000):
+        text = make_book(words=words)
+        base_seconds, dialogue, base_missing = run(plain, text)
+        seconds, _, missing = run(resolving, text)
+        print(f"{words:7} words  parse {base_seconds:5.2f}s -> {seconds:5.2f}s with resolution  "
+              f"unattributed dialogue {base_missing}/{dialogue} -> {missing}/{dialogue}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Cold import time of the server modules, with an optional regression limit.
+
+Usage: python benchmarks/bench_import_time.py [--runs N] [--max-ms MS]
+Exits non-zero if any module's median import time exceeds --max-ms or if a
+module pulls in a heavy dependency it does not need at import time.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server')
+
+MODULES = ["src.parser", "src.voice_assigner", "src.synthesizer"]
+HEAVY_MODULES = ["torch", "TTS", "nltk", "numpy"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps({{"seconds": duration, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module):
+    """Import module in a fresh interpreter; return (seconds, heavy modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=SERVER_DIR, capture_output=True, text=True, check=True,
+    )
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data["seconds"], data["heavy"]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--max-ms", type=float, default=None)
+    args = arg_parser.parse_args()
+
+    failed = False
+    print("=== Import time benchmark ===")
+    for module in MODULES:
+        runs = [measure(module) for _ in range(args.runs)]
+        median_ms = statistics.median(seconds for seconds, _ in runs) * 1000
+        heavy = sorted(set(m for _, loaded in runs for m in loaded))
+        print(f"{module:20} {median_ms:8.1f} ms  heavy imports: {', '.join(heavy) or 'none'}")
+        if heavy or (args.max_ms is not None and median_ms > args.max_ms):
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
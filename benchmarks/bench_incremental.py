@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Turnaround for a one-word edit: full build vs IncrementalBuilder on a synthetic novel."""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.incremental import IncrementalBuilder
+
+
+def main(words=100_000):
+    text = make_book(words=words)
+    # One-word edit two thirds of the way through the book
+    position = text.index(" the ", 2 * len(text) // 3)
+    edited = text[:position] + " a " + text[position + len(" the "):]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp / "assignments.json"))
+        synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp / "cache"),
+                                    backend=StubBackend(samples_per_char=10, seconds_per_char=20e-6))
+        builder = IncrementalBuilder(TextParser(), assigner, synth, tmp / "book.json")
+
+        start = time.perf_counter()
+        full = builder.build(text)
+        print(f"full build          {time.perf_counter() - start:7.2f}s  "
+              f"{full.segments_synthesized} segments synthesized")
+
+        start = time.perf_counter()
+        incremental = builder.build(edited)
+        print(f"after one-word edit {time.perf_counter() - start:7.2f}s  "
+              f"{incremental.paragraphs_parsed} paragraphs parsed, "
+              f"{incremental.segments_synthesized} segments synthesized, "
+              f"{incremental.segments_reused} reused")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Time to first segment and peak memory: read-then-parse vs TextParser.iter_file (.txt and .epub)."""
+
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from html import escape
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+
+
+def write_epub(path, text):
+    chapters = [c for c in text.split("Chapter ") if c.strip()]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as epub:
+        epub.writestr("mimetype", "application/epub+zip", zipfile.ZIP_STORED)
+        epub.writestr("META-INF/container.xml",
+                      '<container xmlns="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles>'
+                      '<rootfile full-path="content.opf"/></rootfiles></container>')
+        items = "".join(f'<item id="c{i}" href="c{i}.xhtml" media-type="application/xhtml+xml"/>'
+                        for i in range(len(chapters)))
+        spine = "".join(f'<itemref idref="c{i}"/>' for i in range(len(chapters)))
+        epub.writestr("content.opf", f'<package xmlns="http://www.idpf.org/2007/opf"><manifest>{items}'
+                                     f'</manifest><spine>{spine}</spine></package>')
+        for i, chapter in enumerate(chapters):
+            heading, _, body = chapter.partition("\n\n")
+            paragraphs = "".join(f"<p>{escape(p)}</p>\n" for p in body.split("\n\n") if p.strip())
+            epub.writestr(f"c{i}.xhtml", f"<html><body><h1>Chapter {heading}</h1>\n{paragraphs}</body></html>")
+
+
+def measure(label, run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in run():
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:22} first segment {first * 1e3:8.1f} ms  total {total:6.2f}s  "
+          f"peak {peak / 1e6:7.1f} MB  ({count} segments)")
+
+
+def main(words=300_000):
+    parser = TextParser()
+    with tempfile.TemporaryDirectory() as tmp:
+        txt = Path(tmp) / "book.txt"
+        txt.write_text(make_book(words=words), encoding="utf-8")
+        epub = Path(tmp) / "book.epub"
+        write_epub(epub, txt.read_text(encoding="utf-8"))
+        print(f"=== Ingestion: {words} words, {txt.stat().st_size / 1e6:.1f} MB text, "
+              f"{epub.stat().st_size / 1e6:.1f} MB epub ===")
+        measure("read + parse_text", lambda: parser.parse_text(txt.read_text(encoding="utf-8")))
+        measure("iter_file (.txt)", lambda: parser.iter_file(txt))
+        measure("iter_file (.epub)", lambda: parser.iter_file(epub))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Load test of JobService: bulk books from several tenants plus a stream of interactive previews."""
+
+import sys
+import os
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.job_service import JobService
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+async def load_test(service, tenants, bulk_per_tenant, previews, seed=0):
+    rng = random.Random(seed)
+    bulk = [await service.submit(make_book(words=3_000, seed=rng.randrange(1 << 30)), tenant=f"tenant-{t}")
+            for t in range(tenants) for _ in range(bulk_per_tenant)]
+    interactive = []
+    for n in range(previews):
+        await asyncio.sleep(rng.uniform(0.05, 0.2))
+        interactive.append(await service.submit(make_book(words=150, seed=n), tenant=f"reader-{n}",
+                                                priority="interactive"))
+    for job in bulk + interactive:
+        await service.wait(job.job_id)
+    return bulk, interactive
+
+
+def report(label, jobs):
+    waits = [job.started_at - job.submitted_at for job in jobs]
+    totals = [job.finished_at - job.submitted_at for job in jobs]
+    print(f"{label:12} {len(jobs):3} jobs  queue wait p50 {percentile(waits, 0.5):6.2f}s "
+          f"p95 {percentile(waits, 0.95):6.2f}s  completion p50 {statistics.median(totals):6.2f}s")
+
+
+def main(tenants=4, bulk_per_tenant=2, previews=10, workers=4):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp / "assignments.json"))
+        synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp / "cache"),
+                                    backend=StubBackend(samples_per_char=10, call_overhead=0.01,
+                                                        seconds_per_char=20e-6))
+        service = JobService(TextParser(), assigner, synth, workers=workers)
+
+        async def run():
+            async with service:
+                start = time.perf_counter()
+                bulk, interactive = await load_test(service, tenants, bulk_per_tenant, previews)
+                return bulk, interactive, time.perf_counter() - start
+
+        bulk, interactive, seconds = asyncio.run(run())
+        segments = sum(job.segments for job in bulk + interactive)
+        print(f"=== Job service load test ({workers} workers, {tenants} tenants) ===")
+        print(f"throughput   {segments / seconds:8.1f} segments/s ({segments} segments in {seconds:.2f}s)")
+        report("bulk", bulk)
+        report("interactive", interactive)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Per-call overhead of recording into the metrics registry."""
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.metrics import MetricsRegistry
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main(calls=200_000):
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("stage", "model", "voice_id"))
+    counter = registry.counter("segments_total", "Segments", ("stage", "model", "voice_id"))
+    child = histogram.labels(stage="synthesize", model="vits", voice_id="p225")
+
+    results = {
+        "baseline (empty call)": per_call_ns(lambda: None, calls),
+        "counter.inc(labels)": per_call_ns(lambda: counter.inc(stage="parse"), calls),
+        "histogram.observe(labels)": per_call_ns(
+            lambda: histogram.observe(0.01, stage="synthesize", model="vits", voice_id="p225"), calls),
+        "cached child.observe": per_call_ns(lambda: child.observe(0.01), calls),
+    }
+    for name, ns in results.items():
+        print(f"{name:28s} {ns:8.0f} ns/call")
+
+    start = time.perf_counter()
+    registry.to_prometheus()
+    print(f"{'to_prometheus':28s} {(time.perf_counter() - start) * 1e6:8.0f} us")
+
+
+if __name__ == "__main__":
+    main()
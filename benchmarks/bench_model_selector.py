@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Latency under a load spike: always the quality model vs the load-adaptive ModelSelector."""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.model_pool import ModelPool
+from src.tts_backends import StubBackend
+from src.model_selector import ModelSelector
+
+# Simulated per-call time of the two models (VITS-like and fast_pitch-like)
+SPEEDS = {"quality": 0.08, "fast": 0.01}
+SLO_SECONDS = 0.3
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(cache_dir, selector, listeners, requests_per_listener):
+    # Model calls are serialized, like a single GPU
+    gpu = threading.Lock()
+
+    class SharedDeviceBackend(StubBackend):
+        def synthesize_batch(self, texts, speaker=None):
+            with gpu:
+                return super().synthesize_batch(texts, speaker)
+
+    pool = ModelPool(loader=lambda name: SharedDeviceBackend(model_name=name, call_overhead=SPEEDS[name]))
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(cache_dir),
+                                backend=pool.get("quality"), model_pool=pool, selector=selector)
+    pool.get("fast")
+    latencies = []
+
+    def listener(n):
+        for i in range(requests_per_listener):
+            start = time.perf_counter()
+            synth.synthesize(f"Listener {n} asks for sentence {i}.", "narrator")
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=listener, args=(n,)) for n in range(listeners)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def main(listeners=8, requests_per_listener=10):
+    print(f"=== Load spike: {listeners} concurrent listeners, SLO {SLO_SECONDS}s ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for label, selector in (("quality only", None),
+                                ("adaptive", ModelSelector(["quality", "fast"], slo_seconds=SLO_SECONDS))):
+            latencies = run(tmp / label, selector, listeners, requests_per_listener)
+            missed = sum(latency > SLO_SECONDS for latency in latencies) / len(latencies)
+            degraded = len(selector.degradation_log) if selector else 0
+            print(f"{label:13} p50 {percentile(latencies, 0.5):5.2f}s  p95 {percentile(latencies, 0.95):5.2f}s  "
+                  f"SLO missed {missed:4.0%}  degraded {degraded}/{len(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Scaling benchmark for TextParser.parse_text_parallel with 1/2/4/8 workers."""
+
+import sys
+import os
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+
+
+def build_book(chapters):
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    chapter_body = "\n\n".join([sample_text] * 40)
+    return "\n\n".join(f"Chapter {n}\n\n{chapter_body}" for n in range(1, chapters + 1))
+
+
+def main(chapters=100):
+    parser = TextParser()
+    text = build_book(chapters)
+    print(f"=== Parallel parser benchmark ({len(text) / 1e6:.1f}M chars, {os.cpu_count()} CPUs) ===")
+
+    start = time.perf_counter()
+    expected = parser.parse_text(text)
+    baseline = time.perf_counter() - start
+    print(f"sequential  {baseline:6.2f}s  {len(expected):,} segments")
+
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        segments = parser.parse_text_parallel(text, workers=workers, min_chars=0)
+        duration = time.perf_counter() - start
+        assert segments == expected, f"{workers} workers: output differs from sequential parse"
+        print(f"{workers} workers   {duration:6.2f}s  speedup {baseline / duration:4.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Sequential stages vs AudiobookPipeline on the stub backend, with per-stage utilization."""
+
+import sys
+import os
+import io
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.pipeline import AudiobookPipeline
+
+
+def build_book(paragraphs):
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    # Number each paragraph so the cache does not serve repeats
+    return "\n\n".join(f"{sample_text} Page {n} ends here." for n in range(paragraphs))
+
+
+def make_synthesizer(cache_dir):
+    return AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(cache_dir),
+                               backend=StubBackend(call_overhead=0.002, samples_per_char=10))
+
+
+def main(paragraphs=100):
+    text = build_book(paragraphs)
+    parser = TextParser()
+    parser.parse_text("Load the tokenizer before timing.")
+    with tempfile.TemporaryDirectory() as tmp:
+        assigner = VoiceAssigner(development_mode=False, assignments_file=str(Path(tmp) / "assignments.json"))
+        print(f"=== Pipeline benchmark ({paragraphs} paragraphs) ===")
+
+        synth = make_synthesizer(Path(tmp) / "sequential")
+        start = time.perf_counter()
+        voice_segments = assigner.assign_voices(parser.parse_text(text))
+        first_audio = None
+        for voice_segment in voice_segments:
+            synth.synthesize(**voice_segment.get_synthesizer_params())
+            first_audio = first_audio or time.perf_counter() - start
+        sequential = time.perf_counter() - start
+        print(f"sequential  {sequential:6.2f}s  first audio after {first_audio:.3f}s")
+
+        pipeline = AudiobookPipeline(parser, assigner, make_synthesizer(Path(tmp) / "pipeline"))
+        result = pipeline.run(io.StringIO(text))
+        print(f"pipeline    {result.wall_seconds:6.2f}s  first audio after {result.first_output_seconds:.3f}s")
+        for stage in result.stats.values():
+            print(f"  {stage.name:11} {stage.items:6} items  utilization {stage.utilization(result.wall_seconds):5.1%}"
+                  f"  starved {stage.starved_seconds:6.2f}s  blocked {stage.blocked_seconds:6.2f}s")
+        print(f"  bottleneck: {result.bottleneck}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Seek-table lookups on a 100k-segment book: memory-mapped bisect vs a linear scan."""
+
+import sys
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.assembler import AudioFormat
+from src.seek_table import SeekTable, SeekTableWriter, SegmentMark
+
+
+def main(segments=100_000, lookups=10_000):
+    rng = random.Random(0)
+    audio_format = AudioFormat()
+    writer = SeekTableWriter(audio_format, 44)
+    frame, text = 0, 0
+    for index in range(segments):
+        frames, chars = rng.randint(20_000, 80_000), rng.randint(20, 200)
+        writer.add(frame, frames, SegmentMark(text, text + chars, f"Chapter {index // 300 + 1}"
+                                              if index % 300 == 0 else None))
+        frame += frames + 6615  # 0.3 s pause
+        text += chars + 1
+    total_seconds = frame / audio_format.sample_rate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "book.wav.seek"
+        writer.write(path)
+        start = time.perf_counter()
+        seek = SeekTable(path)
+        print(f"=== Seek table: {segments} segments, {len(seek.chapters)} chapters, "
+              f"{path.stat().st_size / 1e6:.1f} MB ===")
+        print(f"open             {(time.perf_counter() - start) * 1e3:8.2f} ms")
+
+        times = [rng.uniform(0, total_seconds) for _ in range(lookups)]
+        start = time.perf_counter()
+        for seconds in times:
+            seek.segment_at_time(seconds)
+        print(f"segment_at_time  {(time.perf_counter() - start) / lookups * 1e6:8.2f} µs/lookup")
+
+        offsets = [rng.randrange(text) for _ in range(lookups)]
+        start = time.perf_counter()
+        for offset in offsets:
+            seek.time_at_text(offset)
+        print(f"time_at_text     {(time.perf_counter() - start) / lookups * 1e6:8.2f} µs/lookup")
+
+        sample = times[:100]
+        start = time.perf_counter()
+        for seconds in sample:
+            target = int(seconds * seek.sample_rate)
+            next(i for i in range(len(seek) - 1, -1, -1) if seek._record(i)[0] <= target)
+        print(f"linear scan      {(time.perf_counter() - start) / len(sample) * 1e6:8.2f} µs/lookup")
+        seek.close()
+
+
+if __name__ == "__main__":
+    main()
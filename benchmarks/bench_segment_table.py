@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Memory and iteration speed: TextSegment/VoiceSegment objects vs the columnar SegmentTable."""
+
+import gc
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+
+
+def retained(build):
+    """Run build() and return (result, bytes still allocated once it returns)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def iterate(params):
+    start = time.perf_counter()
+    chars = 0
+    for item in params:
+        chars += len(item["text"])
+    return time.perf_counter() - start
+
+
+def main(words=500_000):
+    text = make_book(words=words)
+    parser = TextParser()
+    parser.parse_text("Load the tokenizer before measuring.")
+    assignments_file = os.path.join(tempfile.mkdtemp(), "assignments.json")
+    assigner = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+
+    objects, object_bytes = retained(lambda: assigner.assign_voices(parser.parse_text(text)))
+    table, table_bytes = retained(lambda: assigner.assign_table(parser.parse_table(text)))
+
+    print(f"=== {len(table)} segments, {len(text) / 1e6:.1f}M characters ===")
+    print(f"objects  {object_bytes / 1e6:7.1f} MB  ({object_bytes / len(objects):5.0f} B/segment)"
+          f"  iterate {iterate(vs.get_synthesizer_params() for vs in objects) * 1000:6.1f} ms")
+    print(f"table    {table_bytes / 1e6:7.1f} MB  ({table_bytes / len(table):5.0f} B/segment)"
+          f"  iterate {iterate(view.get_synthesizer_params() for view in table) * 1000:6.1f} ms (views)"
+          f"  {iterate(table.iter_synthesizer_params()) * 1000:6.1f} ms (columns)")
+    print(f"  table columns alone: {table.nbytes() / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
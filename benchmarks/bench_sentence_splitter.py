@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Agreement and speed: RuleBasedSplitter vs nltk punkt, on the sample text and synthetic books."""
+
+import sys
+import os
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+from src.sentence_splitter import RuleBasedSplitter
+
+
+def boundaries(text, sentences):
+    """End offsets of each sentence in text."""
+    ends, cursor = set(), 0
+    for sentence in sentences:
+        start = text.find(sentence, cursor)
+        if start < 0:
+            continue
+        cursor = start + len(sentence)
+        ends.add(cursor)
+    return ends
+
+
+def timed(split, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sentences = split(text)
+        best = min(best, time.perf_counter() - start)
+    return sentences, best
+
+
+def compare(name, text):
+    nltk_parser = TextParser()
+    text = nltk_parser._clean_text(text)
+    reference, nltk_seconds = timed(nltk_parser._split_sentences, text)
+    sentences, rules_seconds = timed(RuleBasedSplitter(), text)
+
+    expected, actual = boundaries(text, reference), boundaries(text, sentences)
+    agreed = len(expected & actual)
+    precision = agreed / len(actual) if actual else 1.0
+    recall = agreed / len(expected) if expected else 1.0
+    print(f"{name:22} {len(text) / 1e6:5.2f}M chars  nltk {len(reference):6} sentences {nltk_seconds * 1000:8.1f} ms"
+          f"  rules {len(sentences):6} sentences {rules_seconds * 1000:8.1f} ms"
+          f"  ({nltk_seconds / rules_seconds:4.1f}x)  boundary precision {precision:.1%} recall {recall:.1%}")
+
+
+def main():
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    compare("sample_text.txt", sample_text)
+    for mix in ("ascii", "smart", "all"):
+        compare(f"synthetic ({mix} quotes)", make_book(words=200_000, quote_mix=mix))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Peak-memory comparison: TextParser.parse_text vs TextParser.iter_segments."""
+
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+
+
+def write_book(path, repeat):
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(repeat):
+            f.write(sample_text)
+            f.write('\n\n')
+
+
+def measure(name, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:14} {count:8,} segments  {duration:6.2f}s  peak {peak / 1e6:8.1f} MB")
+
+
+def main(repeat=5000):
+    parser = TextParser()
+    with tempfile.TemporaryDirectory() as tmp:
+        book_path = Path(tmp) / 'book.txt'
+        write_book(book_path, repeat)
+        print(f"=== Streaming parser benchmark ({book_path.stat().st_size / 1e6:.1f} MB book) ===")
+
+        def full():
+            with open(book_path, encoding='utf-8') as f:
+                return len(parser.parse_text(f.read()))
+
+        def streamed():
+            with open(book_path, encoding='utf-8') as f:
+                return sum(1 for _ in parser.iter_segments(f))
+
+        measure("parse_text", full)
+        measure("iter_segments", streamed)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Synthesis calls and wall time: one call per segment vs planned chunks (stub backend)."""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.synthesis_planner import SynthesisPlanner
+
+
+def timed_synthesis(cache_dir, items):
+    # Fixed per-call cost plus per-character cost, like a real model on CPU
+    backend = StubBackend(call_overhead=0.01, seconds_per_char=50e-6, samples_per_char=10)
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(cache_dir), backend=backend)
+    start = time.perf_counter()
+    for item in items:
+        synth.synthesize(**item.get_synthesizer_params())
+    return len(backend.calls), time.perf_counter() - start
+
+
+def main(words=20_000, target_chars=250, max_chars=400):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp / "assignments.json"))
+        voice_segments = assigner.assign_voices(TextParser().parse_text(make_book(words=words)))
+        plan = SynthesisPlanner(target_chars, max_chars).plan(voice_segments)
+
+        calls, seconds = timed_synthesis(tmp / "per_segment", voice_segments)
+        print(f"per segment  {calls:6} calls  {seconds:6.2f}s")
+        calls, seconds_planned = timed_synthesis(tmp / "planned", plan.chunks)
+        print(f"planned      {calls:6} calls  {seconds_planned:6.2f}s  "
+              f"({plan.call_reduction:.0%} fewer calls, {1 - seconds_planned / seconds:.0%} less time)")
+
+
+if __name__ == "__main__":
+    main()
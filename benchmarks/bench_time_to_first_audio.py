@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Time to first audio for a chapter: batch synthesis vs AdaptiveSynthesizer.stream."""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import make_book
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+
+
+def make_synthesizer(cache_dir):
+    return AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(cache_dir),
+                               backend=StubBackend(samples_per_char=10, call_overhead=0.02, seconds_per_char=20e-6))
+
+
+def main(words=5_000):
+    text = make_book(words=words)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp / "assignments.json"))
+        voice_segments = assigner.assign_voices(TextParser().parse_text(text))
+        print(f"{len(voice_segments)} segments")
+
+        start = time.perf_counter()
+        make_synthesizer(tmp / "batch").synthesize_batch(voice_segments)
+        total = time.perf_counter() - start
+        print(f"batch            first audio {total:6.2f}s  total {total:6.2f}s")
+
+        for priority in (0, 1, 3):
+            synth = make_synthesizer(tmp / f"stream-{priority}")
+            start = time.perf_counter()
+            first = None
+            for chunk in synth.stream(voice_segments, priority_segments=priority):
+                if first is None:
+                    first = time.perf_counter() - start
+            total = time.perf_counter() - start
+            print(f"stream (first {priority}) first audio {first:6.2f}s  total {total:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Voice assignment throughput on a 100k-segment book, and the share spent on pool lookups."""
+
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextSegment
+from src.voice_assigner import VoiceAssigner
+
+
+def make_segments(count):
+    speakers = [None, None, "Bob", "Susan", "Marcus", None, "Elena"]
+    segments = []
+    for i in range(count):
+        speaker = speakers[i % len(speakers)]
+        segment_type = "dialogue" if speaker else "narrative"
+        segments.append(TextSegment(f"Sentence {i}.", segment_type, speaker, 0.9))
+    return segments
+
+
+def main(count=100_000):
+    segments = make_segments(count)
+    assignments_file = os.path.join(tempfile.mkdtemp(), "assignments.json")
+    assigner = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+
+    start = time.perf_counter()
+    for segment in segments:
+        pass
+    iterate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for segment in segments:
+        assigner._assign_character_voice(segment.speaker)
+    lookups = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assigner.assign_voices(segments)
+    total = time.perf_counter() - start
+
+    print(f"{count} segments: assign_voices {total * 1000:.1f} ms "
+          f"({count / total:,.0f} segments/s)")
+    print(f"  voice lookups {lookups * 1000:.1f} ms, bare iteration {iterate * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Throughput scaling of SynthesisWorkerPool with a CPU-bound stub model."""
+
+import sys
+import os
+import functools
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextSegment
+from src.voice_assigner import VoiceSegment, VoiceProfile, VoiceCharacteristics
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.worker_pool import SynthesisWorkerPool
+
+
+def make_voice_segments(count, label="book"):
+    voice = VoiceProfile(voice_id="p226", name="Narrator", characteristics=VoiceCharacteristics())
+    return [VoiceSegment(TextSegment(content=f"Sentence number {i} of the {label}.", segment_type="narrative"), voice)
+            for i in range(count)]
+
+
+def main(count=200):
+    segments = make_voice_segments(count)
+    # ~10 ms of busy CPU per segment, like CPU inference
+    factory = functools.partial(StubBackend, call_overhead=0.01, cpu_bound=True, samples_per_char=10)
+    print(f"=== Worker pool benchmark ({count} segments, {os.cpu_count()} CPUs) ===")
+    baseline = None
+    for workers in (1, 2, 4, 8):
+        with tempfile.TemporaryDirectory() as tmp:
+            with SynthesisWorkerPool("stub", SynthesisCache(Path(tmp)), workers=workers,
+                                     backend_factory=factory) as pool:
+                pool.synthesize(make_voice_segments(workers, "warm-up"))  # spawn workers, load models
+                start = time.perf_counter()
+                pool.synthesize(segments)
+                duration = time.perf_counter() - start
+        baseline = baseline or duration
+        print(f"{workers} workers  {count / duration:8.1f} segments/s  speedup {baseline / duration:4.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
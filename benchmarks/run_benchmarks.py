@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark suite: parse, assign and (stub) synthesis on synthetic books.
+
+Writes machine-readable JSON so results can be compared across commits:
+
+    python benchmarks/run_benchmarks.py --words 50000 --output before.json
+    python benchmarks/run_benchmarks.py --words 50000 --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+sys.path.append(os.path.dirname(__file__))
+
+from synthetic_book import iter_book
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of latency samples, in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": ordered[-1] * 1000}
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1e6
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed_stage(items, work):
+    """Run work over items, returning (results, total seconds, per-item latencies)."""
+    results, latencies = [], []
+    start = time.perf_counter()
+    for item in items:
+        item_start = time.perf_counter()
+        results.append(work(item))
+        latencies.append(time.perf_counter() - item_start)
+    return results, time.perf_counter() - start, latencies
+
+
+def stage_report(count, seconds, latencies):
+    return {"items": count, "seconds": seconds,
+            "items_per_second": count / seconds if seconds else None,
+            "latency": percentiles(latencies)}
+
+
+def run(args):
+    book_options = dict(words=args.words, dialogue_density=args.dialogue_density,
+                        quote_mix=args.quote_mix, seed=args.seed)
+    parser = TextParser()
+    parser.parse_text("Load the tokenizer before timing.")
+
+    # Parse: stream the book and time each yielded segment
+    segments, latencies = [], []
+    start = time.perf_counter()
+    last = start
+    for segment in parser.iter_segments(iter_book(**book_options)):
+        now = time.perf_counter()
+        segments.append(segment)
+        latencies.append(now - last)
+        last = now
+    report = {"parse": stage_report(len(segments), time.perf_counter() - start, latencies)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assigner = VoiceAssigner(development_mode=False, assignments_file=str(Path(tmp) / "assignments.json"))
+        voice_segments, seconds, latencies = timed_stage(segments, assigner.assign_voice)
+        report["assign"] = stage_report(len(voice_segments), seconds, latencies)
+
+        backend = StubBackend(call_overhead=args.stub_call_ms / 1000,
+                              seconds_per_char=args.stub_char_us / 1e6, samples_per_char=10)
+        synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(Path(tmp) / "cache"),
+                                    backend=backend)
+        to_synthesize = voice_segments[:args.synth_limit] if args.synth_limit else voice_segments
+        _, seconds, latencies = timed_stage(
+            to_synthesize, lambda vs: synth.synthesize(**vs.get_synthesizer_params()))
+        report["synthesize"] = stage_report(len(to_synthesize), seconds, latencies)
+        report["synthesize"]["cache_hit_rate"] = synth.cache.stats.hit_rate
+
+    dialogue = sum(1 for s in segments if s.segment_type == "dialogue")
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": dict(book_options, stub_call_ms=args.stub_call_ms, stub_char_us=args.stub_char_us,
+                       synth_limit=args.synth_limit),
+        "book": {"segments": len(segments), "dialogue_segments": dialogue,
+                 "attributed_segments": sum(1 for s in segments if s.speaker)},
+        "stages": report,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(current, baseline):
+    print(f"\n=== Compared with {baseline.get('commit')} ===")
+    for stage, result in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before or not before.get("items_per_second"):
+            continue
+        change = result["items_per_second"] / before["items_per_second"] - 1
+        p95_before = before["latency"].get("p95_ms")
+        p95_now = result["latency"].get("p95_ms")
+        print(f"{stage:11} throughput {change:+7.1%}   p95 {p95_before:8.3f} -> {p95_now:8.3f} ms")
+    print(f"peak RSS   {baseline.get('peak_rss_mb', 0):.1f} -> {current['peak_rss_mb']:.1f} MB")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="ReadToMe end-to-end benchmarks")
+    arg_parser.add_argument("--words", type=int, default=50_000)
+    arg_parser.add_argument("--dialogue-density", type=float, default=0.4)
+    arg_parser.add_argument("--quote-mix", default="all", help="smart, ascii, mixed, mixed_smart_open or all")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--stub-call-ms", type=float, default=1.0, help="simulated per-call latency")
+    arg_parser.add_argument("--stub-char-us", type=float, default=10.0, help="simulated latency per character")
+    arg_parser.add_argument("--synth-limit", type=int, default=2000, help="segments to synthesize (0 = all)")
+    arg_parser.add_argument("--output", type=Path, help="write results JSON here")
+    arg_parser.add_argument("--compare", type=Path, help="baseline results JSON to compare against")
+    args = arg_parser.parse_args()
+
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    print(text)
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Synthetic novel generator for benchmarks.
+
+Books are built from chapters of paragraphs mixing narration with dialogue
+lines in smart, ASCII and mixed quote styles (as in server/data/sample_text.txt),
+with and without speaker attributions. Output is deterministic for a given seed.
+"""
+
+import random
+from typing import Iterator
+
+NAMES = ["Maya", "Leo", "Susan", "Bob", "Ada", "Tomas", "Iris", "Felix"]
+VERBS = ["said", "asked", "replied", "whispered", "muttered"]
+WORDS = ("the forest path light trees quiet town shortcut lost together branches shoe "
+         "river stone lantern morning cold bright narrow village window door road").split()
+
+QUOTE_STYLES = {
+    "smart": ("“", "”"),
+    "ascii": ('"', '"'),
+    "mixed": ('"', "”"),
+    "mixed_smart_open": ("“", '"'),
+}
+
+
+def _sentence(rng: random.Random, min_words: int = 5, max_words: int = 18) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "!", "?"])
+
+
+def _dialogue(rng: random.Random, quote_mix: str) -> str:
+    style = rng.choice(list(QUOTE_STYLES)) if quote_mix == "all" else quote_mix
+    open_q, close_q = QUOTE_STYLES[style]
+    speech = _sentence(rng, 3, 12)[:-1]
+    name = rng.choice(NAMES)
+    form = rng.random()
+    if form < 0.4:
+        return f"{open_q}{speech},{close_q} {name} {rng.choice(VERBS)}."
+    if form < 0.7:
+        return f"{name} {rng.choice(VERBS)}, {open_q}{speech}.{close_q}"
+    return f"{open_q}{speech}.{close_q}"
+
+
+def iter_book(words: int = 100_000, dialogue_density: float = 0.4, quote_mix: str = "all",
+              paragraphs_per_chapter: int = 30, seed: int = 0) -> Iterator[str]:
+    """
+    Yield a synthetic book chunk by chunk (one paragraph per chunk).
+
+    Args:
+        words: Approximate total word count
+        dialogue_density: Fraction of sentences that are dialogue lines
+        quote_mix: One of QUOTE_STYLES, or "all" for a random mix
+        paragraphs_per_chapter: Paragraphs between chapter headings
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    written = 0
+    paragraph = 0
+    while written < words:
+        if paragraph % paragraphs_per_chapter == 0:
+            yield f"Chapter {paragraph // paragraphs_per_chapter + 1}\n\n"
+        sentences = []
+        for _ in range(rng.randint(2, 6)):
+            sentences.append(_dialogue(rng, quote_mix) if rng.random() < dialogue_density else _sentence(rng))
+        text = " ".join(sentences)
+        written += text.count(" ") + 1
+        paragraph += 1
+        yield text + "\n\n"
+
+
+def make_book(**options) -> str:
+    """Return a whole synthetic book as one string (see iter_book)."""
+    return "".join(iter_book(**options))
@@ -1,16 +1,100 @@
-# This is a sample Python script.
+"""
+HTTP interface for ReadToMe.
 
-# Press Ctrl+F5 to execute it or replace it with your code.
-# Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
+    python server/app.py            # serves on http://127.0.0.1:5000
 
+POST /stream with a JSON body {"text": "...", "first_segments": 3} (or GET
+/stream?text=...) returns a chunked audio/wav response that starts playing
+as soon as the first segment is synthesized. GET /metrics exposes the
+metrics registry in Prometheus text format.
 
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press F9 to toggle the breakpoint.
+POST /jobs with {"text": "...", "tenant": "...", "priority": "interactive"}
+queues a whole book on the background JobService and returns its id;
+GET /jobs/<id> reports its progress and, once done, the audio files.
+"""
 
+import sys
+import os
+from typing import Optional
 
-# Press the green button in the gutter to run the script.
-if __name__ == '__main__':
-    print_hi('PyCharm')
+from flask import Flask, Response, jsonify, request, stream_with_context
 
-# See PyCharm help at https://www.jetbrains.com/help/pycharm/
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer, DEFAULT_PRIORITY_SEGMENTS
+from src.job_service import JobService, PRIORITIES
+from src.metrics import REGISTRY
+
+# Largest request body /stream accepts (about a long chapter)
+MAX_STREAM_TEXT_CHARS = 500_000
+
+
+def create_app(parser: Optional[TextParser] = None, assigner: Optional[VoiceAssigner] = None,
+               synthesizer: Optional[AdaptiveSynthesizer] = None, jobs: Optional[JobService] = None) -> Flask:
+    """
+    Build the Flask app.
+
+    Args:
+        parser: Text parser (default: TextParser())
+        assigner: Voice assigner (default: production voices)
+        synthesizer: Synthesizer (default: production model)
+        jobs: Job service, already started (default: one running in a background thread)
+    """
+    app = Flask(__name__)
+    parser = parser or TextParser()
+    assigner = assigner or VoiceAssigner(development_mode=False)
+    synthesizer = synthesizer or AdaptiveSynthesizer(development_mode=False)
+    if jobs is None:
+        # Its own assigner: request threads use the other one, and both share the assignments journal
+        jobs = JobService(parser, VoiceAssigner(development_mode=False), synthesizer)
+        jobs.start_in_thread()
+
+    @app.route("/stream", methods=["GET", "POST"])
+    def stream():
+        options = request.get_json(silent=True) or request.values
+        text = options.get("text", "")
+        if not text.strip():
+            return jsonify(error="text is required"), 400
+        if len(text) > MAX_STREAM_TEXT_CHARS:
+            return jsonify(error=f"text is longer than {MAX_STREAM_TEXT_CHARS} characters"), 413
+        try:
+            first_segments = int(options.get("first_segments", DEFAULT_PRIORITY_SEGMENTS))
+        except (TypeError, ValueError):
+            return jsonify(error="first_segments must be an integer"), 400
+
+        voice_segments = (assigner.assign_voice(segment) for segment in parser.iter_segments([text]))
+        audio = synthesizer.stream_wav(voice_segments, priority_segments=first_segments)
+        return Response(stream_with_context(audio), mimetype="audio/wav")
+
+    @app.route("/jobs", methods=["POST"])
+    def submit_job():
+        options = request.get_json(silent=True) or request.values
+        text = options.get("text", "")
+        priority = options.get("priority", "bulk")
+        if not text.strip():
+            return jsonify(error="text is required"), 400
+        if priority not in PRIORITIES:
+            return jsonify(error=f"priority must be one of {', '.join(PRIORITIES)}"), 400
+        job = jobs.submit_threadsafe(text, options.get("tenant", "default"), priority)
+        return jsonify(job.to_dict()), 202
+
+    @app.route("/jobs/<job_id>", methods=["GET", "DELETE"])
+    def job_status(job_id):
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify(error="no such job"), 404
+        if request.method == "DELETE":
+            jobs.cancel_threadsafe(job_id)
+        return jsonify(job.to_dict())
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(REGISTRY.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    return app
+
+
+if __name__ == "__main__":
+    create_app().run(host="127.0.0.1", port=5000, threaded=True)
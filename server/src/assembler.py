@@ -0,0 +1,334 @@
+"""
+Streaming audiobook assembly.
+
+Joins the per-segment WAV files written by the synthesizer into one WAV file
+in document order. Segments are read through memory maps and converted in
+fixed-size blocks, and output goes through a fixed-size write buffer, so
+memory use does not grow with the length of the book.
+"""
+
+import mmap
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, Union
+import numpy as np
+from .seek_table import SeekTableWriter, SegmentMark, seek_table_path
+from .utils import get_logger, log_performance_metric
+
+
+# Output buffer flushed to disk whenever it reaches this size
+DEFAULT_BUFFER_BYTES = 1 << 20
+
+# Frames converted per block when resampling or changing format
+DEFAULT_BLOCK_FRAMES = 1 << 16
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_HEADER_SIZE = 44
+
+# Largest data chunk a WAV header can describe: the RIFF size (36 + data) is a uint32
+MAX_WAV_DATA_BYTES = 0xFFFFFFFF - 36
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Sample format of a WAV stream. sample_width 4 means 32-bit float."""
+    sample_rate: int = 22050
+    channels: int = 1
+    sample_width: int = 2
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.sample_width
+
+
+@dataclass
+class WavInfo:
+    """Location and format of the sample data in a WAV file."""
+    format_tag: int
+    channels: int
+    sample_rate: int
+    sample_width: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // (self.channels * self.sample_width)
+
+    @property
+    def dtype(self) -> np.dtype:
+        if self.format_tag == _WAVE_FORMAT_IEEE_FLOAT:
+            return np.dtype("<f4") if self.sample_width == 4 else np.dtype("<f8")
+        return {1: np.dtype("u1"), 2: np.dtype("<i2"), 4: np.dtype("<i4")}[self.sample_width]
+
+
+@dataclass
+class AssemblyStats:
+    """Summary of one assemble() call."""
+    segments: int = 0
+    frames_written: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+    seek_table_path: Optional[Path] = None
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_written / 1e6 / self.seconds if self.seconds else 0.0
+
+
+def read_wav_info(data) -> WavInfo:
+    """Parse the RIFF chunks of a WAV file held in a buffer (e.g. an mmap)."""
+    if data[0:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from("<I", data, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            format_tag, channels, sample_rate = struct.unpack_from("<HHI", data, body)
+            bits = struct.unpack_from("<H", data, body + 14)[0]
+            if format_tag == _WAVE_FORMAT_EXTENSIBLE:
+                format_tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (format_tag, channels, sample_rate, bits // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            # Writers that stream may leave the size unset; clamp to the file
+            size = min(chunk_size, len(data) - body)
+            return WavInfo(*fmt, data_offset=body, data_size=size)
+        offset = body + chunk_size + (chunk_size & 1)
+    raise ValueError("no data chunk found")
+
+
+def wav_header(audio_format: AudioFormat, data_size: int) -> bytes:
+    """
+    44-byte canonical WAV header.
+
+    Raises:
+        ValueError: data_size does not fit the header's 32-bit size fields
+    """
+    if not 0 <= data_size <= MAX_WAV_DATA_BYTES:
+        raise ValueError(f"WAV data size {data_size} is outside 0..{MAX_WAV_DATA_BYTES} (4 GiB limit)")
+    format_tag = _WAVE_FORMAT_IEEE_FLOAT if audio_format.sample_width == 4 else _WAVE_FORMAT_PCM
+    byte_rate = audio_format.sample_rate * audio_format.frame_bytes
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, format_tag, audio_format.channels, audio_format.sample_rate,
+        byte_rate, audio_format.frame_bytes, audio_format.sample_width * 8,
+        b"data", data_size,
+    )
+
+
+class AudiobookAssembler:
+    """
+    Concatenates segment WAV files into a single audiobook WAV.
+
+    Attributes:
+        output_format (AudioFormat): Sample rate, channels and width of the output
+        silence (float or Callable[[int], float]): Seconds of silence after each
+            segment, or a function of the segment index
+        buffer_bytes (int): Size of the write buffer
+        block_frames (int): Frames per conversion block
+    """
+
+    def __init__(self, output_format: AudioFormat = AudioFormat(),
+                 silence: Union[float, Callable[[int], float]] = 0.3,
+                 buffer_bytes: int = DEFAULT_BUFFER_BYTES,
+                 block_frames: int = DEFAULT_BLOCK_FRAMES):
+        if output_format.sample_width not in (2, 4):
+            raise ValueError("output sample_width must be 2 (16-bit PCM) or 4 (32-bit float)")
+        self.output_format = output_format
+        self.silence = silence
+        self.buffer_bytes = buffer_bytes
+        self.block_frames = block_frames
+        self.logger = get_logger(__name__)
+
+    def assemble(self, segment_paths: Iterable[Union[str, Path]], output_path: Union[str, Path],
+                 marks: Optional[Iterable[SegmentMark]] = None) -> AssemblyStats:
+        """
+        Stream segments in order into output_path.
+
+        Args:
+            segment_paths: WAV files in document order (may be a generator)
+            output_path: Destination WAV file
+            marks: Text span and chapter of each segment, in the same order;
+                when given, a seek table is written next to output_path
+
+        Returns:
+            AssemblyStats with sizes and throughput
+
+        Raises:
+            ValueError: the audio would exceed the 4 GiB WAV limit; checked before
+                writing when segment_paths is a sequence, otherwise as soon as the
+                limit is reached (the partial output is removed)
+        """
+        if isinstance(segment_paths, Sequence):
+            expected = self.estimate_bytes(segment_paths)
+            if expected > MAX_WAV_DATA_BYTES:
+                raise ValueError(f"{len(segment_paths)} segments need {expected / 2**30:.2f} GiB of audio, "
+                                 f"more than a WAV file can hold (4 GiB)")
+        start_time = time.time()
+        stats = AssemblyStats()
+        buffer = bytearray()
+        marks = iter(marks) if marks is not None else None
+        seek_table = SeekTableWriter(self.output_format, _HEADER_SIZE) if marks is not None else None
+
+        with open(output_path, "wb") as out:
+            out.write(wav_header(self.output_format, 0))  # sizes patched at the end
+
+            def emit(chunk) -> None:
+                if stats.bytes_written + len(buffer) + len(chunk) > MAX_WAV_DATA_BYTES:
+                    raise ValueError(f"Audio for {output_path} exceeds the 4 GiB WAV limit "
+                                     f"after {stats.segments} segments")
+                buffer.extend(chunk)
+                if len(buffer) >= self.buffer_bytes:
+                    out.write(buffer)
+                    stats.bytes_written += len(buffer)
+                    del buffer[:]
+
+            try:
+                for index, path in enumerate(segment_paths):
+                    frames = self._copy_segment(Path(path), emit, stats)
+                    if seek_table is not None:
+                        mark = next(marks, None)
+                        if mark is None:
+                            raise ValueError(f"marks ended before segment {index}")
+                        seek_table.add(stats.frames_written, frames, mark)
+                    stats.frames_written += frames
+                    stats.frames_written += self._write_silence(self._silence_seconds(index), emit)
+                    stats.segments += 1
+            except BaseException:
+                out.close()
+                Path(output_path).unlink()
+                raise
+
+            out.write(buffer)
+            stats.bytes_written += len(buffer)
+            out.seek(0)
+            out.write(wav_header(self.output_format, stats.bytes_written))
+
+        if seek_table is not None:
+            stats.seek_table_path = seek_table_path(output_path)
+            seek_table.write(stats.seek_table_path)
+        stats.seconds = time.time() - start_time
+        self.logger.info(f"Assembled {stats.segments} segments into {output_path} "
+                         f"({stats.bytes_written / 1e6:.1f} MB in {stats.seconds:.2f}s)")
+        log_performance_metric("assembly_mb_per_second", round(stats.mb_per_second, 1))
+        return stats
+
+    def estimate_bytes(self, segment_paths: Sequence[Union[str, Path]]) -> int:
+        """Size of the data chunk assemble() would write, from the segments' headers."""
+        out_fmt = self.output_format
+        total = 0
+        for index, path in enumerate(segment_paths):
+            path = Path(path)
+            if path.stat().st_size:
+                with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    info = read_wav_info(mm)
+                frames = info.frames
+                if info.sample_rate != out_fmt.sample_rate:
+                    frames = int(round(frames * out_fmt.sample_rate / info.sample_rate))
+                total += frames * out_fmt.frame_bytes
+            total += int(round(self._silence_seconds(index) * out_fmt.sample_rate)) * out_fmt.frame_bytes
+        return total
+
+    def _silence_seconds(self, index: int) -> float:
+        return self.silence(index) if callable(self.silence) else self.silence
+
+    def _write_silence(self, seconds: float, emit) -> int:
+        frames = int(round(seconds * self.output_format.sample_rate))
+        remaining = frames * self.output_format.frame_bytes
+        zeros = bytes(min(remaining, self.buffer_bytes))
+        while remaining > 0:
+            chunk = zeros[:remaining]
+            emit(chunk)
+            remaining -= len(chunk)
+        return frames
+
+    def _copy_segment(self, path: Path, emit, stats: AssemblyStats) -> int:
+        """Append one segment's samples; returns output frames written."""
+        with open(path, "rb") as f:
+            if path.stat().st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                info = read_wav_info(mm)
+                stats.bytes_read += info.data_size
+                out_fmt = self.output_format
+                same_format = (
+                    info.sample_rate == out_fmt.sample_rate
+                    and info.channels == out_fmt.channels
+                    and info.dtype == self._output_dtype()
+                )
+                if same_format:
+                    view = memoryview(mm)
+                    try:
+                        step = self.block_frames * out_fmt.frame_bytes
+                        end = info.data_offset + info.frames * out_fmt.frame_bytes
+                        for start in range(info.data_offset, end, step):
+                            emit(view[start:min(start + step, end)])
+                    finally:
+                        view.release()
+                    return info.frames
+                return self._convert_segment(mm, info, emit)
+
+    def _convert_segment(self, mm, info: WavInfo, emit) -> int:
+        """Resample and convert a segment block by block."""
+        samples = np.frombuffer(mm, dtype=info.dtype, count=info.frames * info.channels,
+                                offset=info.data_offset).reshape(-1, info.channels)
+        out_fmt = self.output_format
+        ratio = info.sample_rate / out_fmt.sample_rate
+        out_frames = int(round(info.frames / ratio))
+        written = 0
+        try:
+            for block_start in range(0, out_frames, self.block_frames):
+                block_end = min(block_start + self.block_frames, out_frames)
+                positions = np.arange(block_start, block_end) * ratio
+                first = int(positions[0])
+                last = min(int(positions[-1]) + 2, info.frames)
+                source = self._to_float(samples[first:last], info)
+                source = self._mix_channels(source, out_fmt.channels)
+                if info.sample_rate == out_fmt.sample_rate:
+                    block = source[:block_end - block_start]
+                else:
+                    local = positions - first
+                    block = np.empty((len(positions), out_fmt.channels), dtype=np.float32)
+                    for channel in range(out_fmt.channels):
+                        block[:, channel] = np.interp(local, np.arange(len(source)), source[:, channel])
+                emit(self._from_float(block).tobytes())
+                written += len(block)
+        finally:
+            del samples  # release the buffer export before the mmap closes
+        return written
+
+    def _output_dtype(self) -> np.dtype:
+        return np.dtype("<f4") if self.output_format.sample_width == 4 else np.dtype("<i2")
+
+    @staticmethod
+    def _to_float(block: np.ndarray, info: WavInfo) -> np.ndarray:
+        if info.format_tag == _WAVE_FORMAT_IEEE_FLOAT:
+            return block.astype(np.float32)
+        if info.sample_width == 1:
+            return (block.astype(np.float32) - 128.0) / 128.0
+        scale = float(2 ** (8 * info.sample_width - 1))
+        return block.astype(np.float32) / scale
+
+    @staticmethod
+    def _mix_channels(block: np.ndarray, channels: int) -> np.ndarray:
+        if block.shape[1] == channels:
+            return block
+        mono = block.mean(axis=1, keepdims=True)
+        return np.repeat(mono, channels, axis=1)
+
+    def _from_float(self, block: np.ndarray) -> np.ndarray:
+        if self.output_format.sample_width == 4:
+            return block.astype("<f4")
+        return (np.clip(block, -1.0, 1.0) * 32767.0).astype("<i2")
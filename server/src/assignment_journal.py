@@ -0,0 +1,214 @@
+"""
+Append-only journal of character -> voice assignments.
+
+Assignments are appended one JSON line at a time to `<snapshot>.journal`
+under an exclusive file lock, and periodically compacted into the JSON
+snapshot (the original voice_assignments.json format). Several processes
+can share the same files: each record() first replays whatever the others
+appended, and the first assignment recorded for a character wins, so
+parallel book jobs agree on voices without losing updates. A deliberate
+voice change goes through reassign() instead, which is journaled as an
+overwrite: the last reassignment wins.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+from .utils import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Journal lines appended before record() compacts them into the snapshot
+DEFAULT_COMPACT_EVERY = 1000
+
+
+class AssignmentJournal:
+    """
+    Process-safe store of character -> voice_id assignments.
+
+    Attributes:
+        snapshot_path (Path): Compacted JSON object of all assignments
+        journal_path (Path): JSON lines appended since the last compaction
+        compact_every (int): Journal length that triggers compaction
+    """
+
+    def __init__(self, snapshot_path: Union[str, Path], compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_name(self.snapshot_path.name + ".journal")
+        self.lock_path = self.snapshot_path.with_name(self.snapshot_path.name + ".lock")
+        self.compact_every = compact_every
+        self.logger = get_logger(__name__)
+        self._assignments: Dict[str, str] = {}
+        self._snapshot_signature: Optional[Tuple[int, int, int]] = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def load(self) -> Dict[str, str]:
+        """Replay the snapshot and journal; returns a copy of all assignments."""
+        with self._locked(exclusive=False):
+            self._refresh()
+            return dict(self._assignments)
+
+    def record(self, character: str, voice_id: str) -> str:
+        """
+        Record an assignment unless another writer got there first.
+
+        Returns:
+            str: The voice_id that is now on record for the character
+        """
+        with self._locked(exclusive=True):
+            self._refresh()
+            existing = self._assignments.get(character)
+            if existing is not None:
+                return existing
+            self._append({"character": character, "voice_id": voice_id})
+            return voice_id
+
+    def reassign(self, character: str, voice_id: str, expected: Optional[str] = None) -> str:
+        """
+        Change a character's voice, replacing what is on record.
+
+        Args:
+            character: Character name
+            voice_id: New voice
+            expected: Only replace this voice_id (compare-and-set); if another
+                writer changed the record since, theirs is kept. None replaces
+                unconditionally (last writer wins).
+
+        Returns:
+            str: The voice_id that is now on record for the character
+        """
+        with self._locked(exclusive=True):
+            self._refresh()
+            existing = self._assignments.get(character)
+            if existing == voice_id:
+                return voice_id
+            if expected is not None and existing != expected:
+                return existing
+            self._append({"character": character, "voice_id": voice_id, "op": "set"})
+            return voice_id
+
+    def _append(self, entry: Dict[str, str]) -> None:
+        # Caller holds the exclusive lock and has refreshed
+        line = json.dumps(entry) + "\n"
+        with open(self.journal_path, "ab") as f:
+            f.write(line.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self._journal_offset = f.tell()
+        self._assignments[entry["character"]] = entry["voice_id"]
+        self._journal_entries += 1
+        if self._journal_entries >= self.compact_every:
+            self._compact()
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot and start a new, empty journal."""
+        with self._locked(exclusive=True):
+            self._refresh()
+            self._compact()
+
+    def _compact(self) -> None:
+        # Snapshot first: a crash between the two steps only leaves duplicate entries
+        self._write_atomic(self.snapshot_path, json.dumps(self._assignments, indent=2, sort_keys=True))
+        self._write_atomic(self.journal_path, "")
+        self._snapshot_signature = self._signature(self.snapshot_path)
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self.logger.info(f"Compacted {len(self._assignments)} voice assignments into {self.snapshot_path}")
+
+    def _refresh(self) -> None:
+        """Bring the in-memory view up to date, reading only what changed."""
+        signature = self._signature(self.snapshot_path)
+        if signature != self._snapshot_signature:
+            # First load, or another process compacted: start over from the snapshot
+            self._assignments = self._read_snapshot()
+            self._snapshot_signature = signature
+            self._journal_offset = 0
+            self._journal_entries = 0
+        self._replay_journal()
+
+    def _read_snapshot(self) -> Dict[str, str]:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return {}
+        return json.loads(content) if content.strip() else {}
+
+    def _replay_journal(self) -> None:
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            if os.fstat(f.fileno()).st_size < self._journal_offset:
+                # Journal was replaced by a compaction we have not seen the snapshot of
+                self._journal_offset = 0
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line from a writer that crashed mid-append
+                self._journal_offset += len(line)
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("op") == "set":
+                    self._assignments[entry["character"]] = entry["voice_id"]
+                else:
+                    self._assignments.setdefault(entry["character"], entry["voice_id"])
+                self._journal_entries += 1
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+b") as lock_file:
+            fd = lock_file.fileno()
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                # msvcrt has no shared locks; LK_LOCK gives up after ~10s, so keep trying
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,175 @@
+"""
+Durable progress manifest for long synthesis jobs.
+
+Each finished segment is appended as one JSON line (segment index, a key of
+its synthesis parameters, audio path, size and digest) to a per-job
+manifest, with an fsync every few hundred records, so checkpointing costs
+one small write per segment. A restarted job replays the manifest, keeps
+only entries whose key still matches the segment at that index and whose
+audio file is intact, and synthesizes the rest. Sizes are checked for every
+entry; full digests only for the most recent ones, which are the files a
+crash can have left half written. Resuming a 100k-segment book reads one
+file and stats the audio, which takes seconds.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Union
+from .utils import get_logger
+
+
+# Bumped when the line format changes; older manifests are started over
+MANIFEST_VERSION = 1
+
+# Records appended between fsyncs
+DEFAULT_SYNC_EVERY = 256
+
+# Most recent records whose audio is re-hashed on resume
+DEFAULT_VERIFY_TAIL = 64
+
+
+@dataclass
+class CheckpointEntry:
+    """One finished segment."""
+    index: int
+    key: str      # segment_key() of the parameters it was synthesized with
+    path: str
+    size: int
+    digest: str
+
+
+def segment_key(text: str, voice_type: str, model_name: str) -> str:
+    """Short digest identifying what a segment was synthesized from."""
+    data = f"{model_name}\0{voice_type}\0{text}".encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class SynthesisCheckpoint:
+    """
+    Append-only JSON-lines manifest of finished segments for one job.
+
+    Attributes:
+        path (Path): Manifest file
+        sync_every (int): Records appended between fsyncs
+        verify_tail (int): Most recent records whose audio digest is checked on resume
+    """
+
+    def __init__(self, path: Union[str, Path], sync_every: int = DEFAULT_SYNC_EVERY,
+                 verify_tail: int = DEFAULT_VERIFY_TAIL):
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.verify_tail = verify_tail
+        self.logger = get_logger(__name__)
+        self._file: Optional[BinaryIO] = None
+        self._unsynced = 0
+
+    def __enter__(self) -> "SynthesisCheckpoint":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def load(self) -> List[CheckpointEntry]:
+        """
+        Entries in the order they were recorded, without verification.
+
+        A partial last line (the process died mid-write) is cut off so new
+        records start on a fresh line; a manifest of another version is
+        discarded.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        complete = data.rfind(b"\n") + 1
+        lines = data[:complete].splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else None
+        except json.JSONDecodeError:
+            header = None
+        if not header or header.get("version") != MANIFEST_VERSION:
+            self.logger.warning(f"Starting over: {self.path} is not a version {MANIFEST_VERSION} manifest")
+            self._truncate(0)
+            return []
+        if complete < len(data):
+            self._truncate(complete)
+        return [CheckpointEntry(**json.loads(line)) for line in lines[1:] if line.strip()]
+
+    def resume(self, keys: Sequence[str]) -> Dict[int, CheckpointEntry]:
+        """
+        Finished segments that can be reused.
+
+        Args:
+            keys: segment_key() of every segment of the job, by index
+
+        Returns:
+            Valid entries by segment index; an entry is valid if its key matches,
+            its audio file has the recorded size, and (for the most recent
+            verify_tail entries) the recorded digest
+        """
+        entries = self.load()
+        latest: Dict[int, CheckpointEntry] = {}
+        for entry in entries:
+            latest[entry.index] = entry  # a segment recorded twice: the later record wins
+        tail = {id(entry) for entry in entries[-self.verify_tail:]} if self.verify_tail else set()
+
+        valid: Dict[int, CheckpointEntry] = {}
+        for index, entry in latest.items():
+            if index >= len(keys) or keys[index] != entry.key:
+                continue
+            try:
+                if os.stat(entry.path).st_size != entry.size:
+                    continue
+            except OSError:
+                continue
+            if id(entry) in tail and file_digest(entry.path) != entry.digest:
+                continue
+            valid[index] = entry
+        self.logger.info(f"Checkpoint {self.path.name}: {len(valid)} of {len(keys)} segments done "
+                         f"({len(latest) - len(valid)} recorded entries discarded)")
+        return valid
+
+    def record(self, index: int, key: str, path: Union[str, Path]) -> CheckpointEntry:
+        """Append a finished segment (fsynced every sync_every records)."""
+        path = str(path)
+        entry = CheckpointEntry(index, key, path, os.stat(path).st_size, file_digest(path))
+        f = self._open()
+        f.write(json.dumps(asdict(entry), separators=(",", ":")).encode("utf-8") + b"\n")
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+        return entry
+
+    def sync(self) -> None:
+        """Flush recorded entries to disk."""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> BinaryIO:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+            if self._file.tell() == 0:
+                self._file.write(json.dumps({"version": MANIFEST_VERSION}).encode("utf-8") + b"\n")
+        return self._file
+
+    def _truncate(self, size: int) -> None:
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
@@ -0,0 +1,209 @@
+"""
+Character-name gazetteer and look-back speaker resolution.
+
+While a book is parsed, names are collected from explicit attributions
+("Bob said") and from capitalized words that keep recurring mid-sentence
+in narration. The names are matched with an Aho-Corasick automaton, so
+finding every known name in a segment is one pass over its text no matter
+how many characters the book has.
+
+Dialogue without an attribution is then resolved from its own narration
+("Susan laughed. “Fine.”"), from the most recent name in the last few
+segments, or from the turn-taking of the conversation. Each segment is
+scanned once, so resolution is linear in the length of the book.
+"""
+
+import re
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# Segments looked back over when resolving an unattributed line
+DEFAULT_LOOKBACK = 3
+
+# Mid-sentence capitalized mentions needed before a word counts as a name
+DEFAULT_MIN_MENTIONS = 3
+
+# Quoted speech in any double-quote style; names inside are addressees, not speakers
+_QUOTED_RE = re.compile(r'["“][^"“”]*["”]')
+
+# Capitalized words (optionally two, as in "Aunt Maya") that are not sentence-initial
+_MENTION_RE = re.compile(r'(?<=[a-z,;:] )[A-Z][a-z]+(?: [A-Z][a-z]+)?')
+
+# Capitalized words that are never character names
+STOPWORDS = frozenset("""
+    I A The He She It They We You His Her Its Their Our Your My Me Him Them Us
+    This That These Those There Here Then When Where What Why How Who Which
+    But And Or So Yet If As At In On Of To For From With By Not No Yes Oh Ah
+    Mr Mrs Ms Dr Sir Madam Miss Lord Lady Chapter Part Book
+    Monday Tuesday Wednesday Thursday Friday Saturday Sunday
+    January February March April May June July August September October November December
+    God Christmas English French
+""".split())
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher: finds every added word in one pass over a text.
+
+    Words can be added at any time; the failure links are rebuilt lazily on
+    the next search.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._word: List[Optional[str]] = [None]  # word ending at each state
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        self._built = True
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._word.append(None)
+            state = next_state
+        self._word[state] = word
+        self._built = False
+
+    def _build(self) -> None:
+        """Breadth-first pass computing failure links and the words output at each state."""
+        goto, words = self._goto, self._word
+        fail = [0] * len(goto)
+        output: List[Tuple[str, ...]] = [()] * len(goto)
+        queue = deque()
+        for state in goto[0].values():
+            output[state] = (words[state],) if words[state] else ()
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[next_state] = goto[link].get(char, 0)
+                own = (words[next_state],) if words[next_state] else ()
+                output[next_state] = own + output[fail[next_state]]
+                queue.append(next_state)
+        self._fail, self._output = fail, output
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, word) for every occurrence of every word, in end order."""
+        if not self._built:
+            self._build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for word in output[state]:
+                yield index + 1 - len(word), index + 1, word
+
+
+class CharacterGazetteer:
+    """
+    Character names seen so far in a book.
+
+    Attributes:
+        min_mentions (int): Capitalized mentions before a word becomes a name
+        names (Set[str]): Known character names
+    """
+
+    def __init__(self, min_mentions: int = DEFAULT_MIN_MENTIONS):
+        self.min_mentions = min_mentions
+        self.names: Set[str] = set()
+        self._mentions: Dict[str, int] = {}
+        self._automaton = AhoCorasick()
+
+    def add(self, name: str) -> None:
+        """Record a name (e.g. from an explicit attribution)."""
+        if name in self.names or not name[:1].isupper() or name in STOPWORDS:
+            return
+        self.names.add(name)
+        self._automaton.add(name)
+
+    def observe(self, narration: str) -> None:
+        """Count capitalized mid-sentence words; frequent ones become names."""
+        for mention in _MENTION_RE.findall(narration):
+            first = mention.split(" ", 1)[0]
+            if first in STOPWORDS or mention in self.names:
+                continue
+            count = self._mentions.get(mention, 0) + 1
+            self._mentions[mention] = count
+            if count >= self.min_mentions:
+                self.add(mention)
+
+    def find(self, text: str) -> List[str]:
+        """Known names in text, in order of appearance (whole words only)."""
+        found = []
+        last_end = -1
+        for start, end, name in sorted(self._automaton.iter_matches(text), key=lambda m: (m[0], -m[1])):
+            if start < last_end:
+                continue  # inside a longer name already taken
+            if (start and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                continue
+            found.append(name)
+            last_end = end
+        return found
+
+
+class SpeakerResolver:
+    """
+    Fills in the speaker of unattributed dialogue, one segment at a time.
+
+    Attributes:
+        gazetteer (CharacterGazetteer): Names collected so far
+        lookback (int): Previous segments considered
+    """
+
+    def __init__(self, gazetteer: Optional[CharacterGazetteer] = None, lookback: int = DEFAULT_LOOKBACK):
+        self.gazetteer = gazetteer or CharacterGazetteer()
+        self.lookback = lookback
+        # (segment_type, speaker, last name mentioned in its narration) for recent segments
+        self._recent: Deque[Tuple[str, Optional[str], Optional[str]]] = deque(maxlen=lookback)
+
+    def resolve(self, sentence: str, segment_type: str, speaker: Optional[str]) -> Optional[str]:
+        """
+        Speaker for a classified sentence, learning names as it goes.
+
+        Args:
+            sentence: Segment text
+            segment_type: "dialogue" or "narrative"
+            speaker: Speaker found by the attribution patterns, if any
+
+        Returns:
+            The given speaker, or one resolved from the gazetteer and look-back window
+        """
+        if speaker is not None:
+            self.gazetteer.add(speaker)
+        narration = _QUOTED_RE.sub(" ", sentence) if segment_type == "dialogue" else sentence
+        self.gazetteer.observe(narration)
+        names = self.gazetteer.find(narration)
+
+        if segment_type == "dialogue" and speaker is None:
+            speaker = self._from_context(names)
+        self._recent.append((segment_type, speaker, names[-1] if names else None))
+        return speaker
+
+    def _from_context(self, names: List[str]) -> Optional[str]:
+        if names:
+            return names[0]  # "Susan laughed. “Fine.”"
+        recent = list(self._recent)
+        # Turn-taking: A speaks, B answers, the unattributed line is A again
+        if len(recent) >= 2 and recent[-1][0] == recent[-2][0] == "dialogue":
+            previous, last = recent[-2][1], recent[-1][1]
+            if previous and last and previous != last:
+                return previous
+        # Otherwise the character the narration just mentioned
+        for kind, _, mentioned in reversed(recent):
+            if kind == "narrative" and mentioned:
+                return mentioned
+        return None
@@ -0,0 +1,313 @@
+"""
+Incremental re-parse and re-synthesis of edited manuscripts.
+
+The book is fingerprinted paragraph by paragraph and the fingerprints of a
+new revision are diffed (difflib) against the ones stored for the previous
+build. Only paragraphs in changed regions are parsed again, and only
+segments whose text, voice or model changed are synthesized; everything
+else reuses the audio recorded in the manifest. A typo fix in chapter 12
+costs one paragraph of parsing and a sentence or two of synthesis.
+
+Segments of unchanged paragraphs keep their recorded voice and audio as
+long as their speaker and that speaker's voice are the same; voices are
+looked up once per speaker (as VoiceAssigner.assign_table does) and their
+audio files are not checked again. The manifest is an append-only JSON-lines
+log, like the synthesis checkpoint: a build appends the paragraphs it parsed
+or whose segments changed, then the new paragraph order as runs of record
+ids, so an edit writes a few lines rather than the whole book. The log is
+rewritten once it holds more dead records than live ones.
+
+Paragraph breaks are always segment breaks here, so a heading without
+final punctuation is its own segment rather than being joined to the next
+sentence as parse_text would. Speaker resolution (TextParser's
+resolve_speakers) depends on everything before a segment, so it is run
+again over the whole book on every build, from the speakers the
+attribution patterns found; an edit can change who speaks an unchanged
+line further on.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from .parser import TextParser, TextSegment, _PARAGRAPH_BREAK_RE
+from .voice_assigner import VoiceAssigner, VoiceProfile, VoiceSegment
+from .synthesizer import AdaptiveSynthesizer, DEFAULT_BATCH_SIZE
+from .utils import get_logger, log_performance_metric
+
+
+# Bumped when the manifest layout changes; older manifests trigger a full rebuild
+MANIFEST_VERSION = 3
+
+# Manifest records (live and dead) per live paragraph before the log is rewritten
+MANIFEST_COMPACT_RATIO = 2
+
+
+@dataclass
+class SegmentRecord:
+    """One parsed segment and the audio rendered for it."""
+    content: str
+    segment_type: str
+    speaker: Optional[str]
+    confidence: float
+    voice_id: Optional[str] = None
+    model: Optional[str] = None        # model that rendered the audio
+    audio: Optional[str] = None
+    attributed: Optional[str] = None   # speaker found by the attribution patterns, before resolution
+
+
+@dataclass
+class ParagraphRecord:
+    """Fingerprint of a cleaned paragraph and the segments parsed from it."""
+    fingerprint: str
+    segments: List[SegmentRecord]
+    record_id: int = -1   # id of its line in the manifest; -1 until (re)written
+
+
+@dataclass
+class IncrementalResult:
+    """Outcome of one IncrementalBuilder.build() call."""
+    voice_segments: List[VoiceSegment]
+    audio_paths: List[Path]
+    paragraphs_parsed: int = 0
+    paragraphs_reused: int = 0
+    segments_synthesized: int = 0
+    segments_reused: int = 0
+    seconds: float = 0.0
+
+
+def fingerprint(text: str) -> str:
+    """Stable fingerprint of a paragraph."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class IncrementalBuilder:
+    """
+    Builds a book's audio, redoing only the work an edit invalidated.
+
+    Attributes:
+        parser (TextParser): Parses changed paragraphs
+        assigner (VoiceAssigner): Assigns voices to every segment
+        synthesizer (AdaptiveSynthesizer): Renders new or changed segments
+        manifest_path (Path): JSON record of the last build of this book
+    """
+
+    def __init__(self, parser: TextParser, assigner: VoiceAssigner, synthesizer: AdaptiveSynthesizer,
+                 manifest_path: Union[str, Path]):
+        self.parser = parser
+        self.assigner = assigner
+        self.synthesizer = synthesizer
+        self.manifest_path = Path(manifest_path)
+        self.logger = get_logger(__name__)
+        self._next_record_id = 0
+        self._logged_records = 0
+
+    def build(self, text: str) -> IncrementalResult:
+        """
+        Bring the book's audio up to date with a new revision of its text.
+
+        Args:
+            text: Full text of the new revision
+
+        Returns:
+            IncrementalResult with voice segments and audio paths in document order
+        """
+        start_time = time.time()
+        paragraphs = self.split_paragraphs(text)
+        new_fingerprints = [fingerprint(paragraph) for paragraph in paragraphs]
+        previous = self.load_manifest()
+        old_fingerprints = [record.fingerprint for record in previous]
+
+        result = IncrementalResult([], [])
+        records: List[ParagraphRecord] = []
+        matcher = difflib.SequenceMatcher(None, old_fingerprints, new_fingerprints, autojunk=False)
+        for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+            if tag == "equal":
+                records.extend(previous[old_start:old_end])
+                result.paragraphs_reused += old_end - old_start
+                continue
+            for index in range(new_start, new_end):
+                records.append(ParagraphRecord(new_fingerprints[index], self._parse_paragraph(paragraphs[index])))
+            result.paragraphs_parsed += new_end - new_start
+
+        # Audio already rendered, by (text, voice, model); edited paragraphs often keep most sentences
+        rendered: Dict[Tuple[str, Optional[str], Optional[str]], str] = {}
+        for record in previous:
+            for segment in record.segments:
+                if segment.audio:
+                    rendered[(segment.content, segment.voice_id, segment.model)] = segment.audio
+
+        synthesizer = self.synthesizer
+        model = synthesizer.selector.preferred if synthesizer.selector is not None else synthesizer.model_name
+        resolver = self.parser._new_resolver()
+        voices: Dict[Optional[str], VoiceProfile] = {}
+        pending: Dict[Tuple[str, Optional[str]], List[int]] = {}  # (text, voice) -> segment indices
+        to_render: List[VoiceSegment] = []
+        for record in records:
+            carried = record.record_id >= 0
+            for segment in record.segments:
+                speaker = segment.attributed
+                if resolver is not None:
+                    speaker = resolver.resolve(segment.content, segment.segment_type, segment.attributed)
+                text_segment = TextSegment(segment.content, segment.segment_type, speaker, segment.confidence)
+                voice = voices.get(speaker)
+                if voice is None:
+                    voice = voices[speaker] = self.assigner.assign_voice(text_segment).voice_profile
+                voice_segment = VoiceSegment(text_segment, voice)
+                result.voice_segments.append(voice_segment)
+
+                if carried and speaker == segment.speaker and voice.voice_id == segment.voice_id \
+                        and segment.model == model:
+                    result.audio_paths.append(Path(segment.audio))
+                    result.segments_reused += 1
+                    continue
+                # New or changed segment: its paragraph goes back into the manifest
+                record.record_id = -1
+                segment.speaker = speaker
+                segment.voice_id = voice.voice_id
+                audio = rendered.get((segment.content, voice.voice_id, model))
+                if audio is not None and os.path.exists(audio):
+                    segment.model = model
+                    segment.audio = audio
+                    result.audio_paths.append(Path(audio))
+                    result.segments_reused += 1
+                    continue
+                key = (segment.content, voice.voice_id)
+                if key not in pending:
+                    pending[key] = []
+                    to_render.append(voice_segment)
+                pending[key].append(len(result.audio_paths))
+                result.audio_paths.append(None)
+
+        if to_render:
+            # The selector may render with a fallback model; record the one that was used
+            paths, rendered_by = synthesizer._synthesize_batch(to_render, DEFAULT_BATCH_SIZE, None)
+            segments = [segment for record in records for segment in record.segments]
+            for indices, path in zip(pending.values(), paths):
+                for index in indices:
+                    segments[index].model = rendered_by
+                    segments[index].audio = str(path)
+                    result.audio_paths[index] = Path(path)
+            result.segments_synthesized = len(to_render)
+            result.segments_reused += sum(len(indices) for indices in pending.values()) - len(to_render)
+
+        self.save_manifest(records)
+        result.seconds = time.time() - start_time
+        self.logger.info(f"Incremental build: parsed {result.paragraphs_parsed} paragraphs "
+                         f"(reused {result.paragraphs_reused}), synthesized {result.segments_synthesized} "
+                         f"segments (reused {result.segments_reused}) in {result.seconds:.2f}s")
+        log_performance_metric("incremental_segments_synthesized", result.segments_synthesized)
+        return result
+
+    def split_paragraphs(self, text: str) -> List[str]:
+        """Cleaned, non-empty paragraphs of text."""
+        paragraphs = (self.parser._clean_text(block) for block in _PARAGRAPH_BREAK_RE.split(text))
+        return [paragraph for paragraph in paragraphs if paragraph]
+
+    def load_manifest(self) -> List[ParagraphRecord]:
+        """
+        Paragraph records of the previous build, in order (empty if there is none).
+
+        A partial last line (the process died mid-write) is cut off; records
+        appended after the last paragraph order belong to an unfinished build
+        and are ignored.
+        """
+        self._next_record_id = self._logged_records = 0
+        try:
+            with open(self.manifest_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        complete = data.rfind(b"\n") + 1
+        try:
+            lines = [json.loads(line) for line in data[:complete].splitlines() if line.strip()]
+        except json.JSONDecodeError:
+            lines = []
+        if not lines or not isinstance(lines[0], dict) or lines[0].get("version") != MANIFEST_VERSION:
+            self.logger.warning(f"Ignoring manifest {self.manifest_path} of another version; rebuilding")
+            os.remove(self.manifest_path)
+            return []
+        if complete < len(data):
+            with open(self.manifest_path, "r+b") as f:
+                f.truncate(complete)
+
+        records: Dict[int, ParagraphRecord] = {}
+        order: List[List[int]] = []
+        for line in lines[1:]:
+            if "order" in line:
+                order = line["order"]
+                continue
+            records[line["record_id"]] = ParagraphRecord(
+                line["fingerprint"], [SegmentRecord(**s) for s in line["segments"]], line["record_id"])
+        self._next_record_id = max(records, default=-1) + 1
+        self._logged_records = len(lines) - 1
+        try:
+            return [records[record_id] for first, count in order for record_id in range(first, first + count)]
+        except KeyError:
+            self.logger.warning(f"Manifest {self.manifest_path} refers to missing records; rebuilding")
+            return []
+
+    def save_manifest(self, records: List[ParagraphRecord]) -> None:
+        """Append the records without an id and the new paragraph order, or rewrite the log."""
+        changed = [record for record in records if record.record_id < 0]
+        if self._logged_records + len(changed) + 1 > MANIFEST_COMPACT_RATIO * (len(records) + 1):
+            self._rewrite_manifest(records)
+            return
+        lines = []
+        for record in changed:
+            record.record_id = self._next_record_id
+            self._next_record_id += 1
+            lines.append(_dump_line(asdict(record)))
+        lines.append(_dump_line({"order": _id_runs(records)}))
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "ab") as f:
+            if f.tell() == 0:
+                f.write(_dump_line({"version": MANIFEST_VERSION}))
+            f.write(b"".join(lines))
+        self._logged_records += len(lines)
+
+    def _rewrite_manifest(self, records: List[ParagraphRecord]) -> None:
+        for record_id, record in enumerate(records):
+            record.record_id = record_id
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.manifest_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_dump_line({"version": MANIFEST_VERSION}))
+                for record in records:
+                    f.write(_dump_line(asdict(record)))
+                f.write(_dump_line({"order": _id_runs(records)}))
+            os.replace(temp_path, self.manifest_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._next_record_id = len(records)
+        self._logged_records = len(records) + 1
+
+    def _parse_paragraph(self, paragraph: str) -> List[SegmentRecord]:
+        records = []
+        for sentence in self.parser._split_sentences(paragraph):
+            segment_type, speaker, confidence = self.parser._classify(sentence)
+            records.append(SegmentRecord(sentence, segment_type, speaker, confidence, attributed=speaker))
+        return records
+
+
+def _dump_line(data) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _id_runs(records: List[ParagraphRecord]) -> List[List[int]]:
+    """Record ids in order as [first id, count] runs; unchanged stretches stay one run."""
+    runs: List[List[int]] = []
+    for record in records:
+        if runs and runs[-1][0] + runs[-1][1] == record.record_id:
+            runs[-1][1] += 1
+        else:
+            runs.append([record.record_id, 1])
+    return runs
@@ -0,0 +1,324 @@
+"""
+Book ingestion: lazy text from .txt and .epub files for TextParser.iter_segments.
+
+Plain text files are memory-mapped and decoded incrementally, with the
+encoding detected from a small sample at the start of the file (BOM, then
+UTF-8, then chardet); a sample that is plain ASCII decides nothing, so the
+encoding is detected again where the first non-UTF-8 byte turns up. EPUBs are opened as zip archives; the package
+document gives the reading order (spine), and each chapter's XHTML is
+decompressed, decoded and stripped of markup in fixed-size pieces with a
+streaming HTML parser. Parsing can start on the first chapter before the
+rest of the book has been read, and memory per chapter is bounded by the
+piece size rather than the chapter or book size.
+
+    parser = TextParser()
+    for segment in parser.iter_segments(iter_book_text("book.epub")):
+        ...
+"""
+
+import codecs
+import mmap
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Union
+from .utils import get_logger
+
+
+# Bytes decoded per piece
+DEFAULT_CHUNK_BYTES = 1 << 16
+
+# Bytes looked at to detect an encoding
+DEFAULT_SAMPLE_BYTES = 1 << 15
+
+# Used when the sample is not UTF-8 and chardet is unavailable or unsure
+FALLBACK_ENCODING = "cp1252"
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# encoding="..." in an XML declaration
+_XML_ENCODING_RE = re.compile(rb'^<\?xml[^>]*encoding=["\']([A-Za-z0-9._-]+)["\']')
+
+_CONTAINER_NS = {"c": "urn:oasis:names:tc:opendocument:xmlns:container"}
+_OPF_NS = {"opf": "http://www.idpf.org/2007/opf", "dc": "http://purl.org/dc/elements/1.1/"}
+
+# Tags whose end starts a new paragraph in the extracted text
+_BLOCK_TAGS = frozenset("""
+    p div br hr h1 h2 h3 h4 h5 h6 li dt dd blockquote section article header footer
+    aside nav pre table tr figcaption
+""".split())
+
+# Tags whose content is not read aloud
+_SKIPPED_TAGS = frozenset(("head", "script", "style", "svg", "math"))
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Guess the encoding of a file from its first bytes.
+
+    A byte order mark wins; otherwise UTF-8 is accepted if the sample decodes
+    (a character cut off at the end of the sample is fine), and anything else
+    is left to chardet.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        import chardet
+    except ImportError:
+        return FALLBACK_ENCODING
+    guess = chardet.detect(sample)
+    encoding = guess.get("encoding")
+    if not encoding or (guess.get("confidence") or 0) < 0.5:
+        return FALLBACK_ENCODING
+    return encoding
+
+
+def iter_decoded(stream: BinaryIO, encoding: Optional[str] = None,
+                 chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 sample_bytes: int = DEFAULT_SAMPLE_BYTES) -> Iterator[str]:
+    """
+    Decode a binary stream piece by piece.
+
+    Args:
+        stream: Readable binary stream
+        encoding: Known encoding (default: detect from the first sample_bytes)
+        chunk_bytes: Bytes read per piece
+        sample_bytes: Bytes used for detection
+
+    Yields:
+        Decoded text pieces; undecodable bytes become U+FFFD
+    """
+    first = stream.read(max(chunk_bytes, sample_bytes) if encoding is None else chunk_bytes)
+    # An ASCII-only sample looks like UTF-8 whatever the file is; decode strictly until proven
+    provisional = encoding is None and first[:sample_bytes].isascii()
+    if encoding is None:
+        encoding = detect_encoding(first[:sample_bytes])
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict" if provisional else "replace")
+    data = first
+    while data:
+        if provisional:
+            buffered = decoder.getstate()[0]
+            try:
+                text = decoder.decode(data)
+            except UnicodeDecodeError as error:
+                # Not UTF-8 after all: detect again from the first byte that failed
+                data = buffered + data
+                encoding = detect_encoding(data[error.start:error.start + sample_bytes])
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                text = decoder.decode(data)
+                provisional = False
+        else:
+            text = decoder.decode(data)
+        if text:
+            yield text
+        data = stream.read(chunk_bytes)
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def iter_text_file(path: Union[str, Path], encoding: Optional[str] = None,
+                   chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[str]:
+    """Memory-map a text file and yield it decoded, chunk by chunk."""
+    with open(path, "rb") as f:
+        if Path(path).stat().st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter_decoded(mm, encoding, chunk_bytes)
+
+
+class XHTMLTextExtractor(HTMLParser):
+    """
+    Streaming markup stripper: feed() XHTML pieces, take() the text so far.
+
+    Block-level elements become paragraph breaks; head, script and style
+    content is dropped; entities are decoded.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._pieces: List[str] = []
+        self._skip_depth = 0
+
+    def take(self) -> str:
+        """Text extracted since the last call."""
+        text = "".join(self._pieces)
+        self._pieces.clear()
+        return text
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS and not self._skip_depth:
+            self._pieces.append("\n\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS and not self._skip_depth:
+            self._pieces.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in _BLOCK_TAGS and not self._skip_depth:
+            self._pieces.append("\n\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._pieces.append(data)
+
+
+@dataclass
+class EpubChapter:
+    """One spine item of an EPUB."""
+    index: int
+    href: str          # path of the XHTML document inside the archive
+    book: "EpubBook"
+
+    def iter_text(self, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[str]:
+        """The chapter's text without markup, in pieces."""
+        return self.book._iter_document(self.href, chunk_bytes)
+
+    def text(self) -> str:
+        return "".join(self.iter_text())
+
+
+class EpubBook:
+    """
+    An EPUB read lazily from its zip archive.
+
+    Attributes:
+        path (Path): The .epub file
+        title (Optional[str]): dc:title from the package document
+        spine (List[str]): Archive paths of the chapter documents in reading order
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.logger = get_logger(__name__)
+        self._zip = zipfile.ZipFile(self.path)
+        try:
+            self.title, self.spine = self._read_package()
+        except BaseException:
+            self._zip.close()
+            raise
+
+    def __enter__(self) -> "EpubBook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def chapters(self) -> Iterator[EpubChapter]:
+        """Chapters in spine order; nothing is decompressed until a chapter is read."""
+        for index, href in enumerate(self.spine):
+            yield EpubChapter(index, href, self)
+
+    def iter_text(self, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[str]:
+        """The whole book's text, chapter after chapter, separated by paragraph breaks."""
+        for chapter in self.chapters():
+            yield from chapter.iter_text(chunk_bytes)
+            yield "\n\n"
+
+    def _read_package(self):
+        """Title and spine from META-INF/container.xml and the OPF package document."""
+        try:
+            container = ElementTree.fromstring(self._zip.read("META-INF/container.xml"))
+        except KeyError:
+            raise ValueError(f"{self.path} is not an EPUB: META-INF/container.xml is missing")
+        rootfile = container.find("c:rootfiles/c:rootfile", _CONTAINER_NS)
+        if rootfile is None or not rootfile.get("full-path"):
+            raise ValueError(f"{self.path} has no package document")
+        opf_path = rootfile.get("full-path")
+        package = ElementTree.fromstring(self._zip.read(opf_path))
+        base = posixpath.dirname(opf_path)
+
+        manifest = {}
+        for item in package.findall("opf:manifest/opf:item", _OPF_NS):
+            manifest[item.get("id")] = (posixpath.normpath(posixpath.join(base, item.get("href", ""))),
+                                        item.get("media-type", ""))
+        spine = []
+        for itemref in package.findall("opf:spine/opf:itemref", _OPF_NS):
+            href, media_type = manifest.get(itemref.get("idref"), (None, None))
+            if href is None:
+                self.logger.warning(f"{self.path}: spine item {itemref.get('idref')!r} is not in the manifest")
+                continue
+            if itemref.get("linear") == "no" or "html" not in media_type:
+                continue  # covers, footnote pop-ups and images are not read aloud
+            spine.append(href)
+        title = package.findtext("opf:metadata/dc:title", default=None, namespaces=_OPF_NS)
+        return title, spine
+
+    def _iter_document(self, href: str, chunk_bytes: int) -> Iterator[str]:
+        extractor = XHTMLTextExtractor()
+        with self._zip.open(href) as member:
+            head = member.read(chunk_bytes)
+            declared = _XML_ENCODING_RE.match(head)
+            # XHTML defaults to UTF-8; only sniff when the declaration says otherwise or is absent
+            encoding = declared.group(1).decode("ascii") if declared else None
+            if encoding is not None:
+                try:
+                    codecs.lookup(encoding)
+                except LookupError:
+                    self.logger.warning(f"{self.path}: {href} declares unknown encoding {encoding!r}; detecting it")
+                    encoding = None
+            stream = _Prepended(head, member)
+            for piece in iter_decoded(stream, encoding, chunk_bytes):
+                extractor.feed(piece)
+                text = extractor.take()
+                if text:
+                    yield text
+        extractor.close()
+        text = extractor.take()
+        if text:
+            yield text
+
+
+class _Prepended:
+    """Binary stream that returns some already-read bytes before the rest of a stream."""
+
+    def __init__(self, head: bytes, stream: BinaryIO):
+        self._head = head
+        self._stream = stream
+
+    def read(self, size: int) -> bytes:
+        if self._head:
+            data, self._head = self._head[:size], self._head[size:]
+            return data
+        return self._stream.read(size)
+
+
+def iter_book_text(path: Union[str, Path], chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[str]:
+    """
+    Text of a .txt or .epub file, in pieces, for TextParser.iter_segments.
+
+    Raises:
+        ValueError: unsupported file type or malformed EPUB
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".epub":
+        with EpubBook(path) as book:
+            yield from book.iter_text(chunk_bytes)
+    elif suffix in (".txt", ".text", ""):
+        yield from iter_text_file(path, chunk_bytes=chunk_bytes)
+    else:
+        raise ValueError(f"Unsupported book format {suffix!r}; expected .txt or .epub")
@@ -0,0 +1,434 @@
+"""
+Asyncio job service for synthesizing many books at once.
+
+Submitted books are parsed and voice-assigned in the background, one
+parse thread per priority so a preview is never stuck behind a bulk book's
+parse, then cut into units of a few segments and queued. A fixed number of
+asyncio workers take units from a FairScheduler and synthesize them on a
+shared thread pool, so a long bulk job never holds a worker for more than
+one unit. Interactive jobs (previews) are served before bulk jobs, and
+within each priority the tenants take turns unit by unit, so one tenant
+submitting fifty books does not delay another tenant's single book.
+
+Finished jobs are kept for a while so their status can be polled, then
+dropped (finished_ttl, max_finished). The service runs on its own event loop; start_in_thread() lets a
+synchronous web framework (the Flask app) submit and poll jobs.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from .parser import TextParser
+from .voice_assigner import VoiceAssigner, VoiceSegment
+from .synthesizer import AdaptiveSynthesizer
+from .metrics import JOB_QUEUE_SECONDS, JOBS_TOTAL, JOB_QUEUE_DEPTH
+from .utils import get_logger
+
+
+# Scheduling classes, most urgent first
+PRIORITIES = ("interactive", "bulk")
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+# Segments synthesized per unit of work; bounds how long a worker is held
+DEFAULT_UNIT_SEGMENTS = 16
+
+# Concurrent synthesis units
+DEFAULT_WORKERS = 2
+
+# Consecutive higher-priority units served while lower-priority work waits
+DEFAULT_STARVATION_LIMIT = 8
+
+# Seconds a finished job stays pollable before it is dropped
+DEFAULT_FINISHED_TTL = 3600.0
+
+# Finished jobs kept at most; the oldest are dropped first
+DEFAULT_MAX_FINISHED = 1000
+
+
+@dataclass
+class Job:
+    """A submitted book and its progress."""
+    job_id: str
+    tenant: str
+    priority: str
+    text: Optional[str] = field(repr=False)    # dropped once parsed
+    state: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None    # first unit picked up by a worker
+    finished_at: Optional[float] = None
+    segments: int = 0
+    units: int = 0
+    units_done: int = 0
+    audio_paths: List[Optional[Path]] = field(default_factory=list, repr=False)
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly status (without text and audio paths unless done)."""
+        status = {
+            "job_id": self.job_id, "tenant": self.tenant, "priority": self.priority, "state": self.state,
+            "submitted_at": self.submitted_at, "started_at": self.started_at, "finished_at": self.finished_at,
+            "segments": self.segments, "units": self.units, "units_done": self.units_done, "error": self.error,
+        }
+        if self.state == "done":
+            status["audio_paths"] = [str(path) for path in self.audio_paths]
+        return status
+
+
+@dataclass
+class _Unit:
+    """Consecutive segments of one job, synthesized in one call."""
+    job: Job
+    offset: int
+    voice_segments: List[VoiceSegment]
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class FairScheduler:
+    """
+    Priority classes with round-robin between tenants inside each class.
+
+    The most urgent non-empty class is served first, except that after
+    starvation_limit consecutive picks ahead of waiting lower-priority work,
+    that class gets one pick, so bulk jobs slow down under load but never stall.
+
+    Attributes:
+        priorities (Tuple[str, ...]): Classes, most urgent first
+        starvation_limit (int): Picks lower-priority work may be passed over
+    """
+
+    def __init__(self, priorities: Tuple[str, ...] = PRIORITIES,
+                 starvation_limit: int = DEFAULT_STARVATION_LIMIT):
+        self.priorities = tuple(priorities)
+        self.starvation_limit = starvation_limit
+        # priority -> tenant -> items; tenant order is the round-robin order
+        self._queues: Dict[str, "OrderedDict[str, Deque[Any]]"] = {p: OrderedDict() for p in self.priorities}
+        self._sizes: Dict[str, int] = dict.fromkeys(self.priorities, 0)
+        self._passed_over: Dict[str, int] = dict.fromkeys(self.priorities, 0)
+
+    def __len__(self) -> int:
+        return sum(self._sizes.values())
+
+    def size(self, priority: str) -> int:
+        return self._sizes[priority]
+
+    def push(self, priority: str, tenant: str, item: Any) -> None:
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {self.priorities}")
+        self._queues[priority].setdefault(tenant, deque()).append(item)
+        self._sizes[priority] += 1
+
+    def pop(self) -> Optional[Tuple[str, str, Any]]:
+        """Next (priority, tenant, item), or None if nothing is queued."""
+        waiting = [p for p in self.priorities if self._sizes[p]]
+        if not waiting:
+            return None
+        priority = waiting[0]
+        starved = [p for p in waiting[1:] if self._passed_over[p] >= self.starvation_limit]
+        if starved:
+            priority = starved[0]
+        for other in waiting:
+            self._passed_over[other] = 0 if other == priority else self._passed_over[other] + 1
+
+        tenants = self._queues[priority]
+        tenant, items = next(iter(tenants.items()))
+        item = items.popleft()
+        if items:
+            tenants.move_to_end(tenant)
+        else:
+            del tenants[tenant]
+        self._sizes[priority] -= 1
+        return priority, tenant, item
+
+    def remove(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop queued items matching predicate; returns how many were dropped."""
+        removed = 0
+        for priority, tenants in self._queues.items():
+            for tenant in list(tenants):
+                kept = deque(item for item in tenants[tenant] if not predicate(item))
+                removed_here = len(tenants[tenant]) - len(kept)
+                if removed_here:
+                    self._sizes[priority] -= removed_here
+                    removed += removed_here
+                    if kept:
+                        tenants[tenant] = kept
+                    else:
+                        del tenants[tenant]
+        return removed
+
+
+class JobService:
+    """
+    Accepts books, tracks their state and synthesizes them on a shared pool.
+
+    Attributes:
+        parser (TextParser): Parses submitted text
+        assigner (VoiceAssigner): Assigns voices (used from one thread only)
+        synthesizer (AdaptiveSynthesizer): Renders units of segments
+        workers (int): Units synthesized concurrently
+        unit_segments (int): Segments per unit of work
+        scheduler (FairScheduler): Queued units
+        jobs (Dict[str, Job]): Jobs by id: unfinished ones, and finished ones until evicted
+        finished_ttl (float): Seconds a finished job is kept
+        max_finished (int): Finished jobs kept at most
+    """
+
+    def __init__(self, parser: TextParser, assigner: VoiceAssigner, synthesizer: AdaptiveSynthesizer,
+                 workers: int = DEFAULT_WORKERS, unit_segments: int = DEFAULT_UNIT_SEGMENTS,
+                 starvation_limit: int = DEFAULT_STARVATION_LIMIT,
+                 synthesize: Optional[Callable[[List[VoiceSegment]], List[Path]]] = None,
+                 finished_ttl: float = DEFAULT_FINISHED_TTL, max_finished: int = DEFAULT_MAX_FINISHED):
+        """
+        Args:
+            synthesize: Called with a unit's segments from a pool thread; defaults to
+                synthesizer.synthesize_batch (pass SynthesisWorkerPool.synthesize on CPU hosts)
+        """
+        self.parser = parser
+        self.assigner = assigner
+        self.synthesizer = synthesizer
+        self.workers = workers
+        self.unit_segments = unit_segments
+        self.scheduler = FairScheduler(PRIORITIES, starvation_limit)
+        self.jobs: Dict[str, Job] = {}
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self.logger = get_logger(__name__)
+        self._synthesize = synthesize or synthesizer.synthesize_batch
+        selector = getattr(synthesizer, "selector", None)
+        if selector is not None and selector.backlog is None:
+            # Queued units count towards the load the selector degrades under
+            selector.backlog = lambda: len(self.scheduler)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._work_ready: Optional[asyncio.Condition] = None
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._finished_order: Deque[Job] = deque()   # oldest finished first, for eviction
+        self._workers: List[asyncio.Task] = []
+        self._preparing: Set[asyncio.Task] = set()
+        self._synthesis_pool: Optional[ThreadPoolExecutor] = None
+        self._parse_pools: Dict[str, ThreadPoolExecutor] = {}
+        # The voice assigner keeps per-book state and is not thread-safe; parsing is
+        self._assign_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    async def __aenter__(self) -> "JobService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Start the workers on the running event loop."""
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._work_ready = asyncio.Condition()
+        self._stopping = False
+        self._synthesis_pool = ThreadPoolExecutor(self.workers, thread_name_prefix="job-synthesis")
+        self._parse_pools = {priority: ThreadPoolExecutor(1, thread_name_prefix=f"job-parse-{priority}")
+                             for priority in PRIORITIES}
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Stop taking new units, let running ones finish, and shut the pools down.
+
+        Jobs with units still queued are marked cancelled.
+        """
+        if not self._workers:
+            return
+        await asyncio.gather(*self._preparing, return_exceptions=True)
+        async with self._work_ready:
+            self._stopping = True
+            self._work_ready.notify_all()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        async with self._work_ready:
+            self.scheduler.remove(lambda unit: True)
+            self._update_depth()
+        for job in list(self.jobs.values()):
+            self._finish(job, "cancelled")
+        self._synthesis_pool.shutdown(wait=True)
+        for pool in self._parse_pools.values():
+            pool.shutdown(wait=True)
+
+    async def submit(self, text: str, tenant: str = "default", priority: str = "bulk") -> Job:
+        """
+        Queue a book for synthesis.
+
+        Args:
+            text: Book (or preview) text
+            tenant: Who submitted it; tenants share workers fairly
+            priority: "interactive" (served first) or "bulk"
+
+        Returns:
+            Job, updated in place as the work progresses
+
+        Raises:
+            ValueError: unknown priority
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {PRIORITIES}")
+        if not self._workers:
+            raise RuntimeError("JobService is not started")
+        self._evict()
+        job = Job(uuid.uuid4().hex, tenant, priority, text)
+        self.jobs[job.job_id] = job
+        self._finished[job.job_id] = asyncio.Event()
+        task = asyncio.create_task(self._prepare(job))
+        self._preparing.add(task)
+        task.add_done_callback(self._preparing.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job by id, or None if it is unknown or was evicted after finishing."""
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """Wait until a job is done, failed or cancelled."""
+        job, finished = self.jobs[job_id], self._finished[job_id]
+        await asyncio.wait_for(finished.wait(), timeout)
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a job's queued units; returns False if it had already finished (or been evicted)."""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        async with self._work_ready:
+            self.scheduler.remove(lambda unit: unit.job is job)
+            self._update_depth()
+        self._finish(job, "cancelled")
+        return True
+
+    async def _prepare(self, job: Job) -> None:
+        """Parse and assign voices off the loop, then queue the job's units."""
+        try:
+            text, job.text = job.text, None
+            voice_segments = await self._loop.run_in_executor(self._parse_pools[job.priority], self._assign, text)
+        except Exception as error:
+            self._finish(job, "failed", error)
+            return
+        if job.finished:
+            return  # cancelled while parsing
+        job.segments = len(voice_segments)
+        job.audio_paths = [None] * len(voice_segments)
+        units = [_Unit(job, offset, voice_segments[offset:offset + self.unit_segments])
+                 for offset in range(0, len(voice_segments), self.unit_segments)]
+        job.units = len(units)
+        if not units:
+            self._finish(job, "done")
+            return
+        async with self._work_ready:
+            for unit in units:
+                self.scheduler.push(job.priority, job.tenant, unit)
+            self._update_depth()
+            self._work_ready.notify(len(units))
+
+    def _assign(self, text: str) -> List[VoiceSegment]:
+        segments = self.parser.parse_text(text)
+        with self._assign_lock:
+            return self.assigner.assign_voices(segments)
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._work_ready:
+                await self._work_ready.wait_for(lambda: len(self.scheduler) or self._stopping)
+                if self._stopping:
+                    return
+                priority, _, unit = self.scheduler.pop()
+                self._update_depth()
+            await self._run_unit(priority, unit)
+
+    async def _run_unit(self, priority: str, unit: _Unit) -> None:
+        job = unit.job
+        if job.finished:
+            return
+        now = time.time()
+        JOB_QUEUE_SECONDS.observe(now - unit.enqueued_at, priority=priority)
+        if job.started_at is None:
+            job.started_at = now
+            job.state = "running"
+        try:
+            paths = await self._loop.run_in_executor(self._synthesis_pool, self._synthesize, unit.voice_segments)
+        except Exception as error:
+            async with self._work_ready:
+                self.scheduler.remove(lambda queued: queued.job is job)
+                self._update_depth()
+            self._finish(job, "failed", error)
+            return
+        if job.finished:
+            return  # cancelled while this unit was running
+        job.audio_paths[unit.offset:unit.offset + len(paths)] = paths
+        job.units_done += 1
+        if job.units_done == job.units:
+            self._finish(job, "done")
+
+    def _finish(self, job: Job, state: str, error: Optional[BaseException] = None) -> None:
+        if job.finished:
+            return
+        job.state = state
+        job.finished_at = time.time()
+        if error is not None:
+            job.error = f"{type(error).__name__}: {error}"
+            self.logger.error(f"Job {job.job_id} ({job.tenant}) failed: {job.error}")
+        else:
+            self.logger.info(f"Job {job.job_id} ({job.tenant}, {job.priority}) {state}: "
+                             f"{job.segments} segments in {job.finished_at - job.submitted_at:.2f}s")
+        JOBS_TOTAL.inc(priority=job.priority, state=state)
+        self._finished[job.job_id].set()
+        self._finished_order.append(job)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop finished jobs older than finished_ttl, and the oldest beyond max_finished."""
+        expired = time.time() - self.finished_ttl
+        while self._finished_order and (len(self._finished_order) > self.max_finished
+                                        or self._finished_order[0].finished_at <= expired):
+            job = self._finished_order.popleft()
+            self.jobs.pop(job.job_id, None)
+            self._finished.pop(job.job_id, None)
+
+    def _update_depth(self) -> None:
+        for priority in PRIORITIES:
+            JOB_QUEUE_DEPTH.set(self.scheduler.size(priority), priority=priority)
+
+    # Synchronous access from other threads (e.g. Flask request handlers)
+
+    def start_in_thread(self) -> None:
+        """Run the service on its own event loop in a daemon thread."""
+        if self._thread is not None:
+            return
+        loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=loop.run_forever, name="job-service", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), loop).result()
+
+    def stop_thread(self) -> None:
+        """Stop a service started with start_in_thread()."""
+        if self._thread is None:
+            return
+        loop = self._loop
+        asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        self._thread = None
+        loop.close()
+
+    def submit_threadsafe(self, text: str, tenant: str = "default", priority: str = "bulk") -> Job:
+        """submit() from a thread other than the service's."""
+        return asyncio.run_coroutine_threadsafe(self.submit(text, tenant, priority), self._loop).result()
+
+    def cancel_threadsafe(self, job_id: str) -> bool:
+        return asyncio.run_coroutine_threadsafe(self.cancel(job_id), self._loop).result()
@@ -0,0 +1,261 @@
+"""
+In-process metrics: counters, gauges and latency histograms with labels.
+
+The pipeline stages record into the module-level REGISTRY, which can be
+exported as Prometheus text format or as a JSON-friendly snapshot
+(including estimated p50/p95/p99 for histograms).
+
+Recording is a dict lookup plus a locked add, and callers in hot loops can
+hold on to the child returned by labels() to skip the lookup.
+"""
+
+import bisect
+import json
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from sub-millisecond parsing to long syntheses
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SNAPSHOT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "count", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]  # beyond the largest bucket
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class _Metric:
+    """A named metric family; children are keyed by label values."""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **label_values: str):
+        """Child for the given label values (created on first use)."""
+        key = tuple(str(label_values.get(name, "")) for name in self.label_names)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def items(self) -> List[Tuple[Dict[str, str], object]]:
+        return [(dict(zip(self.label_names, key)), child) for key, child in list(self._children.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0, **label_values: str) -> None:
+        self.labels(**label_values).inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float, **label_values: str) -> None:
+        self.labels(**label_values).set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, **label_values: str) -> None:
+        self.labels(**label_values).observe(value)
+
+
+class MetricsRegistry:
+    """Holds metric families and exports them."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Drop all recorded values (metric families stay registered)."""
+        for metric in self._metrics.values():
+            with metric._lock:
+                metric._children.clear()
+
+    def _get_or_create(self, cls, name, documentation, label_names, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, label_names, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, child in metric.items():
+                if metric.kind == "histogram":
+                    cumulative = 0
+                    for bound, bucket_count in zip(metric.buckets + (math.inf,), child.counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == math.inf else repr(bound)
+                        lines.append(f"{metric.name}_bucket{_format_labels(labels, le=le)} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {child.sum}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {child.count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {child.value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, dict]:
+        """JSON-friendly view of all metrics, with histogram quantile estimates."""
+        result = {}
+        for metric in self._metrics.values():
+            series = []
+            for labels, child in metric.items():
+                if metric.kind == "histogram":
+                    entry = {"labels": labels, "count": child.count, "sum": child.sum}
+                    for q in SNAPSHOT_QUANTILES:
+                        entry[f"p{int(q * 100)}"] = child.quantile(q)
+                else:
+                    entry = {"labels": labels, "value": child.value}
+                series.append(entry)
+            result[metric.name] = {"type": metric.kind, "help": metric.documentation, "series": series}
+        return result
+
+    def to_json(self, **json_options) -> str:
+        return json.dumps(self.snapshot(), **json_options)
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    escaped = (f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Default registry used by the parser, voice assigner and synthesizer
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "readtome_stage_duration_seconds", "Time spent per stage call", ("stage", "model", "voice_id"))
+SEGMENTS_TOTAL = REGISTRY.counter(
+    "readtome_segments_total", "Segments processed per stage", ("stage", "model", "voice_id"))
+CACHE_LOOKUPS_TOTAL = REGISTRY.counter(
+    "readtome_synthesis_cache_total", "Synthesis cache lookups", ("result",))
+PERFORMANCE = REGISTRY.gauge(
+    "readtome_performance", "Last value of named performance metrics", ("metric",))
+TIME_TO_FIRST_AUDIO = REGISTRY.histogram(
+    "readtome_time_to_first_audio_seconds", "Time from stream start to the first audio chunk", ("model",))
+JOB_QUEUE_SECONDS = REGISTRY.histogram(
+    "readtome_job_queue_seconds", "Time a unit of job work waited for a worker", ("priority",))
+JOBS_TOTAL = REGISTRY.counter(
+    "readtome_jobs_total", "Jobs finished, by final state", ("priority", "state"))
+JOB_QUEUE_DEPTH = REGISTRY.gauge(
+    "readtome_job_queue_depth", "Units of job work waiting for a worker", ("priority",))
+MODEL_SELECTIONS_TOTAL = REGISTRY.counter(
+    "readtome_model_selections_total", "Models chosen by the load-adaptive selector", ("model", "degraded"))
@@ -0,0 +1,133 @@
+"""
+Resident pool of loaded TTS models.
+
+Models are loaded lazily on first use and kept warm, so switching between
+fast_pitch and VITS (or serving both at once) is a dictionary lookup rather
+than a reload. When the resident models exceed the memory budget, the least
+recently used ones are unloaded. Loading happens outside the pool lock,
+so requests for resident models are never held up by another model's
+load; concurrent requests for the same model share one load.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict
+from .tts_backends import TTSBackend, create_backend
+from .utils import get_logger
+
+
+# Default memory budget for resident models (4 GB)
+DEFAULT_MEMORY_BUDGET = 4 * 1024 ** 3
+
+
+@dataclass
+class ModelStats:
+    """Load and usage statistics for one model."""
+    model_name: str
+    load_seconds: float = 0.0
+    memory_bytes: int = 0
+    loads: int = 0
+    requests: int = 0
+    resident: bool = False
+
+
+class ModelPool:
+    """
+    LRU pool of loaded TTS backends under a memory budget.
+
+    Attributes:
+        memory_budget (int): Bytes of model memory to keep resident
+        loader (Callable[[str], TTSBackend]): Builds a backend from a model name
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 loader: Callable[[str], TTSBackend] = create_backend):
+        self.memory_budget = memory_budget
+        self.loader = loader
+        self.logger = get_logger(__name__)
+        self._models: "OrderedDict[str, TTSBackend]" = OrderedDict()
+        self._stats: Dict[str, ModelStats] = {}
+        self._loading: Dict[str, Future] = {}   # model name -> load in progress
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> TTSBackend:
+        """Return the loaded model, loading it (and evicting others) if needed."""
+        with self._lock:
+            stats = self._stats.setdefault(model_name, ModelStats(model_name))
+            stats.requests += 1
+            backend = self._models.get(model_name)
+            if backend is not None:
+                self._models.move_to_end(model_name)
+                return backend
+            loading = self._loading.get(model_name)
+            if loading is None:
+                self._loading[model_name] = future = Future()
+        if loading is not None:
+            return loading.result()  # another thread is loading it
+
+        start_time = time.time()
+        try:
+            backend = self.loader(model_name)
+        except BaseException as error:
+            with self._lock:
+                del self._loading[model_name]
+            future.set_exception(error)
+            raise
+        with self._lock:
+            self._register(model_name, backend, time.time() - start_time)
+            del self._loading[model_name]
+        future.set_result(backend)
+        return backend
+
+    def add(self, backend: TTSBackend) -> None:
+        """Register an already-loaded backend under its model name."""
+        with self._lock:
+            self._stats.setdefault(backend.model_name, ModelStats(backend.model_name))
+            self._register(backend.model_name, backend, 0.0)
+
+    def unload(self, model_name: str) -> None:
+        """Drop a model from the pool."""
+        with self._lock:
+            self._unload(model_name)
+
+    def is_resident(self, model_name: str) -> bool:
+        return model_name in self._models
+
+    @property
+    def resident_bytes(self) -> int:
+        """Total memory of the resident models."""
+        return sum(backend.memory_bytes for backend in self._models.values())
+
+    def stats(self) -> Dict[str, ModelStats]:
+        """Per-model load times, memory and request counts."""
+        return dict(self._stats)
+
+    def _register(self, model_name: str, backend: TTSBackend, load_seconds: float) -> None:
+        stats = self._stats[model_name]
+        stats.loads += 1
+        stats.load_seconds = load_seconds
+        stats.memory_bytes = backend.memory_bytes
+        stats.resident = True
+        self._models[model_name] = backend
+        self._models.move_to_end(model_name)
+        self.logger.info(f"Loaded {model_name} in {load_seconds:.2f}s "
+                         f"({stats.memory_bytes / 1e6:.0f} MB, {len(self._models)} resident)")
+
+        # Never evict the model that was just requested
+        while self.resident_bytes > self.memory_budget and len(self._models) > 1:
+            self._unload(next(iter(self._models)))
+
+    def _unload(self, model_name: str) -> None:
+        backend = self._models.pop(model_name, None)
+        if backend is None:
+            return
+        self._stats[model_name].resident = False
+        self.logger.info(f"Unloaded {model_name}")
+        del backend
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
@@ -0,0 +1,216 @@
+"""
+Load-adaptive choice between TTS models.
+
+The synthesizer normally uses one model for everything (fast_pitch in
+development, VITS in production). With a ModelSelector it picks the model
+per call instead: the best model whose predicted latency, including the
+work already queued ahead of the call, fits the latency SLO, and otherwise
+the fastest one. Latency is predicted from an exponentially weighted moving
+average of each model's observed call time, scaled by text length.
+
+Segments rendered with a lower-quality model than the preferred one are
+appended to a DegradationLog so they can be re-rendered in high quality
+once the load spike is over (AdaptiveSynthesizer.rerender_degraded).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+from .metrics import MODEL_SELECTIONS_TOTAL
+from .utils import get_logger
+
+
+# Latency target for one synthesis call, queueing included
+DEFAULT_SLO_SECONDS = 2.0
+
+# Weight of the newest observation in the moving averages
+DEFAULT_EWMA_ALPHA = 0.2
+
+# Consecutive degraded choices before the preferred model is tried again,
+# so its latency estimate recovers after a spike
+DEFAULT_PROBE_EVERY = 50
+
+
+@dataclass
+class ModelLatency:
+    """Moving averages of one model's call time and text length."""
+    seconds: float = 0.0
+    chars: float = 0.0
+    observations: int = 0
+
+    def predict(self, chars: int) -> float:
+        """Expected seconds for a call with this many characters."""
+        if not self.observations:
+            return 0.0
+        return self.seconds * max(chars, 1) / max(self.chars, 1.0)
+
+
+@dataclass
+class DegradedSegment:
+    """A segment rendered with a fallback model."""
+    text: str
+    voice_type: str
+    model: str
+    preferred_model: str
+    audio_path: str
+    recorded_at: float = 0.0
+
+
+class DegradationLog:
+    """
+    Append-only JSON-lines record of degraded segments.
+
+    Attributes:
+        path (Optional[Path]): Log file; None keeps the log in memory only
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path is not None else None
+        self._entries: List[DegradedSegment] = []
+        self._keys: Set[Tuple[str, str, str]] = set()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if line.endswith(b"\n") and line.strip():  # skip a partial last line
+                        self._add(DegradedSegment(**json.loads(line)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, entry: DegradedSegment) -> None:
+        """Add a degraded segment (once per text, voice and model)."""
+        with self._lock:
+            if not self._add(entry):
+                return
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.write(json.dumps(asdict(entry)).encode("utf-8") + b"\n")
+
+    def entries(self) -> List[DegradedSegment]:
+        with self._lock:
+            return list(self._entries)
+
+    def remove(self, done: Sequence[DegradedSegment]) -> None:
+        """Drop re-rendered entries and rewrite the log without them."""
+        done_keys = {self._key(entry) for entry in done}
+        with self._lock:
+            self._entries = [entry for entry in self._entries if self._key(entry) not in done_keys]
+            self._keys -= done_keys
+            if self.path is not None:
+                fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(asdict(entry)) + "\n" for entry in self._entries)
+                os.replace(temp_path, self.path)
+
+    def _add(self, entry: DegradedSegment) -> bool:
+        key = self._key(entry)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._entries.append(entry)
+        return True
+
+    @staticmethod
+    def _key(entry: DegradedSegment) -> Tuple[str, str, str]:
+        return entry.text, entry.voice_type, entry.model
+
+
+class ModelSelector:
+    """
+    Chooses a model per synthesis call from queue depth, latency and an SLO.
+
+    Attributes:
+        models (Tuple[str, ...]): Candidate models, best quality first
+        slo_seconds (float): Latency target per call, queueing included
+        alpha (float): EWMA weight of the newest observation
+        probe_every (int): Degraded choices between probes of the preferred model
+        backlog (Optional[Callable[[], int]]): Calls queued outside the
+            synthesizer (e.g. a JobService's scheduler), added to the queue depth
+        degradation_log (DegradationLog): Segments rendered with a fallback model
+    """
+
+    def __init__(self, models: Sequence[str], slo_seconds: float = DEFAULT_SLO_SECONDS,
+                 alpha: float = DEFAULT_EWMA_ALPHA, probe_every: int = DEFAULT_PROBE_EVERY,
+                 degradation_log: Optional[Union[str, Path, DegradationLog]] = None,
+                 backlog: Optional[Callable[[], int]] = None):
+        if not models:
+            raise ValueError("ModelSelector needs at least one model")
+        self.models = tuple(models)
+        self.slo_seconds = slo_seconds
+        self.alpha = alpha
+        self.probe_every = probe_every
+        self.backlog = backlog
+        if not isinstance(degradation_log, DegradationLog):
+            degradation_log = DegradationLog(degradation_log)
+        self.degradation_log = degradation_log
+        self.logger = get_logger(__name__)
+        self._latency: Dict[str, ModelLatency] = {model: ModelLatency() for model in self.models}
+        self._degraded_streak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def preferred(self) -> str:
+        return self.models[0]
+
+    def latency(self, model: str) -> ModelLatency:
+        with self._lock:
+            return ModelLatency(**asdict(self._latency[model]))
+
+    def predict(self, model: str, chars: int, queue_depth: int = 0) -> float:
+        """Expected seconds until a call finishes if it goes to model now."""
+        with self._lock:
+            return self._predict(model, chars, queue_depth)
+
+    def choose(self, chars: int, queue_depth: int = 0) -> str:
+        """
+        Model for a call of this many characters.
+
+        Args:
+            chars: Text length of the call
+            queue_depth: Calls in flight or queued ahead of this one
+
+        Returns:
+            The best model predicted to meet the SLO, else the fastest
+        """
+        if self.backlog is not None:
+            queue_depth += self.backlog()
+        with self._lock:
+            predictions = {model: self._predict(model, chars, queue_depth) for model in self.models}
+            chosen = next((model for model in self.models if predictions[model] <= self.slo_seconds), None)
+            if chosen is None:
+                chosen = min(self.models, key=predictions.__getitem__)
+            if chosen != self.preferred:
+                self._degraded_streak += 1
+                if self.probe_every and self._degraded_streak >= self.probe_every:
+                    chosen = self.preferred
+            if chosen == self.preferred:
+                self._degraded_streak = 0
+        MODEL_SELECTIONS_TOTAL.inc(model=chosen, degraded=str(chosen != self.preferred).lower())
+        return chosen
+
+    def observe(self, model: str, seconds: float, chars: int) -> None:
+        """Record the duration of a call that ran on model."""
+        with self._lock:
+            latency = self._latency.setdefault(model, ModelLatency())
+            if not latency.observations:
+                latency.seconds, latency.chars = seconds, float(chars)
+            else:
+                latency.seconds += self.alpha * (seconds - latency.seconds)
+                latency.chars += self.alpha * (chars - latency.chars)
+            latency.observations += 1
+
+    def record_degraded(self, text: str, voice_type: str, model: str, audio_path: Union[str, Path]) -> None:
+        self.degradation_log.record(DegradedSegment(text, voice_type, model, self.preferred,
+                                                    str(audio_path), time.time()))
+
+    def _predict(self, model: str, chars: int, queue_depth: int) -> float:
+        latency = self._latency[model]
+        # Calls ahead of this one are assumed to be of average length
+        return queue_depth * latency.seconds + latency.predict(chars)
@@ -3,15 +3,21 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.utils import get_logger
-from typing import List, Dict, Optional, NamedTuple
+from .metrics import STAGE_SECONDS, SEGMENTS_TOTAL
+from .segment_table import SegmentTable
+from .sentence_splitter import RuleBasedSplitter
+from .gazetteer import SpeakerResolver
+from .ingest import iter_book_text, DEFAULT_CHUNK_BYTES
+from typing import List, Dict, Optional, NamedTuple, Tuple, Iterable, Iterator, TextIO, Union, Callable
 from dataclasses import dataclass
 import time
-import nltk
+import functools
 
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# nltk is imported on first use, and punkt is only looked up locally (never
+# downloaded). READTOME_NLTK_DATA lists extra data directories (os.pathsep
+# separated); server/nltk_data is searched by default.
+NLTK_DATA_ENV = "READTOME_NLTK_DATA"
+DEFAULT_NLTK_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'nltk_data'))
     
 
 # Patterns to identify:
@@ -49,6 +55,93 @@ SPEAKER_PATTERNS = [
     rf'{_ASCII_QUOTE}[^{_SMART_CLOSE}]*{_SMART_CLOSE},?\s*(\w+),?\s+[^,]*(?:said|asked|replied|muttered)',
 ]
 
+# Quote styles in DIALOGUE_PATTERNS order: (style, opening char, closing char).
+# A pattern like "[^"]*" matches exactly when the opening char is followed
+# somewhere later by the closing char, so str.find gives the same answer.
+QUOTE_STYLES = [
+    ("ascii", _ASCII_QUOTE, _ASCII_QUOTE),
+    ("smart", _SMART_OPEN, _SMART_CLOSE),
+    ("mixed_ascii_open", _ASCII_QUOTE, _SMART_CLOSE),
+    ("mixed_smart_open", _SMART_OPEN, _ASCII_QUOTE),
+    ("single", _ASCII_SINGLE, _ASCII_SINGLE),
+    ("smart_single", _SMART_SINGLE_OPEN, _SMART_SINGLE_CLOSE),
+]
+
+_QUOTE_CHARS = frozenset(c for _, open_q, close_q in QUOTE_STYLES for c in (open_q, close_q))
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Default read size for iter_segments when given a file handle
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Text iter_segments keeps after a sentence boundary before trusting it
+STREAM_LOOKAHEAD_CHARS = 64
+
+# Unfinished text iter_segments holds back at most; beyond it (input without
+# sentence punctuation) the text so far is flushed, broken at a word boundary
+STREAM_MAX_HOLDBACK_CHARS = 64 * 1024
+
+# Paragraph breaks are the candidate shard boundaries for parallel parsing
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+# Texts shorter than this are parsed sequentially; process start-up would dominate
+MIN_PARALLEL_CHARS = 200_000
+
+# Every speaker pattern needs one of these verbs, so one search rules most sentences out.
+_SPEECH_VERB_RE = re.compile(r'said|asked|replied|whispered|muttered')
+
+
+class DialogueMatch(NamedTuple):
+    """Result of matching a sentence against the dialogue patterns."""
+    quote_style: str
+    span: Tuple[int, int]  # (start, end) of the quoted text including the quotes
+    speaker: Optional[str]
+
+
+class DialogueMatcher:
+    """Precompiled equivalent of DIALOGUE_PATTERNS + SPEAKER_PATTERNS.
+
+    Gives the same results as running re.search over each pattern list in
+    order, but collects the quote characters of a sentence in one pass and
+    only runs the speaker patterns that can possibly match.
+    """
+
+    def __init__(self):
+        self._speaker_patterns = [
+            (re.compile(pattern), frozenset(c for c in pattern if c in _QUOTE_CHARS))
+            for pattern in SPEAKER_PATTERNS
+        ]
+
+    def match(self, sentence: str) -> Optional[DialogueMatch]:
+        """Return the first dialogue match in the sentence, or None for narrative."""
+        present = _QUOTE_CHARS.intersection(sentence)
+        if not present:
+            return None
+
+        for style, open_q, close_q in QUOTE_STYLES:
+            if open_q not in present or close_q not in present:
+                continue
+            start = sentence.find(open_q)
+            end = sentence.find(close_q, start + 1)
+            if end != -1:
+                return DialogueMatch(style, (start, end + 1), self._find_speaker(sentence, present))
+        return None
+
+    def extract_speaker(self, sentence: str) -> Optional[str]:
+        """Same as the first matching SPEAKER_PATTERNS group, or None."""
+        return self._find_speaker(sentence, _QUOTE_CHARS.intersection(sentence))
+
+    def _find_speaker(self, sentence: str, present: frozenset) -> Optional[str]:
+        if not _SPEECH_VERB_RE.search(sentence):
+            return None
+        for pattern, required in self._speaker_patterns:
+            if required <= present:
+                match = pattern.search(sentence)
+                if match:
+                    return match.group(1)
+        return None
+
+
 @dataclass
 class TextSegment:
     """Represents a parsed segment of text."""
@@ -60,9 +153,27 @@ class TextSegment:
 
 class TextParser:
     """Parses story text into dialogue and narrative segments."""
-    def __init__(self):
+    def __init__(self, nltk_data_dir: Optional[str] = None,
+                 sentence_splitter: Union[str, Callable[[str], List[str]]] = "nltk",
+                 resolve_speakers: bool = False):
+        """
+        Args:
+            nltk_data_dir: Extra directory to look for the punkt tokenizer in
+            sentence_splitter: "nltk" (punkt), "rules" (the built-in quote-aware
+                RuleBasedSplitter, no downloads needed) or any callable mapping
+                text to a list of sentences
+            resolve_speakers: Attribute unattributed dialogue using a gazetteer
+                of character names built while parsing (see src.gazetteer)
+        """
         self.logger = get_logger(__name__)
-        # Initialize any state you need
+        self.matcher = DialogueMatcher()
+        self.nltk_data_dir = nltk_data_dir
+        if sentence_splitter == "rules":
+            sentence_splitter = RuleBasedSplitter()
+        elif sentence_splitter != "nltk" and not callable(sentence_splitter):
+            raise ValueError(f"unknown sentence splitter: {sentence_splitter!r}")
+        self.sentence_splitter = sentence_splitter
+        self.resolve_speakers = resolve_speakers
     
     def parse_text(self, text: str) -> List[TextSegment]:
         """
@@ -85,15 +196,303 @@ class TextParser:
         sentences = self._split_sentences(cleaned_text)
         
         # Step 3: Process each sentence
+        resolver = self._new_resolver()
         for sentence in sentences:
-            segment = self._classify_sentence(sentence)
+            segment = self._resolve(resolver, self._classify_sentence(sentence))
             segments.append(segment)
         
         self.logger.info(f"Parsed {len(segments)} segments from text")
         duration = time.time() - start_time
         self.logger.info(f"Parsed text in {duration:.2f}s")
+        self._record_metrics("parse", duration, len(segments))
+        return segments
+    
+    def parse_table(self, text: str) -> SegmentTable:
+        """
+        Parse text into a columnar SegmentTable instead of TextSegment objects.
+        
+        Segments are offsets into the cleaned text, so large books cost a few
+        bytes per sentence beyond the text itself. Iterating the table yields
+        TextSegment-compatible views.
+        
+        Args:
+            text: Raw story text to parse
+            
+        Returns:
+            SegmentTable with the same segments parse_text would return
+        """
+        start_time = time.time()
+        
+        cleaned_text = self._clean_text(text)
+        sentences = self._split_sentences(cleaned_text)
+        buffer, offsets = self._sentence_offsets(cleaned_text, sentences)
+        
+        table = SegmentTable(buffer)
+        if buffer is cleaned_text:
+            table.line_starts.extend(self._line_starts(text))
+        resolver = self._new_resolver()
+        for sentence, start in zip(sentences, offsets):
+            segment_type, speaker, confidence = self._classify(sentence)
+            if resolver is not None:
+                speaker = resolver.resolve(sentence, segment_type, speaker)
+            table.append(start, start + len(sentence), segment_type, speaker, confidence)
+        
+        duration = time.time() - start_time
+        self.logger.info(f"Parsed {len(table)} segments into a table in {duration:.2f}s")
+        self._record_metrics("parse", duration, len(table))
+        return table
+    
+    @staticmethod
+    def _sentence_offsets(text: str, sentences: List[str]) -> Tuple[str, List[int]]:
+        """Locate each sentence in text; returns the buffer to slice and the start offsets."""
+        offsets = []
+        cursor = 0
+        for sentence in sentences:
+            start = text.find(sentence, cursor)
+            if start < 0:
+                break
+            offsets.append(start)
+            cursor = start + len(sentence)
+        else:
+            return text, offsets
+        # The tokenizer altered a sentence; lay the sentences out in a buffer of their own
+        buffer = " ".join(sentences)
+        offsets, cursor = [], 0
+        for sentence in sentences:
+            offsets.append(cursor)
+            cursor += len(sentence) + 1
+        return buffer, offsets
+    
+    def _line_starts(self, text: str) -> List[int]:
+        """Offsets in the cleaned text where each non-blank line of text begins."""
+        starts = []
+        cursor = 0
+        for line in text.splitlines():
+            length = len(self._clean_text(line))
+            if length:
+                starts.append(cursor)
+                cursor += length + 1
+        return starts
+    
+    def iter_file(self, path: Union[str, os.PathLike], chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[TextSegment]:
+        """
+        Parse a .txt or .epub file lazily (see src.ingest).
+        
+        Text files are memory-mapped and EPUB chapters decompressed piece by
+        piece, so segments come out before the whole book has been decoded.
+        
+        Args:
+            path: Book file
+            chunk_bytes: Bytes decoded per piece
+            
+        Yields:
+            TextSegment objects in document order
+        """
+        return self.iter_segments(iter_book_text(path, chunk_bytes))
+    
+    def iter_segments(self, source: Union[TextIO, Iterable[str]],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      max_holdback: int = STREAM_MAX_HOLDBACK_CHARS) -> Iterator[TextSegment]:
+        """
+        Parse text incrementally, yielding segments as sentences complete.
+        
+        Produces exactly the same segments as parse_text on the full text
+        (unless a sentence is longer than max_holdback), but only keeps the
+        current chunk plus the unfinished sentence in memory.
+        
+        Args:
+            source: Open text file or any iterable of text chunks
+            chunk_size: Characters per read when source is a file handle
+            max_holdback: Unfinished text held back at most before it is flushed
+            
+        Yields:
+            TextSegment objects in document order
+        """
+        start_time = time.time()
+        count = 0
+        buffer = ""
+        next_split = 0
+        resolver = self._new_resolver()
+        
+        for chunk in self._iter_chunks(source, chunk_size):
+            chunk = _WHITESPACE_RE.sub(' ', chunk)
+            if not buffer:
+                chunk = chunk.lstrip()
+            elif buffer.endswith(' ') and chunk.startswith(' '):
+                chunk = chunk[1:]
+            buffer += chunk
+            overflowing = len(buffer) > max_holdback
+            # A split that emitted nothing is retried once the buffer has doubled,
+            # so a long unfinished sentence costs linear, not quadratic, splitting
+            if len(buffer) < next_split and not overflowing:
+                continue
+            
+            # Only split up to the last whitespace so the tokenizer never sees a
+            # partial word, and hold back the last sentence since the next chunk
+            # may still extend it.
+            cut = buffer.rfind(' ')
+            if cut <= 0:
+                if overflowing:
+                    count += 1
+                    yield self._resolve(resolver, self._classify_sentence(buffer))
+                    buffer = ""
+                    next_split = 0
+                continue
+            head = buffer[:cut]
+            sentences = self._split_sentences(head)
+            emit = 0
+            if len(sentences) >= 2:
+                # Also hold back sentences that end too close to the cut: the splitter
+                # may need the following words (e.g. a quote's attribution) to decide
+                starts = self._sentence_starts(head, sentences)
+                emit = len(sentences) - 1
+                while emit > 0 and len(head) - starts[emit] < STREAM_LOOKAHEAD_CHARS:
+                    emit -= 1
+            if emit == 0:
+                if not overflowing:
+                    next_split = 2 * len(buffer)
+                    continue
+                # Nothing ends a sentence within max_holdback: flush up to the last word
+                for sentence in sentences:
+                    count += 1
+                    yield self._resolve(resolver, self._classify_sentence(sentence))
+                buffer = buffer[cut + 1:]
+                next_split = 0
+                continue
+            for sentence in sentences[:emit]:
+                count += 1
+                yield self._resolve(resolver, self._classify_sentence(sentence))
+            buffer = buffer[starts[emit]:]
+            next_split = 0
+        
+        buffer = buffer.rstrip()
+        if buffer:
+            for sentence in self._split_sentences(buffer):
+                count += 1
+                yield self._resolve(resolver, self._classify_sentence(sentence))
+        
+        self.logger.info(f"Parsed {count} segments from stream")
+        duration = time.time() - start_time
+        self.logger.info(f"Parsed stream in {duration:.2f}s")
+        self._record_metrics("parse", duration, count)
+    
+    @staticmethod
+    def _sentence_starts(text: str, sentences: List[str]) -> List[int]:
+        """Offset of each sentence in text (sentences are in order and non-overlapping)."""
+        starts = []
+        cursor = 0
+        for sentence in sentences:
+            start = text.find(sentence, cursor)
+            if start < 0:
+                # The tokenizer altered this sentence; only the last start is reliable
+                return [text.rfind(sentences[-1])] * len(sentences)
+            starts.append(start)
+            cursor = start + len(sentence)
+        return starts
+    
+    def parse_text_parallel(self, text: str, workers: Optional[int] = None,
+                            shards_per_worker: int = 4,
+                            min_chars: int = MIN_PARALLEL_CHARS) -> List[TextSegment]:
+        """
+        Parse text across a process pool, splitting at paragraph boundaries.
+        
+        Shards are parsed independently and merged back in document order.
+        Where a sentence crosses a shard boundary (e.g. a heading with no
+        terminal punctuation) the two edge sentences are re-split together,
+        so the result is identical to parse_text. A splitter that carries
+        state across paragraphs (one with a true `stateful` attribute, like
+        the "rules" splitter's open quotes) cannot be sharded, and the text
+        is parsed sequentially instead.
+        
+        Args:
+            text: Raw story text to parse
+            workers: Number of worker processes (defaults to os.cpu_count())
+            shards_per_worker: Shards per worker, for load balancing
+            min_chars: Texts shorter than this are parsed sequentially
+            
+        Returns:
+            List of TextSegment objects in document order
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(text) < min_chars:
+            return self.parse_text(text)
+        if getattr(self.sentence_splitter, "stateful", False):
+            self.logger.info("Sentence splitter carries state across paragraphs; parsing sequentially")
+            return self.parse_text(text)
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        start_time = time.time()
+        shards = self._shard_text(text, workers * shards_per_worker)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                 initargs=(self,)) as executor:
+            shard_results = list(executor.map(_parse_shard, shards))
+        
+        segments = []
+        for shard_segments in shard_results:
+            if segments and shard_segments:
+                merged, shard_segments = self._merge_seam(segments.pop(), shard_segments)
+                segments.extend(merged)
+            segments.extend(shard_segments)
+        
+        # Speaker resolution carries state across the whole book, so it runs after the merge
+        resolver = self._new_resolver()
+        if resolver is not None:
+            segments = [self._resolve(resolver, segment) for segment in segments]
+        
+        self.logger.info(f"Parsed {len(segments)} segments from {len(shards)} shards on {workers} workers")
+        duration = time.time() - start_time
+        self.logger.info(f"Parsed text in {duration:.2f}s")
+        self._record_metrics("parse_parallel", duration, len(segments))
         return segments
     
+    def _shard_text(self, text: str, shard_count: int) -> List[str]:
+        """Split text at paragraph breaks into roughly equal shards."""
+        target = max(1, len(text) // shard_count)
+        shards = []
+        start = 0
+        for match in _PARAGRAPH_BREAK_RE.finditer(text, target):
+            if match.start() - start < target:
+                continue
+            shards.append(text[start:match.start()])
+            start = match.end()
+        shards.append(text[start:])
+        return shards
+    
+    def _merge_seam(self, last: TextSegment, shard_segments: List[TextSegment]):
+        """Re-split the two sentences either side of a shard boundary."""
+        first = shard_segments[0]
+        sentences = self._split_sentences(f"{last.content} {first.content}")
+        if sentences == [last.content, first.content]:
+            return [last], shard_segments
+        return [self._classify_sentence(s) for s in sentences], shard_segments[1:]
+    
+    def _new_resolver(self) -> Optional[SpeakerResolver]:
+        """A fresh per-book speaker resolver, if speaker resolution is enabled."""
+        return SpeakerResolver() if self.resolve_speakers else None
+    
+    @staticmethod
+    def _resolve(resolver: Optional[SpeakerResolver], segment: TextSegment) -> TextSegment:
+        if resolver is not None:
+            segment.speaker = resolver.resolve(segment.content, segment.segment_type, segment.speaker)
+        return segment
+    
+    def _record_metrics(self, stage: str, duration: float, segment_count: int) -> None:
+        """One registry update per parse call, never per sentence."""
+        STAGE_SECONDS.observe(duration, stage=stage)
+        SEGMENTS_TOTAL.inc(segment_count, stage=stage)
+    
+    def _iter_chunks(self, source: Union[TextIO, Iterable[str]], chunk_size: int) -> Iterator[str]:
+        """Yield text chunks from a file handle or an iterable of strings."""
+        if hasattr(source, "read"):
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        else:
+            yield from source
+    
     def _clean_text(self, text: str) -> str:
         """Private helper method for text cleaning."""
         # remove extra whitespace and newlines
@@ -104,38 +503,79 @@ class TextParser:
     
     def _split_sentences(self, text: str) -> List[str]:
         """Split text into sentences, handling dialogue complexities."""
-        return nltk.sent_tokenize(text)
+        if self.sentence_splitter != "nltk":
+            return self.sentence_splitter(text)
+        data_dirs = (self.nltk_data_dir,) if self.nltk_data_dir else ()
+        return load_sentence_tokenizer(data_dirs)(text)
     
     def _classify_sentence(self, sentence: str) -> TextSegment:
         """Classify a single sentence as dialogue, narrative, or action."""
+        segment_type, speaker, confidence = self._classify(sentence)
+        return TextSegment(
+            content=sentence,
+            segment_type=segment_type,
+            speaker=speaker,
+            confidence=confidence
+        )
+    
+    def _classify(self, sentence: str) -> Tuple[str, Optional[str], float]:
+        """Segment type, speaker and confidence for a sentence."""
         
         # Check for dialogue patterns first
-        for pattern in DIALOGUE_PATTERNS:
-            if re.search(pattern, sentence):
-                # It's dialogue, now find the speaker
-                speaker = self._extract_speaker(sentence)
-                return TextSegment(
-                    content=sentence,
-                    segment_type="dialogue",
-                    speaker=speaker,
-                    confidence=0.8
-                )
+        match = self.matcher.match(sentence)
+        if match:
+            return "dialogue", match.speaker, 0.8
         
         # If no dialogue found, it's narrative
-        return TextSegment(
-            content=sentence,
-            segment_type="narrative",
-            confidence=0.9
-        )
+        return "narrative", None, 0.9
 
     def _extract_speaker(self, sentence: str) -> Optional[str]:
         """Extract speaker name from dialogue."""
-        for pattern in SPEAKER_PATTERNS:
-            match = re.search(pattern, sentence)
-            if match:
-                return match.group(1)
-        return None 
+        return self.matcher.extract_speaker(sentence)
+
+
+@functools.lru_cache(maxsize=None)
+def load_sentence_tokenizer(data_dirs: Tuple[str, ...] = ()):
+    """
+    Import nltk and resolve the punkt tokenizer from local data directories.
     
+    Args:
+        data_dirs: Directories to search first; defaults to READTOME_NLTK_DATA
+            or server/nltk_data
+            
+    Returns:
+        nltk.sent_tokenize, once punkt has been found
+        
+    Raises:
+        LookupError: punkt is not installed locally (nothing is downloaded)
+    """
+    import nltk
+    
+    if not data_dirs:
+        data_dirs = tuple(os.environ.get(NLTK_DATA_ENV, DEFAULT_NLTK_DATA).split(os.pathsep))
+    for data_dir in reversed(data_dirs):
+        if data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, data_dir)
+    try:
+        nltk.data.find('tokenizers/punkt')
+    except LookupError:
+        raise LookupError(
+            f"NLTK 'punkt' tokenizer not found (searched {nltk.data.path}). Install it offline with: "
+            f"python -m nltk.downloader -d {data_dirs[0]} punkt"
+        ) from None
+    return nltk.sent_tokenize
+
+
+_shard_parser: Optional[TextParser] = None
+
 
+def _init_shard_worker(parser: TextParser) -> None:
+    """Process pool initializer: keep one parser per worker process."""
+    global _shard_parser
+    _shard_parser = parser
 
 
+def _parse_shard(shard: str) -> List[TextSegment]:
+    """Parse one shard of text in a worker process."""
+    cleaned_text = _shard_parser._clean_text(shard)
+    return [_shard_parser._classify_sentence(s) for s in _shard_parser._split_sentences(cleaned_text)]
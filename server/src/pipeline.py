@@ -0,0 +1,198 @@
+"""
+Overlapped parse -> assign -> synthesize -> write pipeline.
+
+Each stage runs in its own thread and hands items to the next stage through
+a bounded queue, so a slow stage applies backpressure instead of letting the
+book pile up in memory, and the first audio is written while later chapters
+are still being parsed.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+from .parser import TextParser
+from .voice_assigner import VoiceAssigner, VoiceSegment
+from .synthesizer import AdaptiveSynthesizer
+from .utils import get_logger, log_performance_metric
+
+
+# Default capacity of each inter-stage queue
+DEFAULT_QUEUE_SIZE = 64
+
+# How often blocked stages re-check whether the pipeline was aborted
+_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Timing for one pipeline stage."""
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0
+    starved_seconds: float = 0.0   # waiting for input from the previous stage
+    blocked_seconds: float = 0.0   # waiting for room in the next stage's queue
+
+    def utilization(self, wall_seconds: float) -> float:
+        return self.busy_seconds / wall_seconds if wall_seconds else 0.0
+
+
+@dataclass
+class PipelineResult:
+    """Outputs and per-stage statistics of a pipeline run."""
+    outputs: List[Any]
+    stats: Dict[str, StageStats]
+    wall_seconds: float
+    first_output_seconds: Optional[float] = None
+    errors: List[BaseException] = field(default_factory=list)
+
+    @property
+    def bottleneck(self) -> str:
+        """Name of the busiest stage."""
+        return max(self.stats.values(), key=lambda s: s.busy_seconds).name
+
+
+class AudiobookPipeline:
+    """
+    Runs parsing, voice assignment, synthesis and writing concurrently.
+
+    Attributes:
+        parser (TextParser): Produces segments with iter_segments
+        assigner (VoiceAssigner): Assigns a voice to each segment
+        synthesizer (AdaptiveSynthesizer): Renders each segment to audio
+        writer (Callable): Called as writer(index, voice_segment, audio_path);
+            its return value is collected into PipelineResult.outputs
+        queue_size (int): Capacity of each inter-stage queue
+    """
+
+    STAGES = ("parse", "assign", "synthesize", "write")
+
+    def __init__(self, parser: TextParser, assigner: VoiceAssigner, synthesizer: AdaptiveSynthesizer,
+                 writer: Optional[Callable[[int, VoiceSegment, Path], Any]] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.parser = parser
+        self.assigner = assigner
+        self.synthesizer = synthesizer
+        self.writer = writer or (lambda index, voice_segment, audio_path: audio_path)
+        self.queue_size = queue_size
+        self.logger = get_logger(__name__)
+
+    def run(self, source: Union[TextIO, Iterable[str]]) -> PipelineResult:
+        """
+        Process a book end to end.
+
+        Args:
+            source: Open text file or iterable of text chunks (see TextParser.iter_segments)
+
+        Returns:
+            PipelineResult with writer outputs in document order
+
+        Raises:
+            The first exception raised by any stage
+        """
+        start_time = time.time()
+        stats = {name: StageStats(name) for name in self.STAGES}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.STAGES) - 1)]
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        outputs: List[Any] = []
+        first_output: List[float] = []
+
+        def parse_source():
+            return enumerate(self.parser.iter_segments(source))
+
+        def assign(item):
+            index, segment = item
+            return index, self.assigner.assign_voice(segment)
+
+        def synthesize(item):
+            index, voice_segment = item
+            return index, voice_segment, self.synthesizer.synthesize(**voice_segment.get_synthesizer_params())
+
+        def write(item):
+            if not first_output:
+                first_output.append(time.time() - start_time)
+            outputs.append(self.writer(*item))
+
+        def run_stage(name, inbox, outbox, work, produce=None):
+            stage = stats[name]
+            try:
+                items = produce() if produce else self._drain(inbox, stage, abort)
+                while not abort.is_set():
+                    busy_start = time.time()
+                    item = next(items, _DONE)
+                    if produce:
+                        stage.busy_seconds += time.time() - busy_start
+                    if item is _DONE:
+                        break
+                    busy_start = time.time()
+                    result = work(item)
+                    stage.busy_seconds += time.time() - busy_start
+                    stage.items += 1
+                    if outbox is not None and not self._put(outbox, result, stage, abort):
+                        return
+            except BaseException as error:
+                errors.append(error)
+                abort.set()
+            finally:
+                if outbox is not None:
+                    self._put(outbox, _DONE, stage, abort)
+
+        threads = [
+            threading.Thread(target=run_stage, args=("parse", None, queues[0], lambda item: item, parse_source)),
+            threading.Thread(target=run_stage, args=("assign", queues[0], queues[1], assign)),
+            threading.Thread(target=run_stage, args=("synthesize", queues[1], queues[2], synthesize)),
+            threading.Thread(target=run_stage, args=("write", queues[2], None, write)),
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        result = PipelineResult(outputs, stats, time.time() - start_time,
+                                first_output[0] if first_output else None, errors)
+        self._log_stats(result)
+        if errors:
+            raise errors[0]
+        return result
+
+    def _drain(self, inbox: queue.Queue, stage: StageStats, abort: threading.Event) -> Iterator[Any]:
+        """Yield items from inbox until the upstream stage finishes."""
+        while not abort.is_set():
+            wait_start = time.time()
+            try:
+                item = inbox.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                stage.starved_seconds += time.time() - wait_start
+                continue
+            stage.starved_seconds += time.time() - wait_start
+            if item is _DONE:
+                return
+            yield item
+
+    def _put(self, outbox: queue.Queue, item: Any, stage: StageStats, abort: threading.Event) -> bool:
+        """Put with backpressure; returns False if the pipeline was aborted."""
+        wait_start = time.time()
+        try:
+            while True:
+                try:
+                    outbox.put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    if abort.is_set():
+                        return False
+        finally:
+            stage.blocked_seconds += time.time() - wait_start
+
+    def _log_stats(self, result: PipelineResult) -> None:
+        for stage in result.stats.values():
+            log_performance_metric(f"pipeline_{stage.name}_utilization", round(stage.utilization(result.wall_seconds), 3))
+        self.logger.info(f"Pipeline processed {len(result.outputs)} segments in {result.wall_seconds:.2f}s; "
+                         f"bottleneck: {result.bottleneck}")
+        if result.first_output_seconds is not None:
+            log_performance_metric("pipeline_time_to_first_audio", round(result.first_output_seconds, 3))
@@ -0,0 +1,260 @@
+"""
+Seek-table sidecar for assembled audiobooks.
+
+While AudiobookAssembler writes book.wav it can also write book.wav.seek:
+for every segment, the frame where its audio starts, its length in frames
+and the span of text it was read from, plus the chapters. Records have a
+fixed size and are stored sorted, so the reader memory-maps the file and
+binary-searches it directly: finding the segment playing at a given time,
+the audio time of a character position (read-along highlighting) or the
+byte offset of chapter 14 is O(log n) and never decodes the audio.
+
+File layout:
+
+    b"RTMSEEK1"                      magic
+    uint32 header length
+    header                           JSON: audio format, data offset, chapters
+    records                          per segment, little-endian
+                                     uint64 start frame, uint32 frames,
+                                     uint32 text start, uint32 text end
+"""
+
+import json
+import mmap
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .assembler import AudioFormat
+    from .segment_table import SegmentTable
+
+
+SEEK_TABLE_MAGIC = b"RTMSEEK1"
+
+SEEK_TABLE_VERSION = 1
+
+# Sidecar file name: "<audio file name><suffix>"
+SEEK_TABLE_SUFFIX = ".seek"
+
+_RECORD = struct.Struct("<QIII")
+_LENGTH = struct.Struct("<I")
+
+# Chapter numbers written out, up to ninety-nine
+_UNITS = r'one|two|three|four|five|six|seven|eight|nine'
+_NUMBER_WORDS = (r'(?:twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety)(?:[- ](?:' + _UNITS + r'))?'
+                 r'|ten|eleven|twelve|(?:thir|four|fif|six|seven|eigh|nine)teen|' + _UNITS)
+
+# A heading line that opens a chapter, optionally followed by its title ("Chapter 3: The Storm");
+# matched against a whole line, so prose such as "Part I wanted to go." is not a heading
+CHAPTER_RE = re.compile(
+    r'(?:(?i:chapter|part|book)\s+(?:\d+|[IVXLCDM]+|(?i:' + _NUMBER_WORDS + r'))|(?i:prologue|epilogue))'
+    r'(?:\s*[:.—–-](?:\s*\S.*)?)?')
+
+
+@dataclass
+class SegmentMark:
+    """Where a segment's text is, and the chapter title if the segment opens a chapter."""
+    text_start: int
+    text_end: int
+    chapter: Optional[str] = None
+
+
+@dataclass
+class Chapter:
+    """A chapter boundary in the assembled audio."""
+    title: str
+    segment: int
+    start_seconds: float
+    byte_offset: int
+
+
+def seek_table_path(audio_path: Union[str, Path]) -> Path:
+    """Sidecar path for an assembled audio file."""
+    audio_path = Path(audio_path)
+    return audio_path.with_name(audio_path.name + SEEK_TABLE_SUFFIX)
+
+
+def _chapter_title(line: str) -> Optional[str]:
+    line = line.strip()
+    return line if CHAPTER_RE.fullmatch(line) else None
+
+
+def marks_from_table(table: "SegmentTable") -> List[SegmentMark]:
+    """
+    Marks for a parsed SegmentTable; text offsets index table.text.
+
+    A segment opens a chapter if it starts a line of the source text
+    (table.line_starts) and that whole line is a heading.
+    """
+    text, line_starts = table.text, table.line_starts
+    marks = []
+    for start, end in zip(table.starts, table.ends):
+        chapter = None
+        line = bisect_left(line_starts, start)
+        if line < len(line_starts) and line_starts[line] == start:
+            line_end = line_starts[line + 1] - 1 if line + 1 < len(line_starts) else len(text)
+            chapter = _chapter_title(text[start:line_end])
+        marks.append(SegmentMark(start, end, chapter))
+    return marks
+
+
+def marks_from_segments(contents: Sequence[str]) -> List[SegmentMark]:
+    """
+    Marks for segment texts laid out back to back, separated by single spaces.
+
+    Without line breaks to go on, only a segment that is a heading by itself
+    opens a chapter.
+    """
+    marks = []
+    cursor = 0
+    for content in contents:
+        marks.append(SegmentMark(cursor, cursor + len(content), _chapter_title(content)))
+        cursor += len(content) + 1
+    return marks
+
+
+class SeekTableWriter:
+    """Collects segment positions during assembly and writes the sidecar."""
+
+    def __init__(self, audio_format: "AudioFormat", data_offset: int):
+        self.audio_format = audio_format
+        self.data_offset = data_offset
+        self._records = bytearray()
+        self._chapters: List[Dict[str, object]] = []
+        self._count = 0
+
+    def add(self, start_frame: int, frames: int, mark: SegmentMark) -> None:
+        if mark.chapter is not None:
+            self._chapters.append({"title": mark.chapter, "segment": self._count})
+        self._records += _RECORD.pack(start_frame, frames, mark.text_start, mark.text_end)
+        self._count += 1
+
+    def write(self, path: Union[str, Path]) -> None:
+        header = json.dumps({
+            "version": SEEK_TABLE_VERSION,
+            "sample_rate": self.audio_format.sample_rate,
+            "channels": self.audio_format.channels,
+            "sample_width": self.audio_format.sample_width,
+            "data_offset": self.data_offset,
+            "segments": self._count,
+            "chapters": self._chapters,
+        }).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(SEEK_TABLE_MAGIC + _LENGTH.pack(len(header)) + header)
+            f.write(self._records)
+
+
+class _Column:
+    """One record field as a read-only sequence, so bisect can search the mmap in place."""
+
+    def __init__(self, table: "SeekTable", field: int):
+        self._table = table
+        self._field = field
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, index: int) -> int:
+        return self._table._record(index)[self._field]
+
+
+class SeekTable:
+    """
+    Memory-mapped reader for a seek-table sidecar.
+
+    Attributes:
+        sample_rate (int): Frames per second of the assembled audio
+        frame_bytes (int): Bytes per frame in the audio file
+        data_offset (int): Byte offset of the first sample in the audio file
+        chapters (List[Chapter]): Chapters in order
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(SEEK_TABLE_MAGIC)] != SEEK_TABLE_MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a seek table")
+        header_length = _LENGTH.unpack_from(self._mm, len(SEEK_TABLE_MAGIC))[0]
+        header_start = len(SEEK_TABLE_MAGIC) + _LENGTH.size
+        header = json.loads(self._mm[header_start:header_start + header_length])
+        if header["version"] != SEEK_TABLE_VERSION:
+            self._mm.close()
+            raise ValueError(f"Unsupported seek table version {header['version']}")
+        self._records_offset = header_start + header_length
+        self._count = header["segments"]
+        self.sample_rate = header["sample_rate"]
+        self.frame_bytes = header["channels"] * header["sample_width"]
+        self.data_offset = header["data_offset"]
+        self._start_frames = _Column(self, 0)
+        self._text_starts = _Column(self, 2)
+        self.chapters = [Chapter(c["title"], c["segment"], self.segment_start_seconds(c["segment"]),
+                                 self.byte_offset(c["segment"])) for c in header["chapters"]]
+        self._chapter_segments = [chapter.segment for chapter in self.chapters]
+
+    def __enter__(self) -> "SeekTable":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _record(self, index: int):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return _RECORD.unpack_from(self._mm, self._records_offset + index * _RECORD.size)
+
+    def segment_start_seconds(self, index: int) -> float:
+        return self._record(index)[0] / self.sample_rate
+
+    def segment_end_seconds(self, index: int) -> float:
+        """End of the segment's speech (the pause after it is not included)."""
+        start_frame, frames, _, _ = self._record(index)
+        return (start_frame + frames) / self.sample_rate
+
+    def text_span(self, index: int) -> Tuple[int, int]:
+        """(start, end) character offsets of the segment's text."""
+        return self._record(index)[2:]
+
+    def byte_offset(self, index: int) -> int:
+        """Offset of the segment's first sample in the audio file."""
+        return self.data_offset + self._record(index)[0] * self.frame_bytes
+
+    def segment_at_time(self, seconds: float) -> int:
+        """Index of the segment playing (or the pause after it) at the given time."""
+        frame = int(seconds * self.sample_rate)
+        return max(bisect_right(self._start_frames, frame) - 1, 0)
+
+    def segment_at_text(self, offset: int) -> int:
+        """Index of the segment containing (or just before) a character offset."""
+        return max(bisect_right(self._text_starts, offset) - 1, 0)
+
+    def time_at_text(self, offset: int) -> float:
+        """
+        Approximate audio time at which a character is spoken.
+
+        Speech within a segment is assumed to be spread evenly over its text.
+        """
+        index = self.segment_at_text(offset)
+        start_frame, frames, text_start, text_end = self._record(index)
+        fraction = (offset - text_start) / (text_end - text_start) if text_end > text_start else 0.0
+        fraction = min(max(fraction, 0.0), 1.0)
+        return (start_frame + fraction * frames) / self.sample_rate
+
+    def byte_offset_at_time(self, seconds: float) -> int:
+        """Frame-aligned offset in the audio file for a playback position."""
+        return self.data_offset + int(seconds * self.sample_rate) * self.frame_bytes
+
+    def chapter_at_time(self, seconds: float) -> Optional[Chapter]:
+        """Chapter playing at the given time, or None before the first chapter."""
+        position = bisect_right(self._chapter_segments, self.segment_at_time(seconds)) - 1
+        return self.chapters[position] if position >= 0 else None
@@ -0,0 +1,174 @@
+"""
+Columnar storage for parsed segments.
+
+A SegmentTable keeps one shared text buffer and, per segment, start/end
+offsets, an enum-coded type, an interned speaker, a confidence and an
+assigned voice, each in a typed array. A book of a million sentences costs
+a few dozen bytes per sentence on top of the text, instead of a TextSegment,
+a content string and a VoiceSegment each.
+
+Indexing or iterating yields SegmentView objects, which expose the same
+attributes as TextSegment and can be handed to the synthesizer like a
+VoiceSegment.
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+# Segment types in code order; the code is the index into this tuple
+SEGMENT_TYPES = ("narrative", "dialogue", "action")
+_TYPE_CODES = {name: code for code, name in enumerate(SEGMENT_TYPES)}
+
+# Column value for "no speaker" / "no voice assigned"
+_NONE = -1
+
+
+class SegmentView:
+    """TextSegment-compatible view of one row of a SegmentTable."""
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "SegmentTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def content(self) -> str:
+        return self.table.text[self.table.starts[self.index]:self.table.ends[self.index]]
+
+    @property
+    def segment_type(self) -> str:
+        return SEGMENT_TYPES[self.table.types[self.index]]
+
+    @property
+    def speaker(self) -> Optional[str]:
+        return self.table._speaker_names.get(self.table.speakers[self.index])
+
+    @property
+    def confidence(self) -> float:
+        return self.table.confidences[self.index]
+
+    @property
+    def voice_type(self) -> Optional[str]:
+        return self.table._voice_names.get(self.table.voices[self.index])
+
+    def get_synthesizer_params(self) -> Dict[str, str]:
+        """Same parameters as VoiceSegment.get_synthesizer_params."""
+        table, index = self.table, self.index
+        return {"text": table.text[table.starts[index]:table.ends[index]],
+                "voice_type": table._voice_names.get(table.voices[index])}
+
+    def __eq__(self, other) -> bool:
+        fields = ("content", "segment_type", "speaker", "confidence", "voice_type")
+        try:
+            return all(getattr(self, name) == getattr(other, name) for name in fields)
+        except AttributeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return (f"SegmentView(content={self.content!r}, segment_type={self.segment_type!r}, "
+                f"speaker={self.speaker!r}, confidence={self.confidence}, voice_type={self.voice_type!r})")
+
+
+class SegmentTable:
+    """
+    Segments stored as columns over one text buffer.
+
+    Attributes:
+        text (str): Buffer the start/end offsets point into
+        starts, ends (array): Character offsets of each segment
+        types (array): Index into SEGMENT_TYPES
+        speakers (array): Interned speaker id, or -1
+        confidences (array): Classification confidence
+        voices (array): Interned voice id, or -1 until a voice is assigned
+        line_starts (array): Sorted offsets in text where a line of the source
+            text began (empty if unknown); used to find chapter headings
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts = array("I")
+        self.ends = array("I")
+        self.types = array("B")
+        self.speakers = array("i")
+        self.confidences = array("d")
+        self.voices = array("i")
+        self.line_starts = array("I")
+        self._speaker_ids: Dict[str, int] = {}
+        self._speaker_names: Dict[int, str] = {}
+        self._voice_ids: Dict[str, int] = {}
+        self._voice_names: Dict[int, str] = {}
+
+    def append(self, start: int, end: int, segment_type: str, speaker: Optional[str] = None,
+               confidence: float = 1.0, voice_type: Optional[str] = None) -> int:
+        """Add a segment covering text[start:end]; returns its index."""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.types.append(_TYPE_CODES[segment_type])
+        self.speakers.append(self.speaker_id(speaker))
+        self.confidences.append(confidence)
+        self.voices.append(self.voice_id(voice_type))
+        return len(self.starts) - 1
+
+    def speaker_id(self, speaker: Optional[str]) -> int:
+        """Interned id of a speaker name (assigned on first use)."""
+        return self._intern(speaker, self._speaker_ids, self._speaker_names)
+
+    def voice_id(self, voice_type: Optional[str]) -> int:
+        """Interned id of a voice (assigned on first use)."""
+        return self._intern(voice_type, self._voice_ids, self._voice_names)
+
+    def speaker_names(self) -> Dict[int, str]:
+        """Interned speaker id -> name."""
+        return dict(self._speaker_names)
+
+    def voice_names(self) -> Dict[int, str]:
+        """Interned voice id -> voice_type."""
+        return dict(self._voice_names)
+
+    def set_voice(self, index: int, voice_type: Optional[str]) -> None:
+        self.voices[index] = self.voice_id(voice_type)
+
+    def content(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def to_segments(self) -> List:
+        """Materialise the rows as TextSegment objects (for callers that need real dataclasses)."""
+        from .parser import TextSegment
+        return [TextSegment(view.content, view.segment_type, view.speaker, view.confidence, view.voice_type)
+                for view in self]
+
+    def iter_synthesizer_params(self) -> Iterator[Dict[str, str]]:
+        """get_synthesizer_params() for every row, without building views."""
+        text, voice_names = self.text, self._voice_names
+        for start, end, voice in zip(self.starts, self.ends, self.voices):
+            yield {"text": text[start:end], "voice_type": voice_names.get(voice)}
+
+    def nbytes(self) -> int:
+        """Bytes used by the columns (not counting the text buffer)."""
+        columns = (self.starts, self.ends, self.types, self.speakers, self.confidences, self.voices,
+                   self.line_starts)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> SegmentView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return SegmentView(self, index)
+
+    def __iter__(self) -> Iterator[SegmentView]:
+        for index in range(len(self)):
+            yield SegmentView(self, index)
+
+    @staticmethod
+    def _intern(value: Optional[str], ids: Dict[str, int], names: Dict[int, str]) -> int:
+        if value is None:
+            return _NONE
+        interned = ids.get(value)
+        if interned is None:
+            interned = ids[value] = len(ids)
+            names[interned] = value
+        return interned
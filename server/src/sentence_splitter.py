@@ -0,0 +1,157 @@
+"""
+Rule-based, quote-aware sentence splitter.
+
+An alternative to nltk's punkt tokenizer that needs no downloaded data and
+never splits inside a quotation, so a line like
+"Okay, maybe I'm lost—but... we'll find it." stays one segment for the
+dialogue patterns. It knows common abbreviations, initials and ellipses,
+and keeps a quote together with its attribution ("Run!" Bob shouted.).
+A quotation that runs over several paragraphs reopens each paragraph
+without closing the previous one; an opening quote after a paragraph break
+or a finished sentence, while a quote is open, starts a new sentence inside
+the same quotation instead of toggling the quote state.
+
+The text is scanned once with a regex for quote characters and runs of
+terminal punctuation; every decision looks at a bounded window around the
+match, so splitting is linear in the length of the text.
+"""
+
+import re
+from typing import FrozenSet, Iterable, List, Optional
+
+
+# Quotes longer than this are assumed to be unbalanced (a missing closing
+# quote) and stop suppressing sentence breaks
+DEFAULT_MAX_QUOTE_CHARS = 1000
+
+DEFAULT_ABBREVIATIONS = frozenset("""
+    mr mrs ms dr prof sr jr st mt ft capt col gen lt sgt cpl rev hon messrs mme mlle
+    vs etc eg ie al cf approx no nos vol pp ed eds est inc ltd co corp dept univ
+    jan feb mar apr jun jul aug sep sept oct nov dec
+""".split())
+
+# Double quotes tracked for nesting; the ASCII quote toggles
+_OPEN_QUOTE = "“"
+_CLOSE_QUOTE = "”"
+_QUOTE_CHARS = '"“”'
+
+# Terminal punctuation (with any closing quotes/brackets) followed by whitespace or the end,
+# or a lone double quote anywhere
+_CANDIDATE_RE = re.compile(r'(?:\.{2,}|…|[.!?]+)["”’)\]]*(?=\s|\Z)|["“”]')
+
+# What a new sentence may start with
+_SENTENCE_START_RE = re.compile(r'\s+(?=[\w"“‘(\[])')
+
+# Text before a quote that continues a quotation in a new paragraph: a paragraph
+# break, or (in whitespace-collapsed text) a finished sentence
+_CONTINUATION_RE = re.compile(r'(?:\n[^\S\n]*\n\s*|[.!?…]\s+)\Z')
+
+# Characters looked back over for _CONTINUATION_RE
+_CONTINUATION_WINDOW = 16
+
+# Longest word looked at when checking for an abbreviation
+_MAX_WORD_CHARS = 40
+
+# Attribution after a closing quote: `Bob said`, `said Bob`, `she asked`
+_SPEECH_VERBS = r'(?:said|asked|replied|whispered|muttered|shouted|cried|called|answered|added|continued)'
+_ATTRIBUTION_RE = re.compile(r'\s+(?:[A-Z][\w\'-]*(?:\s+[A-Z][\w\'-]*)?\s+' + _SPEECH_VERBS
+                             + r'|' + _SPEECH_VERBS + r')\b')
+
+
+class RuleBasedSplitter:
+    """
+    Callable splitting cleaned text into sentences.
+
+    Attributes:
+        abbreviations (FrozenSet[str]): Lower-case words that a period does not end
+        max_quote_chars (int): Quote length after which an unclosed quote is ignored
+    """
+
+    # Quote state carries across sentences and paragraphs, so text cut into
+    # pieces does not split the same as the whole (see parse_text_parallel)
+    stateful = True
+
+    def __init__(self, abbreviations: Optional[Iterable[str]] = None,
+                 max_quote_chars: int = DEFAULT_MAX_QUOTE_CHARS):
+        self.abbreviations: FrozenSet[str] = frozenset(
+            a.lower().rstrip(".") for a in (DEFAULT_ABBREVIATIONS if abbreviations is None else abbreviations))
+        self.max_quote_chars = max_quote_chars
+
+    def __call__(self, text: str) -> List[str]:
+        sentences = []
+        sentence_start = 0
+        quote_start = -1  # index of the open quote, or -1 outside quotes
+
+        for match in _CANDIDATE_RE.finditer(text):
+            position = match.start()
+            token = match.group()
+            if quote_start >= 0 and position - quote_start > self.max_quote_chars:
+                quote_start = -1
+
+            if len(token) == 1 and token in _QUOTE_CHARS:
+                if quote_start >= 0 and self._continues_quotation(text, position, token):
+                    sentence = text[sentence_start:position].strip()
+                    if sentence:
+                        sentences.append(sentence)
+                    sentence_start = position
+                    quote_start = position
+                    continue
+                quote_start = self._update_quote(token, position, quote_start)
+                continue
+
+            closed_quote = False
+            for offset, char in enumerate(token):
+                if char in _QUOTE_CHARS:
+                    was_open = quote_start >= 0
+                    quote_start = self._update_quote(char, position + offset, quote_start)
+                    closed_quote = closed_quote or (was_open and quote_start < 0)
+            if quote_start >= 0:
+                continue  # never split inside a quotation
+
+            end = match.end()
+            next_start = _SENTENCE_START_RE.match(text, end)
+            if next_start is None or not self._is_boundary(text, position, token, next_start.end(), closed_quote):
+                continue
+            sentence = text[sentence_start:end].strip()
+            if sentence:
+                sentences.append(sentence)
+            sentence_start = next_start.end()
+
+        rest = text[sentence_start:].strip()
+        if rest:
+            sentences.append(rest)
+        return sentences
+
+    @staticmethod
+    def _continues_quotation(text: str, position: int, char: str) -> bool:
+        """Whether the quote at position reopens a quotation in a new paragraph."""
+        if char == _CLOSE_QUOTE or position + 1 >= len(text) or text[position + 1].isspace():
+            return False
+        return _CONTINUATION_RE.search(text, max(0, position - _CONTINUATION_WINDOW), position) is not None
+
+    @staticmethod
+    def _update_quote(char: str, position: int, quote_start: int) -> int:
+        if char == _OPEN_QUOTE:
+            return position
+        if char == _CLOSE_QUOTE:
+            return -1
+        # ASCII quote: closes an open quote of either style, otherwise opens one
+        return -1 if quote_start >= 0 else position
+
+    def _is_boundary(self, text: str, position: int, token: str, next_start: int, closed_quote: bool) -> bool:
+        """Whether the terminal punctuation `token` at `position` ends a sentence."""
+        if text[next_start].islower():
+            return False  # "... the end... and then" or 'Mr. smith' typos: keep going
+        if token[0] == "." and not token.startswith(".."):
+            # Word before the period, e.g. "Mr" in "Mr." or "e.g" in "e.g."
+            word_start = text.rfind(" ", max(0, position - _MAX_WORD_CHARS), position) + 1
+            word = text[word_start:position].lstrip("\"“‘([")
+            if word.lower().replace(".", "") in self.abbreviations:
+                return False
+            if len(word) == 1 and word.isupper():
+                return False  # an initial, as in "J. R. R. Tolkien"
+            if "." in word and word.replace(".", "").isalpha():
+                return False  # "e.g." style abbreviations not in the list
+        if closed_quote and _ATTRIBUTION_RE.match(text, position + len(token)):
+            return False  # "Run!" Bob shouted.
+        return True
@@ -0,0 +1,186 @@
+"""
+Persistent content-addressed cache for synthesized audio.
+
+Audio files are keyed by a SHA-256 digest of the model name, speaker id and
+normalized text, so the same sentence rendered by the same voice is only
+synthesized once across runs and across worker processes.
+"""
+
+import hashlib
+import os
+import re
+import time
+import unicodedata
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+from .utils import get_logger
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Default cache size limit (2 GB)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Eviction trims the cache down to this fraction of max_bytes to avoid thrashing
+EVICTION_LOW_WATERMARK = 0.9
+
+# Temp files older than this are leftovers from crashed writers
+STALE_TEMP_SECONDS = 3600
+
+_TEMP_SUFFIX = ".tmp.wav"
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a SynthesisCache."""
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    bytes_evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+class SynthesisCache:
+    """
+    Size-bounded LRU cache of synthesized audio files on disk.
+
+    Entries live at <cache_dir>/<key[:2]>/<key>.wav. A hit refreshes the file's
+    mtime, and eviction removes the least recently used files first. Writes go
+    to a unique temp file that is atomically renamed into place, so concurrent
+    workers never observe partial audio.
+
+    Attributes:
+        cache_dir (Path): Root directory of the cache
+        max_bytes (int): Total size the cache is trimmed to
+        stats (CacheStats): Hit/miss/eviction counters for this process
+    """
+
+    def __init__(self, cache_dir, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self.logger = get_logger(__name__)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def make_key(model_name: str, speaker: Optional[str], text: str) -> str:
+        """Stable digest of everything that determines the audio output."""
+        payload = "\0".join((model_name, speaker or "", normalize_text(text)))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Final location of the audio file for a key."""
+        return self.cache_dir / key[:2] / f"{key}.wav"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached audio path for key, or None on a miss."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # refresh LRU position
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return path
+
+    def put(self, key: str, write_audio: Callable[[Path], None]) -> Path:
+        """
+        Store audio for key, writing it through a temp file.
+
+        Args:
+            key: Cache key from make_key
+            write_audio: Callback that writes the audio to the given path
+
+        Returns:
+            Path: Final location of the cached audio
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_name(f".{key}.{os.getpid()}.{uuid.uuid4().hex}{_TEMP_SUFFIX}")
+        try:
+            write_audio(temp_path)
+            size = temp_path.stat().st_size
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        self.stats.writes += 1
+        self._size += size
+        if self._size > self.max_bytes:
+            self.evict()
+        return path
+
+    def get_or_create(self, key: str, write_audio: Callable[[Path], None]) -> Tuple[Path, bool]:
+        """Return (path, hit), synthesizing through write_audio on a miss."""
+        path = self.get(key)
+        if path is not None:
+            return path, True
+        return self.put(key, write_audio), False
+
+    def evict(self) -> None:
+        """Remove least recently used entries until under the low watermark."""
+        entries = []
+        now = time.time()
+        for path, size, mtime in self._scan(include_temp=True):
+            if path.name.endswith(_TEMP_SUFFIX):
+                if now - mtime > STALE_TEMP_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((mtime, size, path))
+
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * EVICTION_LOW_WATERMARK)
+        entries.sort()
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+            else:
+                self.stats.evictions += 1
+                self.stats.bytes_evicted += size
+            self._size -= size
+
+        self.logger.debug(f"Cache eviction done: {self._size / 1e6:.1f} MB in use")
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for path, _, _ in self._scan(include_temp=True):
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate bytes currently used by the cache."""
+        return self._size
+
+    def _scan(self, include_temp: bool = False) -> Iterator[Tuple[Path, int, float]]:
+        """Yield (path, size, mtime) for cache files."""
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not include_temp and entry.name.endswith(_TEMP_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield Path(entry.path), stat.st_size, stat.st_mtime
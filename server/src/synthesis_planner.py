@@ -0,0 +1,175 @@
+"""
+Synthesis planning between voice assignment and synthesis.
+
+The parser emits one segment per sentence, so a run of short narrative
+sentences turns into many tiny TTS calls, each paying the model's fixed
+per-call cost, while a very long sentence can exceed what the model handles
+well. The planner merges consecutive segments that share a voice into chunks
+near a target length and splits oversized segments at clause boundaries.
+Every chunk records which characters came from which original segment, so
+timings and captions can be mapped back.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from .utils import get_logger, log_performance_metric
+
+if TYPE_CHECKING:
+    from .voice_assigner import VoiceSegment
+
+
+# Merge segments until a chunk reaches about this many characters
+DEFAULT_TARGET_CHARS = 250
+
+# Segments longer than this are split at clause boundaries
+DEFAULT_MAX_CHARS = 400
+
+# Places a long sentence may be split, best first
+_CLAUSE_BREAK_RES = (
+    re.compile(r'[;:]\s+'),
+    re.compile(r'(?:,|\s[-–—]+)\s+'),
+    re.compile(r'\s+'),
+)
+
+
+@dataclass
+class ChunkPart:
+    """Characters [start, end) of a chunk's text, taken from one original segment."""
+    segment_index: int
+    start: int
+    end: int
+    segment_offset: int = 0  # where the part starts within the segment's text
+
+
+@dataclass
+class SynthesisChunk:
+    """One TTS call: text for a single voice, built from one or more segments."""
+    text: str
+    voice_type: str
+    parts: List[ChunkPart] = field(default_factory=list)
+
+    @property
+    def segment_indices(self) -> List[int]:
+        return [part.segment_index for part in self.parts]
+
+    def get_synthesizer_params(self) -> Dict[str, str]:
+        """Same parameters as VoiceSegment.get_synthesizer_params."""
+        return {"text": self.text, "voice_type": self.voice_type}
+
+
+@dataclass
+class SynthesisPlan:
+    """Chunks to synthesize, in document order, for a list of segments."""
+    chunks: List[SynthesisChunk]
+    segment_count: int
+
+    @property
+    def call_reduction(self) -> float:
+        """Fraction of synthesis calls saved relative to one call per segment."""
+        if not self.segment_count:
+            return 0.0
+        return 1.0 - len(self.chunks) / self.segment_count
+
+    def segment_times(self, chunk_seconds: Sequence[float]) -> List[Tuple[float, float]]:
+        """
+        Estimate when each original segment starts and ends in the audio.
+
+        Args:
+            chunk_seconds: Audio duration of each chunk, in plan order
+
+        Returns:
+            (start, end) seconds per original segment, assuming chunks play
+            back to back and speech within a chunk is spread evenly by character
+        """
+        times: List[Optional[List[float]]] = [None] * self.segment_count
+        offset = 0.0
+        for chunk, seconds in zip(self.chunks, chunk_seconds):
+            per_char = seconds / len(chunk.text) if chunk.text else 0.0
+            for part in chunk.parts:
+                start = offset + part.start * per_char
+                end = offset + part.end * per_char
+                if times[part.segment_index] is None:
+                    times[part.segment_index] = [start, end]
+                else:
+                    times[part.segment_index][1] = end  # later part of a split segment
+            offset += seconds
+        return [tuple(t) if t is not None else (offset, offset) for t in times]
+
+
+class SynthesisPlanner:
+    """
+    Groups voice segments into synthesis chunks.
+
+    Attributes:
+        target_chars (int): Stop merging once a chunk reaches this length
+        max_chars (int): Split segments longer than this
+    """
+
+    def __init__(self, target_chars: int = DEFAULT_TARGET_CHARS, max_chars: int = DEFAULT_MAX_CHARS):
+        if target_chars > max_chars:
+            raise ValueError("target_chars must not exceed max_chars")
+        self.target_chars = target_chars
+        self.max_chars = max_chars
+        self.logger = get_logger(__name__)
+
+    def plan(self, voice_segments: Sequence["VoiceSegment"]) -> SynthesisPlan:
+        """
+        Merge and split segments into chunks.
+
+        Args:
+            voice_segments: Output of VoiceAssigner.assign_voices (or anything
+                with get_synthesizer_params())
+
+        Returns:
+            SynthesisPlan whose chunks can be passed to the synthesizer
+        """
+        chunks: List[SynthesisChunk] = []
+        current: Optional[SynthesisChunk] = None
+        for index, voice_segment in enumerate(voice_segments):
+            params = voice_segment.get_synthesizer_params()
+            text, voice_type = params["text"].strip(), params["voice_type"]
+            for piece_start, piece in self._split(text):
+                fits = (current is not None and current.voice_type == voice_type
+                        and len(current.text) < self.target_chars
+                        and len(current.text) + 1 + len(piece) <= self.max_chars)
+                if not fits:
+                    current = SynthesisChunk("", voice_type)
+                    chunks.append(current)
+                start = len(current.text) + 1 if current.text else 0
+                current.text = f"{current.text} {piece}" if current.text else piece
+                current.parts.append(ChunkPart(index, start, start + len(piece), piece_start))
+
+        plan = SynthesisPlan(chunks, len(voice_segments))
+        self.logger.info(f"Planned {len(chunks)} synthesis calls for {len(voice_segments)} segments "
+                         f"({plan.call_reduction:.0%} fewer)")
+        log_performance_metric("planner_call_reduction", round(plan.call_reduction, 3))
+        return plan
+
+    def _split(self, text: str) -> List[Tuple[int, str]]:
+        """Pieces of text no longer than max_chars, as (offset in text, piece)."""
+        pieces = []
+        offset = 0
+        while len(text) - offset > self.max_chars:
+            cut = self._clause_break(text, offset)
+            piece = text[offset:cut].rstrip()
+            pieces.append((offset, piece))
+            offset = cut
+            while offset < len(text) and text[offset].isspace():
+                offset += 1
+        if offset < len(text):
+            pieces.append((offset, text[offset:]))
+        return pieces
+
+    def _clause_break(self, text: str, offset: int) -> int:
+        """Index just after the best break point in text[offset:offset + max_chars]."""
+        limit = offset + self.max_chars
+        # Do not leave a piece so short that it is a call of its own
+        earliest = offset + self.max_chars // 3
+        for pattern in _CLAUSE_BREAK_RES:
+            best = None
+            for match in pattern.finditer(text, earliest, limit + 1):
+                best = match
+            if best is not None:
+                return best.end() if pattern is not _CLAUSE_BREAK_RES[-1] else best.start()
+        return limit  # no break anywhere: cut mid-word
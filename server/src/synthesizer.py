@@ -5,16 +5,69 @@ This module handles all TTS operations using CoquiTTS with GPU acceleration.
 Supports both fast development models and high-quality production models.
 """
 
-import torch
-from TTS.api import TTS
-import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
-from .utils import setup_logging, get_logger, log_tts_operation
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from .utils import setup_logging, get_logger, log_tts_operation, log_performance_metric
+from .synthesis_cache import SynthesisCache, normalize_text
+from .tts_backends import TTSBackend, write_wav
+from .model_pool import ModelPool
+from .metrics import SEGMENTS_TOTAL, CACHE_LOOKUPS_TOTAL, TIME_TO_FIRST_AUDIO
+from .checkpoint import SynthesisCheckpoint, segment_key
+from .model_selector import ModelSelector
+from contextlib import contextmanager
+import itertools
+import queue
+import threading
 import time
 import logging
 
 
+FAST_MODEL = "tts_models/en/ljspeech/fast_pitch"
+QUALITY_MODEL = "tts_models/en/vctk/vits"
+
+DEVELOPMENT_VOICES = {"default": "default"}
+PRODUCTION_VOICES = {
+    "narrator": "p225",
+    "character_1": "p226", 
+    "character_2": "p227",
+    # ... more character voices
+}
+
+# Get project root relative to this file
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+AUDIO_OUTPUT_DIR = PROJECT_ROOT / "server" / "audio_output"
+
+# Default number of segments per inference call in synthesize_batch
+DEFAULT_BATCH_SIZE = 8
+
+# Segments synthesize_resumable() renders between checkpoint records
+DEFAULT_CHECKPOINT_CHUNK = 64
+
+# stream() synthesizes this many leading segments one by one, before batching
+DEFAULT_PRIORITY_SEGMENTS = 3
+
+# Finished segments stream() may hold ahead of a slow consumer
+DEFAULT_STREAM_PREFETCH = 16
+
+# Data size written in a streamed WAV header, where the real size is unknown
+_STREAMING_DATA_SIZE = 0xFFFFFFFF - 36
+
+_STREAM_DONE = object()
+
+if TYPE_CHECKING:
+    from .voice_assigner import VoiceSegment
+
+
+@dataclass
+class AudioChunk:
+    """Audio for one segment, as yielded by AdaptiveSynthesizer.stream."""
+    index: int
+    path: Path
+    pcm: bytes           # 16-bit mono PCM samples
+    sample_rate: int
+    elapsed: float       # seconds from the start of the stream until this chunk was ready
+
 
 class AdaptiveSynthesizer:
     """
@@ -22,84 +75,425 @@ class AdaptiveSynthesizer:
     
     Attributes:
         development_mode (bool): If True, uses fast model for rapid iteration
-        tts (TTS): The active TTS model instance
+        backend (TTSBackend): The active TTS model, fetched from the pool on each use
+        model_name (str): Name of the active TTS model
         voice_mapping (Dict[str, str]): Maps character types to voice IDs
+        cache (SynthesisCache): Content-addressed store of synthesized audio
+        selector (Optional[ModelSelector]): Chooses the model per call under load;
+            None always uses the active model
     """
     
-    def __init__(self, development_mode: bool = True):
+    def __init__(self, development_mode: bool = True, cache: Optional[SynthesisCache] = None,
+                 backend: Optional[TTSBackend] = None, model_pool: Optional[ModelPool] = None,
+                 fast_model: str = FAST_MODEL, quality_model: str = QUALITY_MODEL,
+                 selector: Optional[ModelSelector] = None):
         self.development_mode = development_mode  
         self.logger = get_logger(__name__)        
         self.logger.info(f"Initializing synthesizer in {'development' if development_mode else 'production'} mode")
+        self.audio_output_dir = AUDIO_OUTPUT_DIR
+        self.cache = cache or SynthesisCache(self.audio_output_dir / "cache")
+        self.model_pool = model_pool or ModelPool()
+        self.fast_model = fast_model
+        self.quality_model = quality_model
+        self.selector = selector
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
         
         if development_mode:
             setup_logging(logging.DEBUG,True)
-            # Fast model for development
-            self.tts = TTS("tts_models/en/ljspeech/fast_pitch")
-            self.voice_mapping = {"default": "default"}
         else:
             setup_logging(logging.INFO,True)
-            # High-quality model for production
-            self.tts = TTS("tts_models/en/vctk/vits")
-            self.voice_mapping = {
-                "narrator": "p225",
-                "character_1": "p226", 
-                "character_2": "p227",
-                # ... more character voices
-            }
-        # Move to GPU if available
-        if torch.cuda.is_available():
-            self.tts.to("cuda")
+        
+        if backend is not None:
+            # Pre-loaded model, e.g. a stub for tests and benchmarks
+            self.model_pool.add(backend)
+            self.model_name = backend.model_name
+            self.voice_mapping = dict(DEVELOPMENT_VOICES if development_mode else PRODUCTION_VOICES)
+        else:
+            self.switch_mode(development_mode)
     
     
     
-    def synthesize(self, text: str, voice_type: str = "narrator") -> str:
+    def synthesize(self, text: str, voice_type: str = "narrator", model_name: Optional[str] = None) -> str:
         """
         Generate audio from text using appropriate voice.
         
         Args:
             text: The text to synthesize
             voice_type: Type of voice (narrator, character_1, etc.)
+            model_name: Model to use instead of the active one (loaded through the pool)
             
         Returns:
             str: Path to generated audio file
         """
         start_time = time.time()
-        voice_id = voice_type
+        text = normalize_text(text)
+        backend = self._backend_for(self._select_model(model_name, len(text)))
+        speaker = self._speaker_for(voice_type, backend)
         
-        # Get project root relative to this file
-        current_file = os.path.abspath(__file__)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-        self.audio_output_dir = Path(project_root) / "server" / "audio_output"
-        output_path = self.audio_output_dir / f"{voice_type}_{hash(text)}.wav"
+        def write_audio(path: Path) -> None:
+            write_wav(path, backend.synthesize(text, speaker), backend.sample_rate)
         
-        if self.development_mode:
-            self.tts.tts_to_file(text=text, file_path=output_path)
-        else:
-            self.tts.tts_to_file(text=text, speaker=voice_id, file_path=output_path)
+        key = self.cache.make_key(backend.model_name, speaker, text)
+        with self._tracked_call():
+            output_path, cache_hit = self.cache.get_or_create(key, write_audio)
             
         duration = time.time() - start_time
-        log_tts_operation("voice_synthesis", duration, voice_type=voice_type, text_length=len(text))
+        if self.selector is not None:
+            if not cache_hit:
+                self.selector.observe(backend.model_name, duration, len(text))
+            if model_name is None and backend.model_name != self.selector.preferred:
+                self.selector.record_degraded(text, voice_type, backend.model_name, output_path)
+        log_tts_operation("voice_synthesis", duration, model=backend.model_name, voice_type=voice_type,
+                          text_length=len(text), cache_hit=cache_hit)
+        SEGMENTS_TOTAL.inc(stage="synthesize", model=backend.model_name, voice_id=voice_type)
+        CACHE_LOOKUPS_TOTAL.inc(result="hit" if cache_hit else "miss")
         
         return output_path
     
     
-    def switch_mode(self, development_mode: bool) -> None:
-        """Switch between development and production models."""
-        self.development_mode = development_mode
-        if development_mode:
-            self.tts = TTS("tts_models/en/ljspeech/fast_pitch")
-        else:
-            self.tts = TTS("tts_models/en/vctk/vits")
+    def synthesize_batch(self, voice_segments: List["VoiceSegment"],
+                         batch_size: int = DEFAULT_BATCH_SIZE,
+                         model_name: Optional[str] = None) -> List[Path]:
+        """
+        Generate audio for many segments with batched inference.
+        
+        Cached segments are skipped, the rest are grouped by speaker and sorted
+        by text length so each batch holds similarly sized texts (minimal
+        padding), then run through the backend in batches of batch_size.
+        
+        Args:
+            voice_segments: Output of VoiceAssigner.assign_voices
+            batch_size: Maximum number of texts per inference call
+            model_name: Model to use instead of the active one (loaded through the pool)
+            
+        Returns:
+            List[Path]: Audio file for each segment, in the original order
+        """
+        return self._synthesize_batch(voice_segments, batch_size, model_name)[0]
     
     
-    def get_available_voices(self) -> Dict[str, str]:
-        """Return available voice mappings."""
-        return self.voice_mapping
+    def _synthesize_batch(self, voice_segments: List["VoiceSegment"], batch_size: int,
+                          model_name: Optional[str]) -> Tuple[List[Path], str]:
+        """synthesize_batch, also returning the model that rendered the segments."""
+        start_time = time.time()
+        params_list = [voice_segment.get_synthesizer_params() for voice_segment in voice_segments]
+        texts = [normalize_text(params["text"]) for params in params_list]
+        backend = self._backend_for(self._select_model(model_name, sum(len(text) for text in texts)))
+        output_paths: List[Optional[Path]] = [None] * len(voice_segments)
+        pending: Dict[str, List[int]] = {}  # cache key -> segment indices
+        groups: Dict[Optional[str], List[Tuple[str, str]]] = {}  # speaker -> [(key, text)]
+        
+        for index, (params, text) in enumerate(zip(params_list, texts)):
+            speaker = self._speaker_for(params["voice_type"], backend)
+            key = self.cache.make_key(backend.model_name, speaker, text)
+            if key in pending:
+                pending[key].append(index)  # repeated phrase within this call
+                continue
+            cached_path = self.cache.get(key)
+            if cached_path is not None:
+                output_paths[index] = cached_path
+                continue
+            pending[key] = [index]
+            groups.setdefault(speaker, []).append((key, text))
+        
+        batch_count = 0
+        with self._tracked_call():
+            for speaker, items in groups.items():
+                items.sort(key=lambda item: len(item[1]))
+                for batch in _length_buckets(items, batch_size):
+                    batch_start = time.time()
+                    waveforms = backend.synthesize_batch([text for _, text in batch], speaker)
+                    batch_count += 1
+                    for (key, _), waveform in zip(batch, waveforms):
+                        path = self.cache.put(key, lambda p, w=waveform: write_wav(p, w, backend.sample_rate))
+                        for index in pending[key]:
+                            output_paths[index] = path
+                    if self.selector is not None:
+                        self.selector.observe(backend.model_name, time.time() - batch_start,
+                                              sum(len(text) for _, text in batch))
+        
+        if self.selector is not None and model_name is None and backend.model_name != self.selector.preferred:
+            for params, text, path in zip(params_list, texts, output_paths):
+                self.selector.record_degraded(text, params["voice_type"], backend.model_name, path)
+        duration = time.time() - start_time
+        synthesized = sum(len(items) for items in groups.values())
+        log_tts_operation("batch_synthesis", duration, model=backend.model_name, segments=len(voice_segments),
+                          synthesized=synthesized, batches=batch_count)
+        SEGMENTS_TOTAL.inc(len(voice_segments), stage="batch_synthesis", model=backend.model_name)
+        CACHE_LOOKUPS_TOTAL.inc(len(voice_segments) - synthesized, result="hit")
+        CACHE_LOOKUPS_TOTAL.inc(synthesized, result="miss")
+        return output_paths, backend.model_name
     
     
+    def synthesize_resumable(self, voice_segments: Sequence["VoiceSegment"], checkpoint_path,
+                             batch_size: int = DEFAULT_BATCH_SIZE,
+                             chunk_segments: int = DEFAULT_CHECKPOINT_CHUNK) -> List[Path]:
+        """
+        Synthesize a whole book, recording progress so a restarted run resumes.
+        
+        Segments already in the checkpoint manifest (with the same text, voice
+        and model, and an intact audio file) are skipped; the rest are
+        synthesized in batches and appended to the manifest as they finish.
+        Entries are keyed by the model that actually rendered them, so segments
+        the selector degraded to a fallback model are rendered again on resume.
+        
+        Args:
+            voice_segments: Output of VoiceAssigner.assign_voices
+            checkpoint_path: Manifest file for this job
+            batch_size: Maximum number of texts per inference call
+            chunk_segments: Segments synthesized between checkpoint records
+            
+        Returns:
+            List[Path]: Audio file for each segment, in the original order
+        """
+        start_time = time.time()
+        model = self.selector.preferred if self.selector is not None else self.model_name
+        segment_params = []
+        for voice_segment in voice_segments:
+            params = voice_segment.get_synthesizer_params()
+            segment_params.append((normalize_text(params["text"]), params["voice_type"]))
+        keys = [segment_key(text, voice_type, model) for text, voice_type in segment_params]
+        
+        with SynthesisCheckpoint(checkpoint_path) as checkpoint:
+            done = checkpoint.resume(keys)
+            output_paths: List[Optional[Path]] = [Path(done[i].path) if i in done else None
+                                                  for i in range(len(keys))]
+            pending = [i for i in range(len(keys)) if i not in done]
+            for chunk_start in range(0, len(pending), chunk_segments):
+                indices = pending[chunk_start:chunk_start + chunk_segments]
+                paths, rendered_by = self._synthesize_batch([voice_segments[i] for i in indices], batch_size, None)
+                for index, path in zip(indices, paths):
+                    checkpoint.record(index, segment_key(*segment_params[index], rendered_by), path)
+                    output_paths[index] = Path(path)
+        
+        duration = time.time() - start_time
+        log_tts_operation("resumable_synthesis", duration, model=model, segments=len(keys),
+                          resumed=len(done), synthesized=len(pending))
+        return output_paths
     
     
+    def stream(self, voice_segments: Iterable["VoiceSegment"],
+               priority_segments: int = DEFAULT_PRIORITY_SEGMENTS,
+               batch_size: int = DEFAULT_BATCH_SIZE,
+               prefetch: int = DEFAULT_STREAM_PREFETCH,
+               model_name: Optional[str] = None) -> Iterator[AudioChunk]:
+        """
+        Yield audio for segments in order, each as soon as it is synthesized.
+        
+        The first priority_segments are synthesized one at a time so the first
+        audio is ready after a single model call; the rest are synthesized in
+        batches on a background thread while earlier chunks are being played.
+        One model renders the whole stream (chosen by the selector when the
+        stream starts), so every chunk has the same sample rate and voice.
+        
+        Args:
+            voice_segments: Segments in document order (may be a lazy iterable)
+            priority_segments: Leading segments synthesized individually
+            batch_size: Segments per inference call after the priority ones
+            prefetch: Finished segments held ahead of the consumer
+            model_name: Model to use instead of the active one or the selector's choice
+            
+        Yields:
+            AudioChunk per segment, in order
+        """
+        from .assembler import read_wav_info
+        
+        start_time = time.time()
+        segments = iter(voice_segments)
+        first = next(segments, None)
+        if first is None:
+            return
+        segments = itertools.chain([first], segments)
+        degraded = False
+        if model_name is None and self.selector is not None:
+            model_name = self._select_model(None, len(normalize_text(first.get_synthesizer_params()["text"])))
+            degraded = model_name != self.selector.preferred
+        stream_model = model_name or self.model_name
+        ready: "queue.Queue" = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def render(batch: List["VoiceSegment"]) -> List[Path]:
+            if len(batch) == 1:
+                paths = [self.synthesize(**batch[0].get_synthesizer_params(), model_name=model_name)]
+            else:
+                paths = self.synthesize_batch(batch, batch_size, model_name)
+            if degraded:
+                for voice_segment, path in zip(batch, paths):
+                    params = voice_segment.get_synthesizer_params()
+                    self.selector.record_degraded(normalize_text(params["text"]), params["voice_type"],
+                                                  model_name, path)
+            return paths
+        
+        def produce() -> None:
+            try:
+                index = 0
+                for voice_segment in itertools.islice(segments, priority_segments):
+                    if not put((index, render([voice_segment])[0])):
+                        return
+                    index += 1
+                batch = []
+                for voice_segment in segments:
+                    batch.append(voice_segment)
+                    if len(batch) == batch_size:
+                        for path in render(batch):
+                            if not put((index, path)):
+                                return
+                            index += 1
+                        batch = []
+                for path in render(batch) if batch else ():
+                    if not put((index, path)):
+                        return
+                    index += 1
+                put(_STREAM_DONE)
+            except BaseException as error:
+                put(error)
+        
+        producer = threading.Thread(target=produce, name="synthesis-stream", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is _STREAM_DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                index, path = item
+                data = Path(path).read_bytes()
+                info = read_wav_info(data)
+                elapsed = time.time() - start_time
+                if index == 0:
+                    TIME_TO_FIRST_AUDIO.observe(elapsed, model=stream_model)
+                    log_performance_metric("time_to_first_audio", round(elapsed, 3))
+                yield AudioChunk(index, Path(path), data[info.data_offset:info.data_offset + info.data_size],
+                                 info.sample_rate, elapsed)
+        finally:
+            # Also reached when the consumer stops early (e.g. the listener disconnected)
+            stop.set()
+    
+    
+    def stream_wav(self, voice_segments: Iterable["VoiceSegment"], **stream_options) -> Iterator[bytes]:
+        """
+        Stream segments as one WAV byte stream (header first, then PCM per segment).
+        
+        The header carries the maximum data size since the length is not known
+        up front; players read until the connection closes. It is sent with the
+        first chunk, whose sample rate is that of the model stream() pinned.
+        
+        Args:
+            voice_segments: Segments in document order
+            **stream_options: Passed to stream()
+        """
+        from .assembler import AudioFormat, wav_header
+        
+        chunks = self.stream(voice_segments, **stream_options)
+        try:
+            first = next(chunks, None)
+            sample_rate = first.sample_rate if first is not None else self.backend.sample_rate
+            yield wav_header(AudioFormat(sample_rate=sample_rate), _STREAMING_DATA_SIZE)
+            if first is None:
+                return
+            yield first.pcm
+            for chunk in chunks:
+                yield chunk.pcm
+        finally:
+            chunks.close()
+    
+    
+    def rerender_degraded(self, limit: Optional[int] = None) -> Dict[str, Path]:
+        """
+        Re-render segments the selector degraded, with the preferred model.
+        
+        Meant to run in the background once load is back to normal; rendered
+        entries are removed from the degradation log.
+        
+        Args:
+            limit: Maximum number of segments to re-render (default: all)
+            
+        Returns:
+            Dict[str, Path]: New audio file for each degraded audio path
+        """
+        if self.selector is None:
+            return {}
+        entries = self.selector.degradation_log.entries()[:limit]
+        rerendered = {}
+        for entry in entries:
+            rerendered[entry.audio_path] = self.synthesize(entry.text, entry.voice_type, entry.preferred_model)
+        self.selector.degradation_log.remove(entries)
+        self.logger.info(f"Re-rendered {len(entries)} degraded segments")
+        return rerendered
+    
+    
+    def _select_model(self, model_name: Optional[str], chars: int) -> Optional[str]:
+        """The requested model, or the selector's choice for the current load."""
+        if model_name is not None or self.selector is None:
+            return model_name
+        with self._in_flight_lock:
+            queue_depth = self._in_flight
+        return self.selector.choose(chars, queue_depth)
+    
+    
+    @contextmanager
+    def _tracked_call(self) -> Iterator[None]:
+        """Count a call as in flight (the queue depth seen by the selector)."""
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+    
+    
+    @property
+    def backend(self) -> TTSBackend:
+        return self.model_pool.get(self.model_name)
+    
+    
+    def _backend_for(self, model_name: Optional[str]) -> TTSBackend:
+        """
+        The active model, or another one, from the pool.
+        
+        No reference is kept between calls, so a model the pool evicts can be
+        freed, and is reloaded if it is needed again.
+        """
+        return self.model_pool.get(model_name or self.model_name)
     
     
+    def _speaker_for(self, voice_type: str, backend: TTSBackend) -> Optional[str]:
+        """Speaker id to pass to the model; single-speaker models ignore voice_type."""
+        if not backend.multi_speaker:
+            return None
+        return voice_type
     
-    
\ No newline at end of file
+    
+    def switch_mode(self, development_mode: bool) -> None:
+        """Switch between development and production models, reusing resident ones."""
+        self.development_mode = development_mode
+        if development_mode:
+            self.model_name = self.fast_model
+            self.voice_mapping = dict(DEVELOPMENT_VOICES)
+        else:
+            self.model_name = self.quality_model
+            self.voice_mapping = dict(PRODUCTION_VOICES)
+        self.model_pool.get(self.model_name)  # load it now rather than on the first request
+    
+    
+    def get_available_voices(self) -> Dict[str, str]:
+        """Return available voice mappings."""
+        return self.voice_mapping
+
+
+def _length_buckets(items: Sequence[Tuple[str, str]], batch_size: int):
+    """Slice length-sorted (key, text) items into consecutive batches."""
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
@@ -0,0 +1,151 @@
+"""
+TTS backends used by AdaptiveSynthesizer.
+
+A backend turns a batch of texts for one speaker into waveforms. CoquiBackend
+wraps a CoquiTTS model; StubBackend is a deterministic stand-in with simulated
+latency so batching, caching and scheduling can be tested and benchmarked
+without downloading models.
+"""
+
+import hashlib
+import math
+import sys
+import time
+import wave
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Optional, Sequence
+
+
+class TTSBackend(ABC):
+    """
+    Interface for a loaded TTS model.
+
+    Attributes:
+        model_name (str): Model identifier, part of every cache key
+        sample_rate (int): Output sample rate in Hz
+        multi_speaker (bool): Whether the model accepts a speaker id
+    """
+    model_name: str
+    sample_rate: int
+    multi_speaker: bool = False
+
+    @abstractmethod
+    def synthesize_batch(self, texts: List[str], speaker: Optional[str] = None) -> List[Sequence[float]]:
+        """Synthesize texts with one speaker, returning one waveform per text in order."""
+
+    def synthesize(self, text: str, speaker: Optional[str] = None) -> Sequence[float]:
+        """Synthesize a single text."""
+        return self.synthesize_batch([text], speaker)[0]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate resident memory of the loaded model."""
+        return 0
+
+
+class CoquiBackend(TTSBackend):
+    """CoquiTTS model, moved to the GPU when one is available."""
+
+    def __init__(self, model_name: str, device: Optional[str] = None):
+        import torch
+        from TTS.api import TTS
+
+        self.model_name = model_name
+        self.tts = TTS(model_name)
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.tts.to(device)
+        self.device = device
+        self.sample_rate = self.tts.synthesizer.output_sample_rate
+        self.multi_speaker = self.tts.is_multi_speaker
+
+    def synthesize_batch(self, texts: List[str], speaker: Optional[str] = None) -> List[Sequence[float]]:
+        # The TTS api has no batched entry point, so run the group back to back
+        # on the already-loaded model.
+        if self.multi_speaker and speaker:
+            return [self.tts.tts(text=text, speaker=speaker) for text in texts]
+        return [self.tts.tts(text=text) for text in texts]
+
+    @property
+    def memory_bytes(self) -> int:
+        model = self.tts.synthesizer.tts_model
+        total = sum(p.numel() * p.element_size() for p in model.parameters())
+        vocoder = getattr(self.tts.synthesizer, "vocoder_model", None)
+        if vocoder is not None:
+            total += sum(p.numel() * p.element_size() for p in vocoder.parameters())
+        return total
+
+
+class StubBackend(TTSBackend):
+    """
+    Deterministic local stand-in for a TTS model.
+
+    Each text becomes a tone whose pitch is derived from a digest of the
+    speaker and text, lasting samples_per_char samples per character. Latency
+    is simulated as a fixed per-call overhead plus a per-character cost on the
+    padded batch (batch size x longest text), like a real batched model;
+    cpu_bound=True burns CPU for that time instead of sleeping.
+    """
+
+    def __init__(self, model_name: str = "stub", sample_rate: int = 16000,
+                 samples_per_char: int = 200, call_overhead: float = 0.0,
+                 seconds_per_char: float = 0.0, load_time: float = 0.0,
+                 memory_bytes: int = 0, multi_speaker: bool = True, cpu_bound: bool = False):
+        self.model_name = model_name
+        self.sample_rate = sample_rate
+        self.samples_per_char = samples_per_char
+        self.call_overhead = call_overhead
+        self.seconds_per_char = seconds_per_char
+        self.multi_speaker = multi_speaker
+        self.cpu_bound = cpu_bound  # spin instead of sleep, like CPU inference
+        self._memory_bytes = memory_bytes
+        self.calls = []  # (speaker, [text lengths]) per batch, for tests and benchmarks
+        if load_time:
+            time.sleep(load_time)
+
+    def synthesize_batch(self, texts: List[str], speaker: Optional[str] = None) -> List[Sequence[float]]:
+        self.calls.append((speaker, [len(text) for text in texts]))
+        if texts:
+            delay = self.call_overhead + self.seconds_per_char * len(texts) * max(len(t) for t in texts)
+            if delay:
+                self._wait(delay)
+        return [self._tone(text, speaker) for text in texts]
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def _wait(self, seconds: float) -> None:
+        if not self.cpu_bound:
+            time.sleep(seconds)
+            return
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    def _tone(self, text: str, speaker: Optional[str]) -> List[float]:
+        digest = hashlib.sha256(f"{self.model_name}\0{speaker or ''}\0{text}".encode("utf-8")).digest()
+        period = 20 + digest[0] % 60  # samples per cycle
+        cycle = [0.5 * math.sin(2 * math.pi * i / period) for i in range(period)]
+        length = max(1, len(text) * self.samples_per_char)
+        return (cycle * (length // period + 1))[:length]
+
+
+def create_backend(model_name: str, device: Optional[str] = None) -> TTSBackend:
+    """Build a backend by model name; names starting with "stub" give a StubBackend."""
+    if model_name.startswith("stub"):
+        return StubBackend(model_name)
+    return CoquiBackend(model_name, device)
+
+
+def write_wav(path, samples: Sequence[float], sample_rate: int) -> None:
+    """Write float samples in [-1, 1] as a mono 16-bit PCM WAV file."""
+    pcm = array("h", (int(max(-1.0, min(1.0, float(s))) * 32767) for s in samples))
+    if sys.byteorder == "big":
+        pcm.byteswap()
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
@@ -1,5 +1,6 @@
 import logging
 from pathlib import Path
+from .metrics import STAGE_SECONDS, PERFORMANCE
 
 
 """Logging utilities"""
@@ -32,12 +33,16 @@ def get_logger(name: str):
     return logging.getLogger(name)
 
 def log_tts_operation(operation: str, duration: float, **context):
-    """Log TTS operation details."""
+    """Record TTS operation timing in the metrics registry and log it at debug level."""
+    voice_id = context.get("voice_id", context.get("voice_type", ""))
+    STAGE_SECONDS.observe(duration, stage=operation, model=context.get("model", ""), voice_id=voice_id)
     logger = get_logger(__name__)
-    context_str = ", ".join(f"{k}={v}" for k, v in context.items())
-    logger.info(f"TTS: {operation} completed in {duration:.2f}s [{context_str}]")
+    if logger.isEnabledFor(logging.DEBUG):
+        context_str = ", ".join(f"{k}={v}" for k, v in context.items())
+        logger.debug(f"TTS: {operation} completed in {duration:.2f}s [{context_str}]")
 
 def log_performance_metric(metric_name: str, value: float):
-    """Log performance metrics."""
+    """Record a named performance value as a gauge and log it."""
+    PERFORMANCE.set(value, metric=metric_name)
     logger = get_logger(__name__)
     logger.info(f"{metric_name}: {value}")
\ No newline at end of file
@@ -1,11 +1,17 @@
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterable, Iterator, Tuple, Union
 from enum import Enum
 import re
 from .parser import TextSegment
 import json
 import os
+import time
+from collections import Counter
 from pathlib import Path
+from .metrics import STAGE_SECONDS, SEGMENTS_TOTAL
+from .assignment_journal import AssignmentJournal
+from .segment_table import SegmentTable
+from .utils import get_logger
 
 class Gender(Enum):
     MALE = "male"
@@ -68,6 +74,84 @@ class VoiceProfile:
                 raise ValueError(f"Character name too long: {len(self.assigned_to)}")        
             
             
+def _attribute_key(value: Union[Enum, str, None]) -> Optional[str]:
+    # Config files give plain strings, code gives enums; index both the same way
+    if value is None:
+        return None
+    if isinstance(value, Enum):
+        return value.value
+    return str(value).lower()
+
+
+class VoicePool:
+    """
+    Voice profiles indexed by voice_id, role and characteristics.
+    
+    Every (gender, age, accent) combination, with any attribute left as a
+    wildcard, is indexed up front, so attribute queries are a single dict
+    lookup. Iteration and integer indexing keep the order of the config file.
+    """
+    
+    def __init__(self, voices: Iterable[VoiceProfile] = ()):
+        self._voices: List[VoiceProfile] = []
+        self._by_id: Dict[str, VoiceProfile] = {}
+        self._by_role: Dict[str, List[VoiceProfile]] = {}
+        self._by_characteristics: Dict[Tuple[Optional[str], ...], List[VoiceProfile]] = {}
+        for voice in voices:
+            self.add(voice)
+    
+    def add(self, voice: VoiceProfile) -> None:
+        if voice.voice_id in self._by_id:
+            raise ValueError(f"duplicate voice_id: {voice.voice_id}")
+        self._voices.append(voice)
+        self._by_id[voice.voice_id] = voice
+        self._by_role.setdefault(voice.role, []).append(voice)
+        c = voice.characteristics
+        attributes = (_attribute_key(c.gender), _attribute_key(c.age), _attribute_key(c.accent))
+        for mask in range(1 << len(attributes)):
+            key = tuple(value if mask & (1 << i) else None for i, value in enumerate(attributes))
+            self._by_characteristics.setdefault(key, []).append(voice)
+    
+    def get(self, voice_id: str) -> Optional[VoiceProfile]:
+        return self._by_id.get(voice_id)
+    
+    def by_role(self, role: str) -> List[VoiceProfile]:
+        return self._by_role.get(role, [])
+    
+    def find(self, gender: Union[Gender, str, None] = None, age: Union[Age, str, None] = None,
+             accent: Union[Accent, str, None] = None, role: Optional[str] = None) -> List[VoiceProfile]:
+        """Voices matching every given attribute (None matches anything), in config order."""
+        key = (_attribute_key(gender), _attribute_key(age), _attribute_key(accent))
+        matches = self._by_characteristics.get(key, [])
+        if role is not None:
+            matches = [voice for voice in matches if voice.role == role]
+        return matches
+    
+    @property
+    def narrator(self) -> VoiceProfile:
+        """First narrator voice, or the first voice if none has that role."""
+        narrators = self._by_role.get("narrator")
+        if narrators:
+            return narrators[0]
+        if not self._voices:
+            raise LookupError("voice pool is empty")
+        return self._voices[0]
+    
+    def __getitem__(self, key: Union[int, str]) -> VoiceProfile:
+        if isinstance(key, str):
+            return self._by_id[key]
+        return self._voices[key]
+    
+    def __contains__(self, voice_id: object) -> bool:
+        return voice_id in self._by_id
+    
+    def __iter__(self) -> Iterator[VoiceProfile]:
+        return iter(self._voices)
+    
+    def __len__(self) -> int:
+        return len(self._voices)
+
+
 @dataclass 
 class VoiceSegment:
     """A text segment with assigned voice information."""
@@ -119,7 +203,8 @@ class VoiceSegment:
         return self.text_segment.speaker
     
 class VoiceAssigner:
-    def __init__(self, config_file: str = None, development_mode: bool = True):
+    def __init__(self, config_file: str = None, development_mode: bool = True,
+                 assignments_file: str = None):
         # Get the project root directory (where this file is located)
         project_root = Path(__file__).parent.parent.parent  # Go up from server/src/ to project root
         
@@ -131,10 +216,18 @@ class VoiceAssigner:
             config_file = project_root / config_file
             
             
+        # Assignments live next to the voice config, not relative to the CWD
+        if assignments_file is None:
+            assignments_file = project_root / "server" / "voices" / "voice_assignments.json"
+        else:
+            assignments_file = project_root / assignments_file
+            
         self.development_mode = development_mode
+        self.logger = get_logger(__name__)
         self.voice_pool = self._load_voice_pool(config_file)
         self.character_assignments = {}  # character_name -> voice_id
-        self.persistence_file = "server/voices/voice_assignments.json"
+        self.persistence_file = Path(assignments_file)
+        self.journal = AssignmentJournal(self.persistence_file)
         self._load_assignments()
         
     def __post_init__(self):
@@ -146,7 +239,7 @@ class VoiceAssigner:
             
 
     
-    def _load_voice_pool(self, config_file: str) -> List[VoiceProfile]:
+    def _load_voice_pool(self, config_file: str) -> VoicePool:
         with open(config_file, "r") as f:
             config_data = json.load(f)
             
@@ -157,7 +250,7 @@ class VoiceAssigner:
             voices_data = config_data[mode_key]["voices"]
             
             # Convert to VoiceProfile objects
-            voice_profiles = []
+            voice_pool = VoicePool()
             for voice_data in voices_data:
                 # Handle the characteristics nested structure
                 characteristics_data = voice_data.pop("characteristics", {})
@@ -172,43 +265,99 @@ class VoiceAssigner:
                     assigned_to=voice_data["name"],
                     role=voice_data["role"]
                 )
-                voice_profiles.append(voice_profile)
+                voice_pool.add(voice_profile)
                 
-            return voice_profiles
+            return voice_pool
     
     def _load_assignments(self) -> None:
-        if os.path.exists(self.persistence_file):
-            with open(self.persistence_file, "r") as f:
-                self.character_assignments = json.load(f)
+        self.character_assignments = self.journal.load()
+        # What the journal held when this process last synced, to tell our own edits apart
+        self._journaled = dict(self.character_assignments)
+        self._voice_usage = Counter(self.character_assignments.values())
     
     def assign_voices(self, text_segments: List[TextSegment]) -> List[VoiceSegment]:
         # Main method: convert TextSegments to VoiceSegments
-        voice_segments = []
-        for segment in text_segments:
-            voice_profile = self._assign_character_voice(segment.speaker)
-            voice_segments.append(VoiceSegment(segment, voice_profile))
+        start_time = time.time()
+        voice_segments = [self.assign_voice(segment) for segment in text_segments]
+        STAGE_SECONDS.observe(time.time() - start_time, stage="assign")
+        # Tally per voice locally so the registry is touched once per voice, not per segment
+        for voice_id, count in Counter(vs.voice_profile.voice_id for vs in voice_segments).items():
+            SEGMENTS_TOTAL.inc(count, stage="assign", voice_id=voice_id)
         return voice_segments
     
+    def assign_table(self, table: SegmentTable) -> SegmentTable:
+        # Columnar form of assign_voices: fill the table's voice column in place.
+        # Voices are resolved once per distinct speaker, not once per segment.
+        start_time = time.time()
+        speaker_voices = {-1: table.voice_id(self._get_narrator_voice().voice_id)}
+        for speaker_id, name in table.speaker_names().items():
+            speaker_voices[speaker_id] = table.voice_id(self._assign_character_voice(name).voice_id)
+        voices = table.voices
+        for index, speaker_id in enumerate(table.speakers):
+            voices[index] = speaker_voices[speaker_id]
+        STAGE_SECONDS.observe(time.time() - start_time, stage="assign")
+        voice_names = table.voice_names()
+        for voice_code, count in Counter(voices).items():
+            SEGMENTS_TOTAL.inc(count, stage="assign", voice_id=voice_names[voice_code])
+        return table
+    
+    def assign_voice(self, segment: TextSegment) -> VoiceSegment:
+        # Single-segment form of assign_voices, for streaming pipelines
+        return VoiceSegment(segment, self._assign_character_voice(segment.speaker))
+    
     def _assign_character_voice(self, character_name: str) -> VoiceProfile:
         # Assign voice to a character (with consistency)
-        if character_name in self.character_assignments:
-            return self.voice_pool[self.character_assignments[character_name]]
-        else:
-            return self._get_narrator_voice()
+        voice_id = self.character_assignments.get(character_name)
+        if voice_id is None and character_name is not None:
+            voice_id = self._assign_new_character(character_name)
+        if voice_id is not None:
+            voice = self.voice_pool.get(voice_id)
+            if voice is not None:
+                return voice
+        return self._get_narrator_voice()
+    
+    def _assign_new_character(self, character_name: str) -> Optional[str]:
+        # Give a first-seen character the least used character voice and journal it
+        candidates = self.voice_pool.by_role("character")
+        if not candidates:
+            return None
+        choice = min(candidates, key=lambda voice: self._voice_usage[voice.voice_id]).voice_id
+        # Another process may have assigned this character already; its choice wins
+        voice_id = self.journal.record(character_name, choice)
+        self.character_assignments[character_name] = voice_id
+        self._journaled[character_name] = voice_id
+        self._voice_usage[voice_id] += 1
+        return voice_id
     
     def _get_narrator_voice(self) -> VoiceProfile:
         # Get voice for narrative segments
-        for voice in self.voice_pool:
-            if voice.role == "narrator":
-                return voice
-        return self.voice_pool[0]
+        return self.voice_pool.narrator
+    
+    def reassign_character(self, character_name: str, voice_id: str) -> None:
+        # Deliberately change a character's voice; journaled at once, replacing any other choice
+        self.journal.reassign(character_name, voice_id)
+        self.character_assignments[character_name] = voice_id
+        self._journaled[character_name] = voice_id
+        self._voice_usage = Counter(self.character_assignments.values())
     
     def save_assignments(self) -> None:
-        # Persist current assignments
-        with open(self.persistence_file, "w") as f:
-            json.dump(self.character_assignments, f)
+        # Persist current assignments: journal what this process set directly, then compact.
+        # Only entries changed here since the last sync are written, each as a compare-and-set
+        # against the value this process last saw, so another process's change is never undone.
+        for character_name, voice_id in self.character_assignments.items():
+            previous = self._journaled.get(character_name)
+            if voice_id == previous:
+                continue
+            if previous is None:
+                on_record = self.journal.record(character_name, voice_id)
+            else:
+                on_record = self.journal.reassign(character_name, voice_id, expected=previous)
+            if on_record != voice_id:
+                self.logger.warning(f"Voice for {character_name} was changed to {on_record} by another "
+                                    f"process; keeping it instead of {voice_id}")
+        self.journal.compact()
+        self._load_assignments()
     
     def load_assignments(self) -> None:
-        # Load previous assignments
-        with open(self.persistence_file, "r") as f:
-            self.character_assignments = json.load(f)
+        # Load previous assignments, including those journaled by other processes
+        self._load_assignments()
@@ -0,0 +1,167 @@
+"""
+Process-pool synthesis for CPU-only hosts.
+
+Each worker process loads the TTS model once at start-up and pins its torch
+intra-op thread count, so N workers share the cores instead of
+oversubscribing them. Segments are sharded across workers, written through
+the shared SynthesisCache, and reassembled in order. If a worker process
+dies, the shards it had not finished are retried on a fresh pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from .synthesis_cache import SynthesisCache, normalize_text
+from .tts_backends import TTSBackend, create_backend, write_wav
+from .utils import get_logger, log_tts_operation
+import time
+
+if TYPE_CHECKING:
+    from .voice_assigner import VoiceSegment
+
+
+# Segments handed to a worker per task
+DEFAULT_SHARD_SIZE = 16
+
+# Times a shard is retried after its worker process crashed
+DEFAULT_MAX_RETRIES = 2
+
+# (segment index, text, voice_type)
+_Item = Tuple[int, str, str]
+
+_worker_backend: Optional[TTSBackend] = None
+_worker_cache: Optional[SynthesisCache] = None
+
+
+def _init_worker(backend_factory: Callable[[str], TTSBackend], model_name: str,
+                 threads: int, cache_dir: str, cache_max_bytes: int) -> None:
+    """Process pool initializer: pin threads and load the model once."""
+    global _worker_backend, _worker_cache
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        pass
+    else:
+        torch.set_num_threads(threads)
+    _worker_backend = backend_factory(model_name)
+    _worker_cache = SynthesisCache(cache_dir, cache_max_bytes)
+
+
+def _synthesize_shard(items: List[_Item]) -> List[Tuple[int, str]]:
+    """Synthesize one shard in a worker process; returns (index, audio path) pairs."""
+    backend = _worker_backend
+    results = []
+    for index, text, voice_type in items:
+        speaker = voice_type if backend.multi_speaker else None
+        key = _worker_cache.make_key(backend.model_name, speaker, text)
+        path, _ = _worker_cache.get_or_create(
+            key, lambda p: write_wav(p, backend.synthesize(text, speaker), backend.sample_rate))
+        results.append((index, str(path)))
+    return results
+
+
+class SynthesisWorkerPool:
+    """
+    Pool of synthesis worker processes with one model load per worker.
+
+    Attributes:
+        model_name (str): Model each worker loads
+        workers (int): Number of worker processes
+        threads_per_worker (int): torch intra-op threads per worker
+        cache (SynthesisCache): Cache the workers write audio into
+        shard_size (int): Segments per task
+        max_retries (int): Retries for shards lost to a crashed worker
+    """
+
+    def __init__(self, model_name: str, cache: SynthesisCache, workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None, shard_size: int = DEFAULT_SHARD_SIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backend_factory: Callable[[str], TTSBackend] = create_backend):
+        cpus = os.cpu_count() or 1
+        self.model_name = model_name
+        self.cache = cache
+        self.workers = workers or cpus
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.workers)
+        self.shard_size = shard_size
+        self.max_retries = max_retries
+        self.backend_factory = backend_factory
+        self.logger = get_logger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "SynthesisWorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start the worker processes (each loads the model once)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.backend_factory, self.model_name, self.threads_per_worker,
+                          str(self.cache.cache_dir), self.cache.max_bytes),
+            )
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def synthesize(self, voice_segments: List["VoiceSegment"]) -> List[Path]:
+        """
+        Synthesize segments across the workers.
+
+        Args:
+            voice_segments: Output of VoiceAssigner.assign_voices
+
+        Returns:
+            List[Path]: Audio file for each segment, in the original order
+
+        Raises:
+            BrokenProcessPool: a shard still crashed its worker after max_retries
+        """
+        start_time = time.time()
+        items = []
+        for index, voice_segment in enumerate(voice_segments):
+            params = voice_segment.get_synthesizer_params()
+            items.append((index, normalize_text(params["text"]), params["voice_type"]))
+        shards = [items[i:i + self.shard_size] for i in range(0, len(items), self.shard_size)]
+
+        output_paths: Dict[int, Path] = {}
+        for attempt in range(self.max_retries + 1):
+            shards = self._run_shards(shards, output_paths)
+            if not shards:
+                break
+            if attempt < self.max_retries:
+                self.logger.warning(f"Worker crashed; retrying {len(shards)} shards "
+                                    f"(retry {attempt + 1} of {self.max_retries})")
+        else:
+            raise BrokenProcessPool(f"{len(shards)} shards kept crashing their worker")
+
+        duration = time.time() - start_time
+        log_tts_operation("pool_synthesis", duration, segments=len(items), workers=self.workers)
+        return [output_paths[index] for index in range(len(items))]
+
+    def _run_shards(self, shards: List[List[_Item]], output_paths: Dict[int, Path]) -> List[List[_Item]]:
+        """Run shards on the pool; returns the shards lost to a crashed worker."""
+        self.start()
+        futures = [(shard, self._executor.submit(_synthesize_shard, shard)) for shard in shards]
+        failed = []
+        for shard, future in futures:
+            try:
+                for index, path in future.result():
+                    output_paths[index] = Path(path)
+            except BrokenProcessPool:
+                failed.append(shard)
+        if failed:
+            # A dead worker breaks the whole executor; replace it before retrying
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        return failed
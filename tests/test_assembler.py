@@ -0,0 +1,104 @@
+"""Test streaming audiobook assembly."""
+
+import sys
+import os
+import struct
+import tempfile
+import wave
+from pathlib import Path
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src import assembler as assembler_module
+from src.assembler import AudiobookAssembler, AudioFormat, read_wav_info, wav_header
+from src.tts_backends import StubBackend, write_wav
+
+
+def read_frames(path):
+    with wave.open(str(path), "rb") as wav_file:
+        return wav_file.getnframes(), wav_file.getframerate(), wav_file.readframes(wav_file.getnframes())
+
+
+def test_same_format_segments_are_copied_with_silences():
+    backend = StubBackend(sample_rate=16000, samples_per_char=50)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, text in enumerate(["He said.", "The forest was quiet.", "Chapter One"]):
+            path = Path(tmp) / f"{i}.wav"
+            write_wav(path, backend.synthesize(text), backend.sample_rate)
+            paths.append(path)
+
+        assembler = AudiobookAssembler(AudioFormat(sample_rate=16000), silence=0.1, buffer_bytes=1000)
+        output = Path(tmp) / "book.wav"
+        stats = assembler.assemble(iter(paths), output)
+
+        frames, rate, data = read_frames(output)
+        segment_data = [read_frames(p)[2] for p in paths]
+        silence = bytes(1600 * 2)
+        assert rate == 16000
+        assert data == b"".join(d + silence for d in segment_data)
+        assert frames == stats.frames_written
+        assert stats.segments == 3
+
+
+def test_resampling_and_format_conversion():
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1 second of 8-bit stereo at 8 kHz
+        source = Path(tmp) / "stereo.wav"
+        with wave.open(str(source), "wb") as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(1)
+            wav_file.setframerate(8000)
+            wav_file.writeframes(bytes([128, 128]) * 8000)
+
+        output = Path(tmp) / "book.wav"
+        assembler = AudiobookAssembler(AudioFormat(sample_rate=22050, channels=1), silence=0.0, block_frames=1000)
+        stats = assembler.assemble([source], output)
+
+        frames, rate, data = read_frames(output)
+        assert rate == 22050
+        assert frames == stats.frames_written == 22050
+        assert set(struct.unpack(f"<{frames}h", data)) == {0}
+
+        with open(output, "rb") as f:
+            info = read_wav_info(f.read())
+        assert info.channels == 1 and info.sample_width == 2 and info.frames == 22050
+
+
+def test_output_over_4_gib_fails_early(tmp_path, monkeypatch):
+    backend = StubBackend(sample_rate=16000, samples_per_char=50)
+    path = tmp_path / "0.wav"
+    write_wav(path, backend.synthesize("He said."), backend.sample_rate)
+    output = tmp_path / "book.wav"
+
+    # Known segments: refused before anything is written
+    assembler = AudiobookAssembler(AudioFormat(sample_rate=16000), silence=40 * 3600.0)
+    assert assembler.estimate_bytes([path]) > 2 ** 32
+    with pytest.raises(ValueError, match="4 GiB"):
+        assembler.assemble([path], output)
+    assert not output.exists()
+    with pytest.raises(ValueError):
+        wav_header(AudioFormat(), 2 ** 32)
+
+    # A generator of segments: stopped as soon as the limit is reached, partial file removed
+    monkeypatch.setattr(assembler_module, "MAX_WAV_DATA_BYTES", 10000)
+    assembler = AudiobookAssembler(AudioFormat(sample_rate=16000), silence=0.1, buffer_bytes=1000)
+    segments_read = []
+
+    def segments():
+        for i in range(100):
+            segments_read.append(i)
+            yield path
+
+    with pytest.raises(ValueError, match="4 GiB"):
+        assembler.assemble(segments(), output)
+    assert not output.exists()
+    assert len(segments_read) < 10
+
+
+if __name__ == "__main__":
+    test_same_format_segments_are_copied_with_silences()
+    test_resampling_and_format_conversion()
+    print("Assembler tests passed")
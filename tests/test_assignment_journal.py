@@ -0,0 +1,134 @@
+"""Test the append-only voice assignment journal, including concurrent writers."""
+
+import sys
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.assignment_journal import AssignmentJournal
+from src.parser import TextSegment
+from src.voice_assigner import VoiceAssigner
+
+
+def record_all(snapshot_path, worker, characters):
+    journal = AssignmentJournal(snapshot_path, compact_every=25)
+    return {name: journal.record(name, f"voice-{worker}") for name in characters}
+
+
+def reassign_in_other_process(assignments_file, character, voice_id):
+    VoiceAssigner(development_mode=False, assignments_file=assignments_file).reassign_character(character, voice_id)
+
+
+def test_replay_and_compaction(tmp_path):
+    snapshot = tmp_path / "assignments.json"
+    snapshot.write_text("")  # the repo ships an empty snapshot
+    journal = AssignmentJournal(snapshot, compact_every=3)
+    assert journal.load() == {}
+
+    assert journal.record("Bob", "p226") == "p226"
+    assert journal.record("Bob", "p227") == "p226"   # first assignment wins
+    assert journal.record("Susan", "p227") == "p227"
+    assert len(journal.journal_path.read_text().splitlines()) == 2
+
+    journal.record("Marcus", "p226")                 # third entry triggers compaction
+    assert journal.journal_path.read_text() == ""
+    assert json.loads(snapshot.read_text()) == {"Bob": "p226", "Susan": "p227", "Marcus": "p226"}
+
+    # A writer that crashed mid-append leaves a partial line; it is ignored
+    journal.record("Elena", "p227")
+    with open(journal.journal_path, "ab") as f:
+        f.write(b'{"character": "Ghost", "voi')
+    assert AssignmentJournal(snapshot).load() == {"Bob": "p226", "Susan": "p227", "Marcus": "p226",
+                                                  "Elena": "p227"}
+
+
+def test_parallel_writers_agree(tmp_path):
+    snapshot = str(tmp_path / "assignments.json")
+    characters = [f"Character{i}" for i in range(60)]
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(record_all, snapshot, worker, characters) for worker in range(4)]
+        results = [future.result() for future in futures]
+
+    final = AssignmentJournal(snapshot).load()
+    assert sorted(final) == sorted(characters)
+    for result in results:
+        assert result == final
+
+
+def test_assigner_journals_new_characters(tmp_path):
+    assignments_file = str(tmp_path / "assignments.json")
+    assigner = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+    segments = [TextSegment("Hi.", "dialogue", name, 0.9) for name in ("Bob", "Susan", "Bob")]
+    voices = [vs.voice_profile.voice_id for vs in assigner.assign_voices(segments)]
+    assert voices == ["p227", "p227", "p227"]  # the only character-role voice in production mode
+
+    # A second job on the same series sees the same assignments
+    other = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+    assert other.character_assignments == {"Bob": "p227", "Susan": "p227"}
+
+    assigner.save_assignments()
+    assert json.loads((tmp_path / "assignments.json").read_text()) == {"Bob": "p227", "Susan": "p227"}
+
+
+def test_reassignment_overrides_first_assignment(tmp_path):
+    snapshot = tmp_path / "assignments.json"
+    journal = AssignmentJournal(snapshot)
+    journal.record("Bob", "p226")
+    journal.reassign("Bob", "p227")
+    assert journal.record("Bob", "p226") == "p227"   # automatic assignment still yields to the record
+    assert AssignmentJournal(snapshot).load() == {"Bob": "p227"}
+
+    journal.compact()
+    journal.reassign("Bob", "p228")
+    assert AssignmentJournal(snapshot).load() == {"Bob": "p228"}
+
+
+def test_assigner_persists_voice_change(tmp_path):
+    assignments_file = str(tmp_path / "assignments.json")
+    assigner = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+    first = assigner.assign_voice(TextSegment("Hi.", "dialogue", "Bob", 0.9)).voice_profile.voice_id
+    changed = next(voice.voice_id for voice in assigner.voice_pool if voice.voice_id != first)
+
+    assigner.character_assignments["Bob"] = changed
+    assigner.save_assignments()
+    assert assigner.character_assignments["Bob"] == changed
+    assert json.loads((tmp_path / "assignments.json").read_text())["Bob"] == changed
+
+    reloaded = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+    assert reloaded.character_assignments["Bob"] == changed
+
+
+def test_save_does_not_undo_another_process_change(tmp_path):
+    assignments_file = str(tmp_path / "assignments.json")
+    first = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+    first.reassign_character("Bob", "p226")
+    first.reassign_character("Susan", "p226")
+
+    stale = VoiceAssigner(development_mode=False, assignments_file=assignments_file)
+    assert stale.character_assignments == {"Bob": "p226", "Susan": "p226"}
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(reassign_in_other_process, assignments_file, "Bob", "p227").result()
+
+    # The stale process changed Susan only; Bob keeps the other process's voice
+    stale.character_assignments["Susan"] = "p227"
+    stale.save_assignments()
+    assert stale.character_assignments == {"Bob": "p227", "Susan": "p227"}
+    assert VoiceAssigner(development_mode=False, assignments_file=assignments_file).character_assignments == \
+        {"Bob": "p227", "Susan": "p227"}
+
+    # Both changed Bob: the compare-and-set keeps the change that reached the journal first
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(reassign_in_other_process, assignments_file, "Bob", "p225").result()
+    stale.character_assignments["Bob"] = "p226"
+    stale.save_assignments()
+    assert stale.character_assignments["Bob"] == "p225"
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_replay_and_compaction(Path(tmp))
+    print("Assignment journal tests passed")
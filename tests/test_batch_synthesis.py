@@ -0,0 +1,66 @@
+"""Test AdaptiveSynthesizer.synthesize_batch against the stub backend."""
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextSegment
+from src.voice_assigner import VoiceSegment, VoiceProfile, VoiceCharacteristics
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+
+
+def make_voice_segments():
+    voices = {
+        voice_id: VoiceProfile(voice_id=voice_id, name=voice_id, characteristics=VoiceCharacteristics())
+        for voice_id in ("p226", "p227")
+    }
+    texts = [
+        ("p226", "The forest was quiet."),
+        ("p227", '"Are you sure this shortcut leads back to town?" Maya asked.'),
+        ("p226", "He said."),
+        ("p227", '"Of course," Leo replied.'),
+        ("p226", "The path narrowed between the trees and the light began to fade."),
+        ("p226", "He said."),
+    ]
+    return [VoiceSegment(TextSegment(content=text, segment_type="narrative"), voices[voice_id])
+            for voice_id, text in texts]
+
+
+def make_synthesizer(cache_dir, **backend_options):
+    return AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(cache_dir),
+                               backend=StubBackend(**backend_options))
+
+
+def test_batch_matches_single_synthesis_in_order():
+    segments = make_voice_segments()
+    with tempfile.TemporaryDirectory() as batch_dir, tempfile.TemporaryDirectory() as single_dir:
+        batch_synth = make_synthesizer(batch_dir)
+        single_synth = make_synthesizer(single_dir)
+
+        batch_paths = batch_synth.synthesize_batch(segments, batch_size=2)
+        single_paths = [single_synth.synthesize(**s.get_synthesizer_params()) for s in segments]
+
+        assert [p.name for p in batch_paths] == [p.name for p in single_paths]
+        for batch_path, single_path in zip(batch_paths, single_paths):
+            assert batch_path.read_bytes() == single_path.read_bytes()
+
+        # Grouped by speaker, sorted by length, and "He said." synthesized once
+        calls = batch_synth.backend.calls
+        assert all(len(lengths) <= 2 for _, lengths in calls)
+        assert sum(len(lengths) for _, lengths in calls) == 5
+        for _, lengths in calls:
+            assert lengths == sorted(lengths)
+
+        # A second run is served entirely from the cache
+        batch_synth.backend.calls.clear()
+        assert batch_synth.synthesize_batch(segments) == batch_paths
+        assert batch_synth.backend.calls == []
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_synthesis_in_order()
+    print("synthesize_batch tests passed")
@@ -0,0 +1,106 @@
+"""Test checkpoint/resume of long synthesis jobs."""
+
+import sys
+import os
+import json
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.checkpoint import SynthesisCheckpoint, segment_key
+
+TEXT = " ".join(f"Sentence number {i} is here." for i in range(30))
+
+
+class CrashingBackend(StubBackend):
+    """Stub that dies after a number of batch calls, like a killed process."""
+
+    def __init__(self, crash_after, **options):
+        super().__init__(**options)
+        self.crash_after = crash_after
+
+    def synthesize_batch(self, texts, speaker=None):
+        if len(self.calls) >= self.crash_after:
+            raise KeyboardInterrupt
+        return super().synthesize_batch(texts, speaker)
+
+
+def make_voice_segments(tmp_path):
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    return assigner.assign_voices(TextParser(sentence_splitter="rules").parse_text(TEXT))
+
+
+def make_synthesizer(tmp_path, backend):
+    return AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "cache"), backend=backend)
+
+
+def test_finished_job_resumes_without_synthesis(tmp_path):
+    voice_segments = make_voice_segments(tmp_path)
+    manifest = tmp_path / "job.checkpoint"
+    paths = make_synthesizer(tmp_path, StubBackend()).synthesize_resumable(voice_segments, manifest)
+    assert len(paths) == 30 and all(path.exists() for path in paths)
+
+    resumed = make_synthesizer(tmp_path, StubBackend())
+    assert resumed.synthesize_resumable(voice_segments, manifest) == paths
+    assert resumed.backend.calls == []
+
+    # Audio deleted behind the checkpoint's back is synthesized again
+    resumed.cache.clear()
+    again = resumed.synthesize_resumable(voice_segments, manifest)
+    assert sum(len(lengths) for _, lengths in resumed.backend.calls) == 30
+    assert all(path.exists() for path in again)
+
+
+def test_resume_after_crash_synthesizes_only_the_rest(tmp_path):
+    voice_segments = make_voice_segments(tmp_path)
+    manifest = tmp_path / "job.checkpoint"
+    try:
+        make_synthesizer(tmp_path, CrashingBackend(crash_after=3)).synthesize_resumable(
+            voice_segments, manifest, batch_size=4, chunk_segments=4)
+    except KeyboardInterrupt:
+        pass
+
+    synth = make_synthesizer(tmp_path, StubBackend())
+    paths = synth.synthesize_resumable(voice_segments, manifest, batch_size=4, chunk_segments=4)
+    assert sum(len(lengths) for _, lengths in synth.backend.calls) == 30 - 12
+    assert [p.name for p in paths] == [
+        p.name for p in (synth.synthesize(**vs.get_synthesizer_params()) for vs in voice_segments)]
+
+
+def test_partial_line_damaged_file_and_changed_segment(tmp_path):
+    manifest = tmp_path / "job.checkpoint"
+    audio = []
+    for i in range(3):
+        path = tmp_path / f"{i}.wav"
+        path.write_bytes(bytes([i]) * 100)
+        audio.append(path)
+    keys = [segment_key(f"text {i}", "narrator", "stub") for i in range(3)]
+    with SynthesisCheckpoint(manifest) as checkpoint:
+        for i in range(3):
+            checkpoint.record(i, keys[i], audio[i])
+    with open(manifest, "ab") as f:
+        f.write(b'{"index": 3, "key": "abc')  # crash mid-append
+
+    audio[1].write_bytes(b"\x00" * 100)  # same size, different content: caught by the digest
+    changed = list(keys)
+    changed[2] = segment_key("edited text", "narrator", "stub")
+    checkpoint = SynthesisCheckpoint(manifest)
+    assert sorted(checkpoint.resume(changed)) == [0]
+    # The partial line was cut off, so the next record starts on its own line
+    checkpoint.record(1, keys[1], audio[1])
+    checkpoint.close()
+    lines = manifest.read_bytes().splitlines()
+    assert json.loads(lines[0]) == {"version": 1}
+    assert [json.loads(line)["index"] for line in lines[1:]] == [0, 1, 2, 1]
+    assert sorted(SynthesisCheckpoint(manifest).resume(keys)) == [0, 1, 2]
+
+
+def test_other_version_starts_over(tmp_path):
+    manifest = tmp_path / "job.checkpoint"
+    manifest.write_text('{"version": 0}\n{"index": 0}\n')
+    assert SynthesisCheckpoint(manifest).resume(["k"]) == {}
+    assert manifest.read_bytes() == b""
@@ -0,0 +1,60 @@
+"""Check that DialogueMatcher agrees with the original re.search loops."""
+
+import sys
+import os
+import re
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import DialogueMatcher, DIALOGUE_PATTERNS, SPEAKER_PATTERNS
+
+
+def legacy_classify(sentence):
+    """The original _classify_sentence/_extract_speaker logic."""
+    for pattern in DIALOGUE_PATTERNS:
+        if re.search(pattern, sentence):
+            for speaker_pattern in SPEAKER_PATTERNS:
+                match = re.search(speaker_pattern, sentence)
+                if match:
+                    return True, match.group(1)
+            return True, None
+    return False, None
+
+
+def random_sentences(count, seed=7):
+    rng = random.Random(seed)
+    pieces = ['"', '“', '”', "'", '‘', '’', ',', ' ', 'Maya', 'Leo',
+              'said', 'asked', 'replied', 'whispered', 'muttered', 'the', 'door', '.']
+    for _ in range(count):
+        yield ''.join(rng.choice(pieces) + rng.choice(['', ' ']) for _ in range(rng.randint(1, 14)))
+
+
+def test_matcher_agrees_with_patterns():
+    matcher = DialogueMatcher()
+    sentences = [
+        'He walked home.',
+        '"Hello," Bob said.',
+        'Bob said, "Hello."',
+        '“Of course it does,” Leo replied.',
+        '"Are you sure?” Maya, a young woman, asked as she walked.',
+        '“Okay, maybe I’m lost—but at least we’re lost together."',
+        "Bob said 'Hello, this is a test.'",
+        "It's Maya's book.",
+    ]
+    sentences.extend(random_sentences(5000))
+
+    for sentence in sentences:
+        is_dialogue, speaker = legacy_classify(sentence)
+        match = matcher.match(sentence)
+        assert (match is not None) == is_dialogue, sentence
+        if match:
+            assert match.speaker == speaker, sentence
+            start, end = match.span
+            assert sentence[start] in '"“\'‘'
+            assert end <= len(sentence)
+
+
+if __name__ == "__main__":
+    test_matcher_agrees_with_patterns()
+    print("DialogueMatcher agrees with DIALOGUE_PATTERNS/SPEAKER_PATTERNS")
@@ -0,0 +1,60 @@
+"""Test the character-name gazetteer and look-back speaker resolution."""
+
+import sys
+import os
+import io
+import re
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.gazetteer import AhoCorasick, CharacterGazetteer
+from src.parser import TextParser
+
+
+def test_automaton_matches_every_occurrence():
+    rng = random.Random(7)
+    for _ in range(200):
+        words = list({"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(6)})
+        automaton = AhoCorasick(words[:3])
+        for word in words[3:]:
+            automaton.add(word)  # added after the first search would have built it
+        text = "".join(rng.choice("abcd") for _ in range(50))
+        expected = sorted((m.start(), m.start() + len(w), w) for w in words
+                          for m in re.finditer(f"(?={w})", text))
+        assert sorted(automaton.iter_matches(text)) == expected
+
+
+def test_gazetteer_learns_names():
+    gazetteer = CharacterGazetteer(min_mentions=2)
+    gazetteer.add("Bob")
+    gazetteer.add("she")          # pronoun attributions are not names
+    for _ in range(2):
+        gazetteer.observe("The dog followed Aunt Maya to the river, and The house was quiet.")
+    assert gazetteer.names == {"Bob", "Aunt Maya"}
+    assert gazetteer.find("Bobby waved at Bob and Aunt Maya.") == ["Bob", "Aunt Maya"]
+
+
+TEXT = (
+    '"Where are we going?" Susan asked. '
+    '"To the river," Bob replied. '
+    '"Is it far?" '
+    '"Not very." '
+    'Susan looked at the trees. '
+    '"Then let us hurry." '
+    'Bob laughed. '
+    '"Fine." '
+    'Susan smiled, "Good."'
+)
+
+
+def test_parser_resolves_unattributed_dialogue():
+    plain = TextParser(sentence_splitter="rules").parse_text(TEXT)
+    assert [s.speaker for s in plain] == ["Susan", "Bob", None, None, None, None, None, None, None]
+
+    parser = TextParser(sentence_splitter="rules", resolve_speakers=True)
+    segments = parser.parse_text(TEXT)
+    # Turn-taking, names in the preceding narration, then narration in the same sentence
+    assert [s.speaker for s in segments] == ["Susan", "Bob", "Susan", "Bob", None, "Susan", None, "Bob", "Susan"]
+    assert list(parser.iter_segments(io.StringIO(TEXT), chunk_size=5)) == segments
+    assert [view.speaker for view in parser.parse_table(TEXT)] == [s.speaker for s in segments]
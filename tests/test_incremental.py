@@ -0,0 +1,136 @@
+"""Test incremental rebuilds after small manuscript edits."""
+
+import sys
+import os
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.incremental import IncrementalBuilder
+
+
+def make_book():
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    chapters = [f"Chapter {i}\n\n{sample_text}" for i in range(1, 6)]
+    return "\n\n".join(chapters)
+
+
+def make_builder(tmp_path, manifest="book.json", parser=None):
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "cache"),
+                                backend=StubBackend())
+    return IncrementalBuilder(parser or TextParser(), assigner, synth, tmp_path / manifest)
+
+
+def test_small_edit_only_redoes_the_edited_sentence(tmp_path):
+    builder = make_builder(tmp_path)
+    text = make_book()
+    first = builder.build(text)
+    assert first.paragraphs_reused == 0
+    assert first.segments_synthesized + first.segments_reused == len(first.audio_paths)
+
+    # Fix a "typo" in the last chapter only
+    head, _, tail = text.rpartition("forest")
+    edited = head + "woods" + tail
+    backend = builder.synthesizer.backend
+    calls_before = len(backend.calls)
+    second = builder.build(edited)
+
+    assert second.paragraphs_parsed == 1
+    assert second.segments_synthesized == 1
+    assert len(backend.calls) == calls_before + 1
+    # Same output as building the new revision from scratch
+    fresh = make_builder(tmp_path, manifest="fresh.json").build(edited)
+    assert second.audio_paths == fresh.audio_paths
+    assert [vs.get_synthesizer_params() for vs in second.voice_segments] == \
+        [vs.get_synthesizer_params() for vs in fresh.voice_segments]
+
+
+def test_inserted_paragraph_and_voice_change(tmp_path):
+    builder = make_builder(tmp_path)
+    text = make_book()
+    first = builder.build(text)
+
+    inserted = text.replace("Chapter 3", '"Wait for me," Bob said.\n\nChapter 3')
+    second = builder.build(inserted)
+    assert second.paragraphs_parsed == 1
+    assert second.segments_synthesized == 1
+    assert len(second.audio_paths) == len(first.audio_paths) + 1
+
+    # Re-voicing a character re-renders only that character's lines
+    builder.assigner.character_assignments["Bob"] = "p226"
+    third = builder.build(inserted)
+    bob_lines = sum(1 for vs in third.voice_segments if vs.get_speaker() == "Bob")
+    assert third.paragraphs_parsed == 0
+    assert third.segments_synthesized == bob_lines > 0
+
+
+def test_speaker_resolution_matches_a_fresh_build(tmp_path):
+    def parser():
+        return TextParser(sentence_splitter="rules", resolve_speakers=True)
+
+    text = ("\u201cWhere are we going?\u201d Susan asked.\n\n"
+            "\u201cTo the river,\u201d Bob replied.\n\n"
+            "\u201cIs it far?\u201d\n\n"
+            "\u201cNot very.\u201d")
+    builder = make_builder(tmp_path, parser=parser())
+    first = builder.build(text)
+    speakers = [vs.get_speaker() for vs in first.voice_segments]
+    assert speakers == ["Susan", "Bob", "Susan", "Bob"]
+    assert speakers == [s.speaker for s in parser().parse_text(text)]
+
+    # Only the first paragraph changes, but that changes who speaks an unchanged line after it
+    edited = text.replace("Susan asked", "Marcus asked")
+    second = builder.build(edited)
+    assert second.paragraphs_parsed == 1
+    fresh = make_builder(tmp_path, manifest="fresh.json", parser=parser()).build(edited)
+    assert [vs.get_speaker() for vs in second.voice_segments] == \
+        [vs.get_speaker() for vs in fresh.voice_segments] == ["Marcus", "Bob", "Marcus", "Bob"]
+    assert second.audio_paths == fresh.audio_paths
+
+
+def test_manifest_appends_only_what_changed(tmp_path):
+    builder = make_builder(tmp_path)
+    text = make_book()
+    builder.build(text)
+    manifest = tmp_path / "book.json"
+    size = manifest.stat().st_size
+
+    head, _, tail = text.rpartition("forest")
+    builder.build(head + "woods" + tail)
+    # One paragraph record and the new paragraph order, not the whole book again
+    assert manifest.stat().st_size - size < size // 4
+
+    # A new builder reads the log back: nothing to redo
+    again = make_builder(tmp_path).build(head + "woods" + tail)
+    assert again.paragraphs_parsed == again.segments_synthesized == 0
+
+
+def test_records_the_model_the_selector_used(tmp_path):
+    from src.model_pool import ModelPool
+    from src.model_selector import ModelSelector
+
+    selector = ModelSelector(["quality", "fast"], slo_seconds=0.01, probe_every=0)
+    selector.observe("quality", 1.0, 10)   # quality looks too slow: everything degrades
+    pool = ModelPool(loader=lambda name: StubBackend(model_name=name))
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "cache"),
+                                backend=pool.get("quality"), model_pool=pool, selector=selector)
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    builder = IncrementalBuilder(TextParser(), assigner, synth, tmp_path / "book.json")
+    text = "It rained.\n\nBob slept."
+    builder.build(text)
+    assert {s.model for record in builder.load_manifest() for s in record.segments} == {"fast"}
+
+    # Load is back to normal: the degraded segments are rendered again with the preferred model
+    selector.slo_seconds = 10.0
+    selector.observe("quality", 0.0, 10)
+    selector.observe("quality", 0.0, 10)
+    second = builder.build(text)
+    assert second.segments_synthesized == 2
+    assert {s.model for record in builder.load_manifest() for s in record.segments} == {"quality"}
@@ -0,0 +1,138 @@
+"""Test .txt and .epub ingestion: spine order, markup stripping, encodings and laziness."""
+
+import sys
+import os
+import zipfile
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.ingest import EpubBook, EpubChapter, detect_encoding, iter_book_text, iter_text_file
+from src.parser import TextParser
+
+CONTAINER = """<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>"""
+
+PACKAGE = """<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>The Test Book</dc:title></metadata>
+  <manifest>
+    <item id="ch2" href="text/ch2.xhtml" media-type="application/xhtml+xml"/>
+    <item id="notes" href="text/notes.xhtml" media-type="application/xhtml+xml"/>
+    <item id="cover" href="images/cover.jpg" media-type="image/jpeg"/>
+    <item id="ch1" href="text/ch1.xhtml" media-type="application/xhtml+xml"/>
+  </manifest>
+  <spine>{spine}</spine>
+</package>"""
+
+CHAPTER = """<?xml version="1.0" encoding="UTF-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><title>Ignored title</title><style>p {{ margin: 0 }}</style></head>
+<body><h1>Chapter {n}</h1>
+<p>The café was quiet&#8212;too quiet. Tom &amp; Jerry waited.</p>
+<p>&#8220;Where is everyone?&#8221; asked Tom.<br/>Nobody answered.</p>
+</body></html>"""
+
+
+def make_epub(path, spine=("ch1", "ch2"), notes_linear=False, include_notes=True):
+    itemrefs = "".join(f'<itemref idref="{idref}"/>' for idref in spine)
+    itemrefs += f'<itemref idref="notes" linear="{"yes" if notes_linear else "no"}"/>'
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as epub:
+        epub.writestr("mimetype", "application/epub+zip", zipfile.ZIP_STORED)
+        epub.writestr("META-INF/container.xml", CONTAINER)
+        epub.writestr("OEBPS/content.opf", PACKAGE.format(spine=itemrefs))
+        epub.writestr("OEBPS/text/ch1.xhtml", CHAPTER.format(n=1))
+        epub.writestr("OEBPS/text/ch2.xhtml", CHAPTER.format(n=2))
+        if include_notes:
+            epub.writestr("OEBPS/text/notes.xhtml", "<html><body><p>Footnote.</p></body></html>")
+        epub.writestr("OEBPS/images/cover.jpg", b"\xff\xd8\xff")
+    return path
+
+
+def test_epub_chapters_in_spine_order_without_markup(tmp_path):
+    with EpubBook(make_epub(tmp_path / "book.epub")) as book:
+        assert book.title == "The Test Book"
+        assert book.spine == ["OEBPS/text/ch1.xhtml", "OEBPS/text/ch2.xhtml"]
+        first = next(book.chapters()).text()
+    words = " ".join(first.split())
+    assert words == ("Chapter 1 The café was quiet—too quiet. Tom & Jerry waited. "
+                     "“Where is everyone?” asked Tom. Nobody answered.")
+    assert "\n\n" in first  # block elements become paragraph breaks
+
+    text = "".join(iter_book_text(tmp_path / "book.epub"))
+    assert text.index("Chapter 1") < text.index("Chapter 2")
+    assert "Footnote" not in text and "Ignored title" not in text
+
+
+def test_small_pieces_give_the_same_text(tmp_path):
+    path = make_epub(tmp_path / "book.epub")
+    assert "".join(iter_book_text(path, chunk_bytes=7)) == "".join(iter_book_text(path))
+
+
+def test_iter_file_matches_parse_text(tmp_path):
+    path = make_epub(tmp_path / "book.epub")
+    parser = TextParser(sentence_splitter="rules")
+    segments = list(parser.iter_file(path, chunk_bytes=16))
+    assert segments == parser.parse_text("".join(iter_book_text(path)))
+    assert any(s.segment_type == "dialogue" for s in segments)
+
+
+def test_chapters_are_read_lazily(tmp_path):
+    # The last spine document is missing from the archive; earlier chapters are parsed before it is opened
+    path = make_epub(tmp_path / "book.epub", spine=("ch1", "ch2", "unknown"), notes_linear=True,
+                     include_notes=False)
+    with EpubBook(path) as book:
+        assert book.spine[-1] == "OEBPS/text/notes.xhtml"  # the unknown idref is skipped
+    segments = TextParser(sentence_splitter="rules").iter_file(path)
+    assert next(segments).content.startswith("Chapter 1")
+    with pytest.raises(KeyError):
+        list(segments)
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "utf-16", "cp1252"])
+def test_text_file_encodings(tmp_path, encoding):
+    text = "“Café,” she said. Naïve façades cost 5€ each.\n\n" * 200
+    path = tmp_path / "book.txt"
+    path.write_bytes(text.encode(encoding))
+    assert "".join(iter_text_file(path, chunk_bytes=1000)) == text
+    assert "".join(iter_book_text(path, chunk_bytes=333)) == text
+
+
+@pytest.mark.parametrize("chunk_bytes", [1000, 1 << 16])
+def test_non_utf8_after_ascii_sample(tmp_path, chunk_bytes):
+    text = "Plain old ASCII. " * 2500 + "Le café était naïve, à 5€.\n" * 20
+    path = tmp_path / "book.txt"
+    path.write_bytes(text.encode("cp1252"))
+    assert "".join(iter_text_file(path, chunk_bytes=chunk_bytes)) == text
+
+
+def test_unknown_declared_encoding_is_detected(tmp_path):
+    path = tmp_path / "book.epub"
+    make_epub(path)
+    chapter = CHAPTER.format(n=1).replace('encoding="UTF-8"', 'encoding="x-made-up"')
+    with zipfile.ZipFile(path, "a") as epub:
+        epub.writestr("OEBPS/text/ch3.xhtml", chapter)
+    with EpubBook(path) as book:
+        assert "The café was quiet" in EpubChapter(2, "OEBPS/text/ch3.xhtml", book).text()
+
+
+def test_detect_encoding_tolerates_cut_characters():
+    sample = "naïve ".encode("utf-8") * 10
+    assert detect_encoding(sample[:-5]) == "utf-8"
+    assert detect_encoding(b"") == "utf-8"
+
+
+def test_unsupported_and_malformed_files(tmp_path):
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert list(iter_book_text(empty)) == []
+    with pytest.raises(ValueError):
+        list(iter_book_text(tmp_path / "book.pdf"))
+    not_epub = tmp_path / "other.epub"
+    with zipfile.ZipFile(not_epub, "w") as archive:
+        archive.writestr("hello.txt", "hi")
+    with pytest.raises(ValueError):
+        EpubBook(not_epub)
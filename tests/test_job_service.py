@@ -0,0 +1,227 @@
+"""Test the async job service: job lifecycle, priority, tenant fairness and failures."""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.job_service import FairScheduler, JobService
+
+
+def book(label, sentences=20):
+    return " ".join(f"This is sentence {i} of {label}." for i in range(sentences))
+
+
+def make_service(tmp_path, **options):
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "cache"),
+                                backend=StubBackend(call_overhead=0.005))
+    return JobService(TextParser(sentence_splitter="rules"), assigner, synth, **options)
+
+
+def test_scheduler_priority_and_tenant_round_robin():
+    scheduler = FairScheduler(starvation_limit=100)
+    for i in range(3):
+        scheduler.push("bulk", "big", f"big-{i}")
+    scheduler.push("bulk", "small", "small-0")
+    scheduler.push("interactive", "small", "preview")
+    order = [scheduler.pop()[2] for _ in range(5)]
+    assert order == ["preview", "big-0", "small-0", "big-1", "big-2"]
+    assert scheduler.pop() is None
+    with pytest.raises(ValueError):
+        scheduler.push("urgent", "t", "x")
+
+
+def test_scheduler_does_not_starve_bulk():
+    scheduler = FairScheduler(starvation_limit=2)
+    for i in range(6):
+        scheduler.push("interactive", "t", f"i{i}")
+    scheduler.push("bulk", "t", "b0")
+    order = [scheduler.pop()[2] for _ in range(7)]
+    assert order.index("b0") == 2
+
+
+def test_jobs_complete_in_order(tmp_path):
+    async def run():
+        async with make_service(tmp_path, workers=2, unit_segments=4) as service:
+            jobs = [await service.submit(book(f"book {n}"), tenant=f"t{n % 2}") for n in range(3)]
+            return [await service.wait(job.job_id, timeout=30) for job in jobs]
+
+    for job in asyncio.run(run()):
+        assert job.state == "done"
+        assert job.segments == 20 and job.units == 5 and job.units_done == 5
+        assert all(path is not None and path.exists() for path in job.audio_paths)
+        assert len(set(job.audio_paths)) == 20
+
+
+def test_interactive_preview_overtakes_bulk_backlog(tmp_path):
+    async def run():
+        async with make_service(tmp_path, workers=1, unit_segments=2) as service:
+            bulk = [await service.submit(book(f"bulk {n}", 40), tenant="publisher") for n in range(3)]
+            await asyncio.sleep(0.05)  # bulk units are queued
+            preview = await service.submit(book("preview", 4), tenant="reader", priority="interactive")
+            await service.wait(preview.job_id, timeout=30)
+            return preview, [service.get(job.job_id).units_done for job in bulk], bulk[-1].units
+
+    preview, bulk_done, bulk_units = asyncio.run(run())
+    assert preview.state == "done"
+    assert sum(bulk_done) < 3 * bulk_units
+
+
+def test_failure_and_cancel(tmp_path):
+    def fail(voice_segments):
+        raise RuntimeError("model crashed")
+
+    async def run():
+        async with make_service(tmp_path, synthesize=fail) as service:
+            failed = await service.wait((await service.submit(book("x"))).job_id, timeout=30)
+        async with make_service(tmp_path, workers=1, unit_segments=1) as service:
+            job = await service.submit(book("long", 200))
+            await asyncio.sleep(0.05)
+            assert await service.cancel(job.job_id)
+            cancelled = await service.wait(job.job_id, timeout=30)
+            assert len(service.scheduler) == 0
+        return failed, cancelled
+
+    failed, cancelled = asyncio.run(run())
+    assert failed.state == "failed" and "model crashed" in failed.error
+    assert cancelled.state == "cancelled" and cancelled.units_done < cancelled.units
+    with pytest.raises(ValueError):
+        asyncio.run(make_service(tmp_path).submit("text", priority="urgent"))
+
+
+def test_threadsafe_access(tmp_path):
+    service = make_service(tmp_path)
+    service.start_in_thread()
+    try:
+        job = service.submit_threadsafe(book("threaded"), tenant="web")
+        deadline = time.time() + 30
+        while not job.finished and time.time() < deadline:
+            time.sleep(0.01)
+        assert job.to_dict()["state"] == "done"
+        assert len(job.to_dict()["audio_paths"]) == 20
+    finally:
+        service.stop_thread()
+    assert not any(thread.name == "job-service" for thread in threading.enumerate())
+
+
+def test_jobs_endpoint(tmp_path):
+    pytest.importorskip("flask")
+    from app import create_app
+
+    service = make_service(tmp_path)
+    service.start_in_thread()
+    try:
+        client = create_app(service.parser, service.assigner, service.synthesizer, jobs=service).test_client()
+        response = client.post("/jobs", json={"text": book("api"), "priority": "interactive"})
+        assert response.status_code == 202
+        job_id = response.get_json()["job_id"]
+        assert client.get(f"/jobs/{job_id}").status_code == 200
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.post("/jobs", json={"text": "x", "priority": "urgent"}).status_code == 400
+    finally:
+        service.stop_thread()
+
+
+def test_cancel_of_a_job_evicted_meanwhile(tmp_path):
+    pytest.importorskip("flask")
+    from app import create_app
+
+    service = make_service(tmp_path)
+    service.start_in_thread()
+    try:
+        client = create_app(service.parser, service.assigner, service.synthesizer, jobs=service).test_client()
+        job_id = client.post("/jobs", json={"text": book("evicted", 2)}).get_json()["job_id"]
+        deadline = time.time() + 30
+        while not service.get(job_id).finished and time.time() < deadline:
+            time.sleep(0.01)
+
+        async def evict():
+            service.finished_ttl = 0.0
+            service._evict()
+
+        get = service.get
+
+        def get_then_evict(job_id):
+            # The job is evicted between the endpoint's lookup and its cancel
+            job = get(job_id)
+            asyncio.run_coroutine_threadsafe(evict(), service._loop).result()
+            return job
+
+        service.get = get_then_evict
+        response = client.delete(f"/jobs/{job_id}")
+        assert response.status_code == 200 and response.get_json()["state"] == "done"
+        assert get(job_id) is None
+        service.get = get
+        assert client.delete(f"/jobs/{job_id}").status_code == 404
+    finally:
+        service.stop_thread()
+
+
+def test_preview_parse_does_not_wait_for_bulk_parse(tmp_path):
+    service = make_service(tmp_path, workers=1)
+    parse_text = service.parser.parse_text
+    bulk_parsing = threading.Event()
+    release_bulk = threading.Event()
+
+    def slow_bulk_parse(text):
+        if text.startswith("This is sentence 0 of bulk"):
+            bulk_parsing.set()
+            release_bulk.wait(30)
+        return parse_text(text)
+
+    service.parser.parse_text = slow_bulk_parse
+
+    async def run():
+        async with service:
+            bulk = await service.submit(book("bulk"))
+            await asyncio.get_running_loop().run_in_executor(None, bulk_parsing.wait, 30)
+            preview = await service.submit(book("preview", 4), priority="interactive")
+            await service.wait(preview.job_id, timeout=30)
+            bulk_state = bulk.state
+            release_bulk.set()
+            await service.wait(bulk.job_id, timeout=30)
+            return preview, bulk, bulk_state
+
+    preview, bulk, bulk_state = asyncio.run(run())
+    assert preview.state == "done" and bulk_state == "queued"
+    assert bulk.state == "done"
+    assert preview.text is None and bulk.text is None
+
+
+def test_finished_jobs_are_evicted(tmp_path):
+    async def run():
+        async with make_service(tmp_path, max_finished=2) as service:
+            jobs = [await service.wait((await service.submit(book(f"book {n}", 2))).job_id, timeout=30)
+                    for n in range(4)]
+            assert [service.get(job.job_id) for job in jobs] == [None, None, jobs[2], jobs[3]]
+            assert set(service._finished) == {jobs[2].job_id, jobs[3].job_id}
+            service.finished_ttl = 0.0
+            await service.submit(book("last", 2))
+            assert service.get(jobs[3].job_id) is None
+
+    asyncio.run(run())
+
+
+def test_stop_cancels_queued_jobs(tmp_path):
+    async def run():
+        service = make_service(tmp_path, workers=1, unit_segments=1)
+        await service.start()
+        job = await service.submit(book("long", 200))
+        await asyncio.sleep(0.05)
+        await service.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.state == "cancelled" and job.finished_at is not None
+    assert job.units_done < job.units
@@ -0,0 +1,56 @@
+"""Importing the server modules must not load heavy or network-bound dependencies."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server')
+
+HEAVY_MODULES = ("torch", "TTS", "nltk")
+
+
+def loaded_heavy_modules(module):
+    code = f"import sys; import {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SERVER_DIR,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_parse_and_assign_paths_stay_light():
+    for module in ("src.parser", "src.voice_assigner", "src.synthesizer"):
+        assert loaded_heavy_modules(module) == "", module
+
+
+def test_missing_punkt_fails_fast_without_download(tmp_path):
+    pytest.importorskip("nltk")
+    empty = tmp_path / "nltk_data"
+    empty.mkdir()
+    code = (
+        "import nltk\n"
+        "from src.parser import TextParser\n"
+        "downloads = []\n"
+        "nltk.download = lambda *args, **kwargs: downloads.append(args) or True\n"
+        "nltk.data.path[:] = []  # only the empty directory below is searched\n"
+        f"parser = TextParser(nltk_data_dir={str(empty)!r})\n"
+        "try:\n"
+        "    parser.parse_text('Hello there.')\n"
+        "except LookupError as e:\n"
+        "    print('lookup error' if 'nltk.downloader' in str(e) else e)\n"
+        "else:\n"
+        "    print('parsed')\n"
+        "print('downloads', len(downloads))\n"
+    )
+    env = dict(os.environ, NLTK_DATA=str(empty), HOME=str(tmp_path))
+    env.pop("READTOME_NLTK_DATA", None)
+    result = subprocess.run([sys.executable, "-c", code], cwd=SERVER_DIR, env=env,
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split("\n")[:2] == ["lookup error", "downloads 0"]
+    assert list(empty.iterdir()) == []
+
+
+if __name__ == "__main__":
+    test_parse_and_assign_paths_stay_light()
+    print("Lazy import tests passed")
@@ -0,0 +1,74 @@
+"""Test the metrics registry and that the pipeline stages feed it."""
+
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.metrics import MetricsRegistry, REGISTRY
+from src.parser import TextParser
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+
+
+def test_histogram_export_and_quantiles():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("voice_id",), buckets=(0.1, 0.2, 0.4))
+    for value in [0.05] * 50 + [0.15] * 45 + [0.3] * 5:
+        latency.observe(value, voice_id="p225")
+    registry.counter("requests_total", "Requests").inc(3)
+
+    text = registry.to_prometheus()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{voice_id="p225",le="0.2"} 95' in text
+    assert 'latency_seconds_bucket{voice_id="p225",le="+Inf"} 100' in text
+    assert 'latency_seconds_count{voice_id="p225"} 100' in text
+    assert 'requests_total 3.0' in text
+
+    series = registry.snapshot()["latency_seconds"]["series"][0]
+    assert series["count"] == 100
+    assert 0.1 <= series["p95"] <= 0.2
+    assert 0.2 <= series["p99"] <= 0.4
+    json.loads(registry.to_json())
+
+
+def test_stages_record_into_default_registry():
+    REGISTRY.reset()
+    TextParser().parse_text('"Hello," Bob said. The forest was quiet.')
+    with tempfile.TemporaryDirectory() as tmp:
+        synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp),
+                                    backend=StubBackend("stub-vits"))
+        synth.synthesize("He said.", voice_type="p226")
+        synth.synthesize("He said.", voice_type="p226")
+
+    snapshot = REGISTRY.snapshot()
+    segments = {tuple(s["labels"].values()): s["value"] for s in snapshot["readtome_segments_total"]["series"]}
+    assert segments[("parse", "", "")] == 2
+    assert segments[("synthesize", "stub-vits", "p226")] == 2
+
+    durations = snapshot["readtome_stage_duration_seconds"]["series"]
+    synth_series = [s for s in durations if s["labels"]["stage"] == "voice_synthesis"]
+    assert synth_series[0]["labels"] == {"stage": "voice_synthesis", "model": "stub-vits", "voice_id": "p226"}
+    assert synth_series[0]["count"] == 2
+
+    cache = {s["labels"]["result"]: s["value"] for s in snapshot["readtome_synthesis_cache_total"]["series"]}
+    assert cache == {"miss": 1, "hit": 1}
+
+
+def test_parser_shares_the_registry_of_its_package():
+    # Imported as server.src.parser (as in test_parser.py), the parser must not
+    # pull in a second copy of the metrics module through the src package
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    import server.src.metrics
+    import server.src.parser
+    assert server.src.parser.STAGE_SECONDS is server.src.metrics.STAGE_SECONDS
+
+
+if __name__ == "__main__":
+    test_histogram_export_and_quantiles()
+    test_stages_record_into_default_registry()
+    test_parser_shares_the_registry_of_its_package()
+    print("Metrics tests passed")
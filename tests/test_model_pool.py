@@ -0,0 +1,111 @@
+"""Test the ModelPool and mode switching without reloading models."""
+
+import sys
+import os
+import gc
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.model_pool import ModelPool
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+
+MB = 1024 * 1024
+
+
+def stub_loader(loaded):
+    def load(model_name):
+        loaded.append(model_name)
+        return StubBackend(model_name, memory_bytes=100 * MB, multi_speaker=model_name == "stub-vits")
+    return load
+
+
+def test_switch_mode_reuses_resident_models():
+    loaded = []
+    pool = ModelPool(memory_budget=1024 * MB, loader=stub_loader(loaded))
+    with tempfile.TemporaryDirectory() as tmp:
+        synth = AdaptiveSynthesizer(development_mode=True, cache=SynthesisCache(tmp), model_pool=pool,
+                                    fast_model="stub-fast", quality_model="stub-vits")
+        fast_backend = synth.backend
+        synth.switch_mode(development_mode=False)
+        assert synth.voice_mapping["narrator"] == "p225"
+        synth.switch_mode(development_mode=True)
+        synth.switch_mode(development_mode=False)
+
+        assert loaded == ["stub-fast", "stub-vits"]
+        assert pool.get("stub-fast") is fast_backend
+
+        # Mixed modes: a single request can target the other model
+        synth.synthesize("He said.", voice_type="p226", model_name="stub-fast")
+        assert loaded == ["stub-fast", "stub-vits"]
+
+    stats = pool.stats()
+    assert stats["stub-vits"].loads == 1
+    assert stats["stub-vits"].memory_bytes == 100 * MB
+
+
+def test_lru_eviction_under_memory_budget():
+    loaded = []
+    pool = ModelPool(memory_budget=250 * MB, loader=stub_loader(loaded))
+    pool.get("a")
+    pool.get("b")
+    pool.get("a")  # b is now least recently used
+    pool.get("c")
+
+    assert pool.is_resident("a") and pool.is_resident("c")
+    assert not pool.is_resident("b")
+    assert pool.resident_bytes == 200 * MB
+    pool.get("b")
+    assert loaded == ["a", "b", "c", "b"]
+
+
+def test_loads_run_outside_the_lock_and_are_shared():
+    loaded = []
+    release = threading.Event()
+    load = stub_loader(loaded)
+
+    def slow_loader(model_name):
+        if model_name == "slow":
+            release.wait(10)
+        return load(model_name)
+
+    pool = ModelPool(memory_budget=1024 * MB, loader=slow_loader)
+    resident = pool.get("resident")
+    with ThreadPoolExecutor(4) as executor:
+        slow = [executor.submit(pool.get, "slow") for _ in range(3)]
+        # A resident model is served while "slow" is still loading
+        assert executor.submit(pool.get, "resident").result(timeout=5) is resident
+        assert not any(future.done() for future in slow)
+        release.set()
+        backends = [future.result(timeout=5) for future in slow]
+    assert loaded == ["resident", "slow"]
+    assert all(backend is backends[0] for backend in backends)
+
+
+def test_synthesizer_does_not_keep_evicted_models():
+    loaded = []
+    pool = ModelPool(memory_budget=150 * MB, loader=stub_loader(loaded))
+    with tempfile.TemporaryDirectory() as tmp:
+        synth = AdaptiveSynthesizer(development_mode=True, cache=SynthesisCache(tmp), model_pool=pool,
+                                    fast_model="stub-fast", quality_model="stub-vits")
+        fast = weakref.ref(synth.backend)
+        synth.synthesize("He said.", model_name="stub-vits")   # evicts stub-fast
+        gc.collect()
+        assert not pool.is_resident("stub-fast") and fast() is None
+
+        # The active model is reloaded on its next use
+        synth.synthesize("She said.")
+        assert loaded == ["stub-fast", "stub-vits", "stub-fast"]
+
+
+if __name__ == "__main__":
+    test_switch_mode_reuses_resident_models()
+    test_lru_eviction_under_memory_budget()
+    test_loads_run_outside_the_lock_and_are_shared()
+    test_synthesizer_does_not_keep_evicted_models()
+    print("ModelPool tests passed")
@@ -0,0 +1,160 @@
+"""Test load-adaptive model selection with stub models of different speeds."""
+
+import sys
+import os
+import threading
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.model_pool import ModelPool
+from src.tts_backends import StubBackend
+from src.model_selector import ModelSelector, DegradationLog
+
+SPEEDS = {"quality": 0.05, "fast": 0.002}  # seconds per call
+
+
+def make_synthesizer(tmp_path, selector):
+    pool = ModelPool(loader=lambda name: StubBackend(model_name=name, call_overhead=SPEEDS[name]))
+    return AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "cache"),
+                               backend=pool.get("quality"), model_pool=pool, selector=selector)
+
+
+def test_choose_from_queue_depth_and_latency():
+    selector = ModelSelector(["quality", "fast"], slo_seconds=2.0, probe_every=0)
+    assert selector.choose(100) == "quality"  # nothing observed yet
+    selector.observe("quality", 1.0, 100)
+    selector.observe("fast", 0.1, 100)
+    assert selector.choose(100) == "quality"
+    assert selector.choose(300) == "fast"      # a long segment would miss the SLO
+    assert selector.choose(100, queue_depth=3) == "fast"
+    assert selector.predict("quality", 100, queue_depth=3) == 4.0
+
+    selector.observe("quality", 3.0, 100)      # moving average, not the last value
+    assert 1.0 < selector.latency("quality").seconds < 3.0
+    assert selector.latency("quality").observations == 2
+
+
+def test_probe_preferred_model_after_degraded_streak():
+    selector = ModelSelector(["quality", "fast"], slo_seconds=0.5, probe_every=3)
+    selector.observe("quality", 1.0, 100)
+    selector.observe("fast", 0.1, 100)
+    assert [selector.choose(100) for _ in range(6)] == ["fast", "fast", "quality"] * 2
+
+
+def test_backlog_counts_towards_queue_depth():
+    queued = [0]
+    selector = ModelSelector(["quality", "fast"], slo_seconds=2.0, backlog=lambda: queued[0])
+    selector.observe("quality", 1.0, 100)
+    selector.observe("fast", 0.1, 100)
+    assert selector.choose(100) == "quality"
+    queued[0] = 5
+    assert selector.choose(100) == "fast"
+
+
+def test_synthesizer_degrades_and_rerenders(tmp_path):
+    log_path = tmp_path / "degraded.jsonl"
+    selector = ModelSelector(["quality", "fast"], slo_seconds=0.02, degradation_log=log_path)
+    synth = make_synthesizer(tmp_path, selector)
+
+    first = synth.synthesize("The first sentence.", "narrator")
+    assert selector.latency("quality").observations == 1
+    degraded = synth.synthesize("The second sentence.", "narrator")
+    assert synth.model_pool.is_resident("fast")
+    assert len(selector.degradation_log) == 1
+    # Explicit model requests bypass the selector and are never logged as degraded
+    synth.synthesize("Forced fast.", "narrator", model_name="fast")
+    assert len(selector.degradation_log) == 1
+
+    reloaded = DegradationLog(log_path).entries()
+    assert [(e.text, e.model, e.preferred_model, e.audio_path) for e in reloaded] == [
+        ("The second sentence.", "fast", "quality", str(degraded))]
+
+    rerendered = synth.rerender_degraded()
+    assert list(rerendered) == [str(degraded)]
+    assert rerendered[str(degraded)] != degraded and rerendered[str(degraded)] != first
+    assert len(selector.degradation_log) == 0 and DegradationLog(log_path).entries() == []
+
+
+def test_concurrent_load_spike_degrades_some_calls(tmp_path):
+    selector = ModelSelector(["quality", "fast"], slo_seconds=0.08, probe_every=0)
+    selector.observe("quality", SPEEDS["quality"], 20)
+    selector.observe("fast", SPEEDS["fast"], 20)
+    synth = make_synthesizer(tmp_path, selector)
+
+    def speak(n):
+        for i in range(5):
+            synth.synthesize(f"Listener {n} sentence {i}.", "narrator")
+
+    threads = [threading.Thread(target=speak, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    models = {entry.model for entry in selector.degradation_log.entries()}
+    assert models == {"fast"}
+    assert 0 < len(selector.degradation_log) < 40
+
+
+def test_resumable_checkpoint_keys_degraded_segments_by_fallback_model(tmp_path):
+    from src.checkpoint import SynthesisCheckpoint, segment_key
+    from src.parser import TextSegment
+    from src.voice_assigner import VoiceAssigner
+
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    segments = assigner.assign_voices([TextSegment(f"Line {i}.", "narrative", None, 1.0) for i in range(4)])
+    selector = ModelSelector(["quality", "fast"], slo_seconds=0.01, probe_every=0)
+    selector.observe("quality", 1.0, 10)   # quality looks too slow: everything degrades
+    synth = make_synthesizer(tmp_path, selector)
+    manifest = tmp_path / "book.manifest"
+
+    synth.synthesize_resumable(segments, manifest, chunk_segments=2)
+    voice_type = segments[0].get_synthesizer_params()["voice_type"]
+    assert [entry.key for entry in SynthesisCheckpoint(manifest).load()] == [
+        segment_key(f"Line {i}.", voice_type, "fast") for i in range(4)]
+
+    # Load is back to normal: a resumed run renders the degraded segments with the preferred model
+    selector.observe("quality", 0.0, 10)
+    selector.observe("quality", 0.0, 10)
+    selector.slo_seconds = 10.0
+    paths = synth.synthesize_resumable(segments, manifest, chunk_segments=2)
+    with SynthesisCheckpoint(manifest) as checkpoint:
+        resumed = checkpoint.resume([segment_key(f"Line {i}.", voice_type, "quality") for i in range(4)])
+    assert sorted(resumed) == [0, 1, 2, 3]
+    assert [Path(resumed[i].path) for i in range(4)] == paths
+
+
+def test_stream_pins_one_model(tmp_path):
+    import struct
+    from src.parser import TextSegment
+    from src.voice_assigner import VoiceAssigner
+
+    rates = {"quality": 22050, "fast": 16000}
+    pool = ModelPool(loader=lambda name: StubBackend(model_name=name, sample_rate=rates[name],
+                                                     call_overhead=SPEEDS[name]))
+    selector = ModelSelector(["quality", "fast"], slo_seconds=0.2, probe_every=0)
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "cache"),
+                                backend=pool.get("quality"), model_pool=pool, selector=selector)
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    segments = assigner.assign_voices([TextSegment(f"Line {i}.", "narrative", None, 1.0) for i in range(12)])
+
+    def with_spike():
+        for index, segment in enumerate(segments):
+            if index == 3:
+                selector.observe("quality", 5.0, 10)   # load spike mid-stream
+                assert selector.choose(10) == "fast"
+            yield segment
+
+    chunks = list(synth.stream(with_spike(), priority_segments=2, batch_size=4))
+    assert len(chunks) == 12 and {chunk.sample_rate for chunk in chunks} == {22050}
+    assert not pool.is_resident("fast") or not pool.get("fast").calls
+
+    # A stream that starts under load is rendered (and logged as degraded) with the fallback throughout
+    wav = synth.stream_wav(segments[:5], priority_segments=2)
+    header = next(wav)
+    assert struct.unpack_from("<I", header, 24)[0] == 16000
+    assert sum(len(pcm) for pcm in wav) > 0
+    assert {entry.model for entry in selector.degradation_log.entries()} == {"fast"}
+    assert len(selector.degradation_log) == 5
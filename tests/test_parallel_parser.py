@@ -0,0 +1,47 @@
+"""Check that TextParser.parse_text_parallel matches the sequential parser."""
+
+import sys
+import os
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+
+
+def load_book():
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    chapters = []
+    for number in range(1, 13):
+        # Headings have no terminal punctuation, so they join the next sentence
+        chapters.append(f"Chapter {number}\n\n{sample_text}\n\nMr.\n\nSmith left.")
+    return "\n\n".join(chapters)
+
+
+def test_parallel_matches_sequential():
+    parser = TextParser()
+    text = load_book()
+    expected = parser.parse_text(text)
+
+    for workers in (2, 3):
+        segments = parser.parse_text_parallel(text, workers=workers, min_chars=0)
+        assert segments == expected
+
+
+def test_parallel_matches_sequential_with_rules_splitter():
+    parser = TextParser(sentence_splitter="rules")
+    # Quotes left open across paragraph breaks must not be cut into separate shards
+    speech = '"It was late. We walked.\n\nThen it rained. All night.\n\nWe slept. Nobody woke," he said.'
+    text = load_book() + ("\n\n" + speech) * 40
+    expected = parser.parse_text(text)
+
+    for workers in (2, 3):
+        segments = parser.parse_text_parallel(text, workers=workers, min_chars=0)
+        assert segments == expected
+
+
+if __name__ == "__main__":
+    test_parallel_matches_sequential()
+    test_parallel_matches_sequential_with_rules_splitter()
+    print("parse_text_parallel matches parse_text")
@@ -0,0 +1,68 @@
+"""Test the overlapped AudiobookPipeline against the stub backend."""
+
+import sys
+import os
+import io
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.pipeline import AudiobookPipeline
+
+
+def load_book():
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    return "\n\n".join([sample_text] * 6)
+
+
+def test_pipeline_matches_sequential_run(tmp_path):
+    text = load_book()
+    parser = TextParser()
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+
+    sequential = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "sequential"),
+                                     backend=StubBackend(call_overhead=0.001))
+    expected = [sequential.synthesize(**vs.get_synthesizer_params())
+                for vs in assigner.assign_voices(parser.parse_text(text))]
+
+    # A cache of its own, so the pipeline really synthesizes instead of reading the sequential run's audio
+    backend = StubBackend(call_overhead=0.001)
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "pipeline"),
+                                backend=backend)
+    pipeline = AudiobookPipeline(parser, assigner, synth, queue_size=2)
+    result = pipeline.run(io.StringIO(text))
+
+    assert backend.calls
+    assert [Path(path).relative_to(tmp_path / "pipeline") for path in result.outputs] == \
+        [Path(path).relative_to(tmp_path / "sequential") for path in expected]
+    assert all(Path(output).read_bytes() == Path(path).read_bytes()
+               for output, path in zip(result.outputs, expected))
+    assert all(stage.items == len(expected) for stage in result.stats.values())
+    assert result.first_output_seconds is not None
+    assert result.bottleneck in AudiobookPipeline.STAGES
+
+
+def test_pipeline_propagates_stage_errors(tmp_path):
+    def failing_writer(index, voice_segment, audio_path):
+        if index == 3:
+            raise IOError("disk full")
+        return audio_path
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(cache_dir),
+                                    backend=StubBackend())
+        assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+        pipeline = AudiobookPipeline(TextParser(), assigner, synth, writer=failing_writer, queue_size=1)
+        try:
+            pipeline.run([load_book()])
+        except IOError as error:
+            assert "disk full" in str(error)
+        else:
+            raise AssertionError("writer error was swallowed")
@@ -0,0 +1,111 @@
+"""Test the seek-table sidecar written during assembly."""
+
+import sys
+import os
+import random
+import wave
+from pathlib import Path
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.assembler import AudiobookAssembler, AudioFormat, read_wav_info
+from src.parser import TextParser
+from src.seek_table import SeekTable, marks_from_table, marks_from_segments, seek_table_path
+from src.tts_backends import StubBackend, write_wav
+
+BOOK = """Chapter 1
+
+The road was long. "Are we there yet?" asked Tom. Nobody answered him.
+
+Chapter 2
+
+Morning came slowly. The birds were loud. "Get up," said Mary.
+
+Part III
+
+It ended in the rain."""
+
+
+def assemble_book(tmp_path):
+    table = TextParser(sentence_splitter="rules").parse_table(BOOK)
+    backend = StubBackend(sample_rate=16000, samples_per_char=40)
+    paths = []
+    for index, view in enumerate(table):
+        path = tmp_path / f"{index}.wav"
+        write_wav(path, backend.synthesize(view.content), backend.sample_rate)
+        paths.append(path)
+    output = tmp_path / "book.wav"
+    stats = AudiobookAssembler(AudioFormat(sample_rate=16000), silence=0.25).assemble(
+        paths, output, marks_from_table(table))
+    return table, paths, output, stats
+
+
+def test_chapters_and_offsets_match_the_audio(tmp_path):
+    table, paths, output, stats = assemble_book(tmp_path)
+    assert stats.seek_table_path == seek_table_path(output) == tmp_path / "book.wav.seek"
+    audio = output.read_bytes()
+
+    with SeekTable(stats.seek_table_path) as seek:
+        assert len(seek) == len(table)
+        assert [chapter.title for chapter in seek.chapters] == ["Chapter 1", "Chapter 2", "Part III"]
+        assert seek.chapters[1].segment == next(i for i, v in enumerate(table) if v.content.startswith("Chapter 2"))
+        for index, path in enumerate(paths):
+            segment = path.read_bytes()
+            info = read_wav_info(segment)
+            pcm = segment[info.data_offset:info.data_offset + info.data_size]
+            offset = seek.byte_offset(index)
+            assert audio[offset:offset + len(pcm)] == pcm
+            assert seek.segment_end_seconds(index) - seek.segment_start_seconds(index) == pytest.approx(info.frames / 16000)
+            assert seek.text_span(index) == (table.starts[index], table.ends[index])
+        chapter = seek.chapters[2]
+        assert seek.chapter_at_time(chapter.start_seconds + 0.01) is chapter
+        assert chapter.byte_offset == seek.byte_offset(chapter.segment)
+
+
+def test_time_and_text_lookups_agree_with_linear_scan(tmp_path):
+    table, _, output, stats = assemble_book(tmp_path)
+    with SeekTable(stats.seek_table_path) as seek:
+        starts = [seek.segment_start_seconds(i) for i in range(len(seek))]
+        total = stats.frames_written / 16000
+        rng = random.Random(3)
+        for _ in range(200):
+            seconds = rng.uniform(0, total)
+            expected = max(i for i, start in enumerate(starts) if start <= seconds)
+            assert seek.segment_at_time(seconds) == expected
+            assert seek.byte_offset_at_time(seconds) % 2 == 0
+
+        for index in range(len(seek)):
+            text_start, text_end = seek.text_span(index)
+            assert seek.segment_at_text(text_start) == index
+            assert seek.time_at_text(text_start) == seek.segment_start_seconds(index)
+            assert seek.segment_start_seconds(index) < seek.time_at_text((text_start + text_end) // 2) \
+                < seek.segment_end_seconds(index)
+
+
+def test_headings_must_be_whole_lines():
+    text = ("Part I wanted to go. Book 3 lay on the table.\n\n"
+            "Part 2 of the money was gone.\n\n"
+            "Chapter Fourteen\n\nThe rain stopped.\n\n"
+            "Chapter Twenty-One: The Storm\nIt rained again.")
+    table = TextParser(sentence_splitter="rules").parse_table(text)
+    chapters = [mark.chapter for mark in marks_from_table(table) if mark.chapter]
+    assert chapters == ["Chapter Fourteen", "Chapter Twenty-One: The Storm"]
+
+    marks = marks_from_segments(["Part I wanted to go.", "Book 3 lay on the table.", "Chapter Fourteen",
+                                 "Chapter 2 The road was long.", "Prologue"])
+    assert [mark.chapter for mark in marks] == [None, None, "Chapter Fourteen", None, "Prologue"]
+
+
+def test_marks_must_cover_every_segment(tmp_path):
+    backend = StubBackend(sample_rate=16000)
+    paths = []
+    for index, text in enumerate(["One.", "Two."]):
+        paths.append(tmp_path / f"{index}.wav")
+        write_wav(paths[-1], backend.synthesize(text), backend.sample_rate)
+    with pytest.raises(ValueError):
+        AudiobookAssembler(AudioFormat(sample_rate=16000)).assemble(
+            paths, tmp_path / "book.wav", marks_from_segments(["One."]))
+    with pytest.raises(ValueError):
+        SeekTable(paths[0])
@@ -0,0 +1,61 @@
+"""Check that the columnar SegmentTable matches parse_text and assign_voices."""
+
+import sys
+import os
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.segment_table import SegmentTable
+from src.voice_assigner import VoiceAssigner
+
+
+def load_book():
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    return (sample_text + '\n\n"Hello," Bob said. Susan asked, "Are you there?"\n') * 3
+
+
+def test_table_matches_parse_text():
+    parser = TextParser()
+    text = load_book()
+    expected = parser.parse_text(text)
+    table = parser.parse_table(text)
+
+    assert len(table) == len(expected)
+    assert list(table) == expected
+    assert table[-1] == expected[-1]
+    assert table.to_segments() == expected
+    # Every segment is a slice of one shared buffer
+    assert all(table.text[table.starts[i]:table.ends[i]] == s.content for i, s in enumerate(expected))
+
+
+def test_assign_table_matches_assign_voices(tmp_path):
+    parser = TextParser()
+    text = load_book()
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    expected = [vs.get_synthesizer_params() for vs in assigner.assign_voices(parser.parse_text(text))]
+
+    table = assigner.assign_table(parser.parse_table(text))
+    assert [view.get_synthesizer_params() for view in table] == expected
+    assert list(table.iter_synthesizer_params()) == expected
+
+
+def test_interning():
+    table = SegmentTable('"Hi," Bob said. "Yes," Bob said. It rained.')
+    table.append(0, 15, "dialogue", "Bob", 0.8)
+    table.append(16, 32, "dialogue", "Bob", 0.8)
+    table.append(33, 44, "narrative", None, 0.9)
+    assert table.speaker_names() == {0: "Bob"}
+    assert list(table.speakers) == [0, 0, -1]
+    assert table[2].content == "It rained."
+    assert table[2].speaker is None and table[2].voice_type is None
+    table.set_voice(2, "p226")
+    assert table[2].voice_type == "p226"
+
+
+if __name__ == "__main__":
+    test_table_matches_parse_text()
+    test_interning()
+    print("SegmentTable tests passed")
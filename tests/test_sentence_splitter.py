@@ -0,0 +1,66 @@
+"""Test the rule-based, quote-aware sentence splitter."""
+
+import sys
+import os
+import io
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.sentence_splitter import RuleBasedSplitter
+
+
+def test_quotes_abbreviations_and_ellipses():
+    split = RuleBasedSplitter()
+    text = ('"Okay, maybe I\'m lost—but... we\'ll find it." Maya laughed. Mr. Smith met J. R. Hale. '
+            '"Run!" Bob shouted. “Are you there?" Susan asked. Nobody answered... The end!')
+    assert split(text) == [
+        '"Okay, maybe I\'m lost—but... we\'ll find it."',
+        'Maya laughed.',
+        'Mr. Smith met J. R. Hale.',
+        '"Run!" Bob shouted.',
+        '“Are you there?" Susan asked.',
+        'Nobody answered...',
+        'The end!',
+    ]
+
+
+def test_unclosed_quote_stops_suppressing_breaks():
+    text = 'He said "wait. ' + "It rained all day. " * 10 + "Done."
+    assert len(RuleBasedSplitter()(text)) == 1
+    assert len(RuleBasedSplitter(max_quote_chars=40)(text)) > 5
+
+
+def test_quotation_continued_over_paragraphs():
+    text = ('"I went to the market," Bob said. "It was crowded.\n\n'
+            '"Then I came home. Nobody was there." Susan nodded. The end.')
+    expected = [
+        '"I went to the market," Bob said.',
+        '"It was crowded.',
+        '"Then I came home. Nobody was there."',
+        'Susan nodded.',
+        'The end.',
+    ]
+    assert RuleBasedSplitter()(text) == expected
+    # The parser collapses the paragraph break before splitting
+    parser = TextParser(sentence_splitter="rules")
+    assert [s.content for s in parser.parse_text(text)] == expected
+
+
+def test_parser_uses_selected_splitter():
+    parser = TextParser(sentence_splitter="rules")
+    text = 'Bob said, "Stop. Look. Listen." The forest was quiet. "Fine," Susan replied.'
+    segments = parser.parse_text(text)
+    assert [s.segment_type for s in segments] == ["dialogue", "narrative", "dialogue"]
+    assert segments[0].speaker == "Bob"
+    # Streaming gives the same result with a stateful splitter
+    assert list(parser.iter_segments(io.StringIO(text * 20), chunk_size=7)) == parser.parse_text(text * 20)
+
+
+def test_rejects_unknown_splitter():
+    try:
+        TextParser(sentence_splitter="punkt2")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown splitter accepted")
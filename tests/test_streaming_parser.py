@@ -0,0 +1,73 @@
+"""Check that TextParser.iter_segments matches parse_text for chunked input."""
+
+import sys
+import os
+import io
+import random
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+
+
+def load_book():
+    project_root = Path(__file__).parent.parent
+    sample_text = (project_root / 'server' / 'data' / 'sample_text.txt').read_text(encoding='utf-8')
+    extra = (
+        '\n\nChapter 2\n\n  Mr. Smith walked   in. "Hello," Bob said.\n'
+        'Susan asked, "Are you there?" Nobody answered... The end!\n'
+    )
+    return (sample_text + extra) * 5
+
+
+def random_chunks(text, seed):
+    rng = random.Random(seed)
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, 40)
+        yield text[pos:pos + size]
+        pos += size
+
+
+def test_iter_segments_matches_parse_text():
+    parser = TextParser()
+    text = load_book()
+    expected = parser.parse_text(text)
+
+    for chunk_size in (1, 13, 256, 1 << 16):
+        assert list(parser.iter_segments(io.StringIO(text), chunk_size=chunk_size)) == expected
+
+    for seed in range(5):
+        assert list(parser.iter_segments(random_chunks(text, seed))) == expected
+
+
+def test_iter_segments_empty_input():
+    parser = TextParser()
+    assert list(parser.iter_segments(["", "   \n\n  "])) == parser.parse_text("   \n\n  ")
+
+
+def test_unpunctuated_input_is_bounded_and_linear():
+    parser = TextParser(sentence_splitter="rules")
+    split_chars = []
+    split_sentences = parser._split_sentences
+
+    def counting_split(text):
+        split_chars.append(len(text))
+        return split_sentences(text)
+
+    parser._split_sentences = counting_split
+    words = [f"word{i}" for i in range(40000)]
+    text = " ".join(words)
+    segments = list(parser.iter_segments(io.StringIO(text), chunk_size=100, max_holdback=5000))
+
+    assert " ".join(segment.content for segment in segments).split() == words
+    assert max(len(segment.content) for segment in segments) <= 5100
+    assert sum(split_chars) < 4 * len(text)
+
+
+if __name__ == "__main__":
+    test_iter_segments_matches_parse_text()
+    test_iter_segments_empty_input()
+    test_unpunctuated_input_is_bounded_and_linear()
+    print("iter_segments matches parse_text")
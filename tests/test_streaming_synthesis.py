@@ -0,0 +1,81 @@
+"""Test streaming synthesis: in-order chunks, early first audio, WAV stream and HTTP endpoint."""
+
+import sys
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextParser
+from src.voice_assigner import VoiceAssigner
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.metrics import REGISTRY
+
+TEXT = " ".join(f"Sentence number {i} is here." for i in range(40))
+
+
+def make_parts(tmp_path, **backend_options):
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(tmp_path / "cache"),
+                                backend=StubBackend(**backend_options))
+    return TextParser(sentence_splitter="rules"), assigner, synth
+
+
+def test_stream_yields_in_order_and_first_audio_early(tmp_path):
+    parser, assigner, synth = make_parts(tmp_path, call_overhead=0.01)
+    voice_segments = assigner.assign_voices(parser.parse_text(TEXT))
+    REGISTRY.reset()
+
+    chunks = list(synth.stream(voice_segments, priority_segments=2, batch_size=8))
+    assert [c.index for c in chunks] == list(range(len(voice_segments)))
+    # The first chunk only waited for one model call, not the whole book
+    assert chunks[0].elapsed < chunks[-1].elapsed / 4
+    series = REGISTRY.snapshot()["readtome_time_to_first_audio_seconds"]["series"]
+    assert series[0]["count"] == 1
+    # Segments after the priority ones were synthesized in batches
+    assert [len(lengths) for _, lengths in synth.backend.calls][:2] == [1, 1]
+    assert max(len(lengths) for _, lengths in synth.backend.calls) > 1
+
+    expected = [synth.synthesize(**vs.get_synthesizer_params()) for vs in voice_segments]
+    assert [c.path for c in chunks] == expected
+
+
+def test_stream_wav_and_early_close(tmp_path):
+    parser, assigner, synth = make_parts(tmp_path)
+    voice_segments = [assigner.assign_voice(s) for s in parser.parse_text(TEXT)]
+
+    stream = synth.stream_wav(voice_segments)
+    header = next(stream)
+    assert header[:4] == b"RIFF" and header[36:40] == b"data"
+    assert struct.unpack_from("<I", header, 24)[0] == synth.backend.sample_rate
+    first = next(stream)
+    assert len(first) > 0 and len(first) % 2 == 0
+    stream.close()  # listener went away; the producer thread must stop
+    deadline = time.time() + 5
+    while any(t.name == "synthesis-stream" for t in threading.enumerate()) and time.time() < deadline:
+        time.sleep(0.01)
+    assert not any(t.name == "synthesis-stream" for t in threading.enumerate())
+
+
+def test_stream_endpoint(tmp_path):
+    pytest.importorskip("flask")
+    from app import create_app
+
+    from src.job_service import JobService
+
+    parts = make_parts(tmp_path)
+    app = create_app(*parts, jobs=JobService(*parts))
+    client = app.test_client()
+    response = client.post("/stream", json={"text": TEXT, "first_segments": 1})
+    assert response.status_code == 200
+    assert response.mimetype == "audio/wav"
+    assert response.data[:4] == b"RIFF"
+    assert client.post("/stream", json={}).status_code == 400
+    assert b"readtome_time_to_first_audio_seconds" in client.get("/metrics").data
@@ -0,0 +1,75 @@
+"""Test the content-addressed SynthesisCache."""
+
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.synthesis_cache import SynthesisCache
+
+
+def write_bytes(size):
+    def write_audio(path):
+        path.write_bytes(b"\0" * size)
+    return write_audio
+
+
+def test_keys_are_stable_and_normalized():
+    key = SynthesisCache.make_key("vits", "p225", "He said.")
+    assert key == SynthesisCache.make_key("vits", "p225", "  He   said.\n")
+    assert key != SynthesisCache.make_key("vits", "p226", "He said.")
+    assert key != SynthesisCache.make_key("fast_pitch", "p225", "He said.")
+
+
+def test_hits_misses_and_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SynthesisCache(tmp, max_bytes=250)
+        calls = []
+
+        def synthesize(text):
+            key = cache.make_key("stub", None, text)
+            path, hit = cache.get_or_create(key, lambda p: (calls.append(text), write_bytes(100)(p)))
+            return path, hit
+
+        first, hit = synthesize("he said")
+        assert not hit and first.exists()
+        assert synthesize("he said") == (first, True)
+        assert calls == ["he said"]
+
+        # Make "he said" the most recently used entry, then overflow the cache
+        older, _ = synthesize("Chapter One")
+        os.utime(older, (time.time() - 10, time.time() - 10))
+        os.utime(first, (time.time() + 10, time.time() + 10))
+        synthesize("Chapter Two")
+
+        assert cache.stats.evictions == 1
+        assert cache.size_bytes <= 250
+        assert synthesize("he said")[1]
+        assert not synthesize("Chapter One")[1]
+        assert not list(first.parent.glob("*.tmp.wav"))
+
+
+def test_failed_write_leaves_no_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SynthesisCache(tmp)
+        key = cache.make_key("stub", None, "boom")
+
+        def failing_write(path):
+            path.write_bytes(b"partial")
+            raise RuntimeError("model crashed")
+
+        try:
+            cache.put(key, failing_write)
+        except RuntimeError:
+            pass
+        assert cache.get(key) is None
+        assert not list(cache.path_for(key).parent.iterdir())
+
+
+if __name__ == "__main__":
+    test_keys_are_stable_and_normalized()
+    test_hits_misses_and_lru_eviction()
+    test_failed_write_leaves_no_entry()
+    print("SynthesisCache tests passed")
@@ -0,0 +1,63 @@
+"""Test merging and splitting of voice segments into synthesis chunks."""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextSegment
+from src.voice_assigner import VoiceSegment, VoiceProfile, VoiceCharacteristics
+from src.synthesis_planner import SynthesisPlanner
+
+
+NARRATOR = VoiceProfile("p226", "Narrator", VoiceCharacteristics(), role="narrator")
+SUSAN = VoiceProfile("p227", "Susan", VoiceCharacteristics(), role="character")
+
+
+def voice_segment(text, voice=NARRATOR):
+    return VoiceSegment(TextSegment(text, "narrative"), voice)
+
+
+def reconstruct(plan, count):
+    """Rebuild each original segment's text from the chunk parts."""
+    pieces = [[] for _ in range(count)]
+    for chunk in plan.chunks:
+        for part in chunk.parts:
+            pieces[part.segment_index].append((part.segment_offset, chunk.text[part.start:part.end]))
+    return pieces
+
+
+def test_merges_runs_of_the_same_voice():
+    segments = [voice_segment("It was cold."), voice_segment("The wind rose."),
+                voice_segment('"Hurry," she said.', SUSAN), voice_segment("They ran."),
+                voice_segment("Night fell.")]
+    plan = SynthesisPlanner(target_chars=100, max_chars=200).plan(segments)
+
+    assert [c.get_synthesizer_params() for c in plan.chunks] == [
+        {"text": "It was cold. The wind rose.", "voice_type": "p226"},
+        {"text": '"Hurry," she said.', "voice_type": "p227"},
+        {"text": "They ran. Night fell.", "voice_type": "p226"},
+    ]
+    assert plan.chunks[0].segment_indices == [0, 1]
+    assert plan.call_reduction == 1 - 3 / 5
+    for index, pieces in enumerate(reconstruct(plan, len(segments))):
+        assert pieces == [(0, segments[index].text_segment.content)]
+
+
+def test_splits_long_sentences_at_clauses_and_maps_times():
+    clause = "the lantern swung in the dark and the path narrowed between the trees"
+    long_text = "; ".join([clause] * 6) + "."
+    segments = [voice_segment("Short one."), voice_segment(long_text)]
+    planner = SynthesisPlanner(target_chars=60, max_chars=150)
+    plan = planner.plan(segments)
+
+    assert all(len(chunk.text) <= 150 for chunk in plan.chunks)
+    split_parts = reconstruct(plan, 2)[1]
+    assert len(split_parts) > 1
+    assert all(text.endswith(";") or text.endswith(".") for _, text in split_parts)
+    for offset, text in split_parts:
+        assert long_text[offset:offset + len(text)] == text
+
+    times = plan.segment_times([1.0] * len(plan.chunks))
+    assert times[0][0] == 0.0
+    assert times[0][1] <= times[1][0] < times[1][1] == len(plan.chunks)
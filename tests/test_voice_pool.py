@@ -0,0 +1,53 @@
+"""Test VoicePool indexes and VoiceAssigner lookups through them."""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextSegment
+from src.voice_assigner import (VoiceAssigner, VoicePool, VoiceProfile, VoiceCharacteristics,
+                                Gender, Age, Accent)
+
+
+def make_pool():
+    return VoicePool([
+        VoiceProfile("p225", "Narrator", VoiceCharacteristics("male", "adult", "british"), role="narrator"),
+        VoiceProfile("p226", "Young American", VoiceCharacteristics(Gender.FEMALE, Age.YOUNG, Accent.AMERICAN),
+                     role="character"),
+        VoiceProfile("p227", "Older American", VoiceCharacteristics("female", "elderly", "american"),
+                     role="character"),
+    ])
+
+
+def test_lookups_by_id_role_and_characteristics():
+    pool = make_pool()
+    assert pool.get("p226").name == "Young American"
+    assert pool["p227"] is pool[2]
+    assert pool.get("missing") is None
+    assert [v.voice_id for v in pool.by_role("character")] == ["p226", "p227"]
+    assert pool.narrator.voice_id == "p225"
+
+    # Enum and string values are interchangeable in both config and queries
+    assert [v.voice_id for v in pool.find(gender="female", age=Age.YOUNG, accent="American")] == ["p226"]
+    assert [v.voice_id for v in pool.find(gender=Gender.FEMALE)] == ["p226", "p227"]
+    assert [v.voice_id for v in pool.find(accent="american", role="character")] == ["p226", "p227"]
+    assert len(pool.find()) == 3
+    assert pool.find(gender="male", accent="american") == []
+
+
+def test_assigned_characters_use_their_voice(tmp_path):
+    assigner = VoiceAssigner(development_mode=False, assignments_file=str(tmp_path / "assignments.json"))
+    assigner.character_assignments = {"Susan": "p227", "Ghost": "no-such-voice"}
+
+    def voice_for(speaker):
+        return assigner.assign_voice(TextSegment("Hi.", "dialogue", speaker, 0.9)).voice_profile.voice_id
+
+    assert voice_for("Susan") == "p227"
+    assert voice_for("Ghost") == "p226"   # unknown voice falls back to the narrator
+    assert voice_for(None) == "p226"
+
+
+if __name__ == "__main__":
+    test_lookups_by_id_role_and_characteristics()
+    print("VoicePool tests passed")
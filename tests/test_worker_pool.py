@@ -0,0 +1,59 @@
+"""Test SynthesisWorkerPool ordering and crash recovery with stub backends."""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from src.parser import TextSegment
+from src.voice_assigner import VoiceSegment, VoiceProfile, VoiceCharacteristics
+from src.synthesizer import AdaptiveSynthesizer
+from src.synthesis_cache import SynthesisCache
+from src.tts_backends import StubBackend
+from src.worker_pool import SynthesisWorkerPool
+
+
+class CrashOnceBackend(StubBackend):
+    """Kills its worker process the first time it sees the poison text."""
+
+    marker_dir = None
+
+    def synthesize_batch(self, texts, speaker=None):
+        marker = Path(self.marker_dir) / "crashed"
+        if "poison" in texts[0] and not marker.exists():
+            marker.touch()
+            os._exit(1)
+        return super().synthesize_batch(texts, speaker)
+
+
+def make_voice_segments(count):
+    voice = VoiceProfile(voice_id="p226", name="Narrator", characteristics=VoiceCharacteristics())
+    texts = [f"Sentence number {i}." for i in range(count)]
+    texts[count // 2] = "This poison sentence crashes the worker."
+    return [VoiceSegment(TextSegment(content=text, segment_type="narrative"), voice) for text in texts]
+
+
+def test_pool_matches_single_process_and_survives_crash():
+    segments = make_voice_segments(40)
+    with tempfile.TemporaryDirectory() as tmp:
+        CrashOnceBackend.marker_dir = tmp
+        pool_cache = SynthesisCache(Path(tmp) / "pool")
+        with SynthesisWorkerPool("stub", pool_cache, workers=2, shard_size=5,
+                                 backend_factory=CrashOnceBackend) as pool:
+            paths = pool.synthesize(segments)
+        assert (Path(tmp) / "crashed").exists()
+
+        synth = AdaptiveSynthesizer(development_mode=False, cache=SynthesisCache(Path(tmp) / "single"),
+                                    backend=StubBackend("stub"))
+        expected = [synth.synthesize(**s.get_synthesizer_params()) for s in segments]
+
+        assert [p.name for p in paths] == [p.name for p in expected]
+        for path, expected_path in zip(paths, expected):
+            assert path.read_bytes() == expected_path.read_bytes()
+
+
+if __name__ == "__main__":
+    test_pool_matches_single_process_and_survives_crash()
+    print("SynthesisWorkerPool tests passed")